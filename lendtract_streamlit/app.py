@@ -1,63 +1,67 @@
 import streamlit as st
 import os
-from openpyxl import load_workbook
-from core.addmember import add_member
-from core.view_all import list_all_borrowers
-from core.search_member import search_member
-from core.utils import get_member_path
-from core.addmember import add_member
-from core.view_all import list_all_borrowers
-from core.search_member import search_member
+import time
+import sqlite3
+from core.parse_cache import stats as parse_cache_stats
+from core import metrics, snapshots, tenants
+
+# Page modules are imported in the branch that renders them, so a session
+# only loads what its pages use (reportlab for reports, the import and
+# export code, ...). Later reruns find them in sys.modules.
 
 
 # Set page config with wide layout for better mobile responsiveness
 st.set_page_config(page_title="LendTrack", layout="wide")
+run_started = time.perf_counter()
+
+# Each lender works in their own partition. LENDTRACK_TENANT pins a process
+# to one tenant; otherwise ?tenant=<id> picks it and the default tenant
+# (members/) is used without it. This selects data, it does not
+# authenticate: put the app behind the deployment's login.
+tenant = os.environ.get("LENDTRACK_TENANT") or st.query_params.get("tenant") or tenants.DEFAULT_TENANT
+try:
+    tenants.validate(tenant)
+except ValueError as e:
+    st.error(f"❌ {e}")
+    st.stop()
+if tenant != tenants.DEFAULT_TENANT and not tenants.exists(tenant):
+    st.error(f"❌ Unknown tenant: {tenant}")
+    st.stop()
+members_dir = tenants.members_dir(tenant)
 
 # Initialize session state
 if 'current_view' not in st.session_state:
     st.session_state.current_view = "🏠 Home"
 if 'current_borrower' not in st.session_state:
     st.session_state.current_borrower = None
+# A borrower picked under another tenant is not looked up in this one
+if st.session_state.get('tenant', tenant) != tenant:
+    st.session_state.current_borrower = None
+st.session_state.tenant = tenant
 
 # Create members directory with error handling
 try:
-    if not os.path.exists("members"):
-        os.makedirs("members")
+    if not os.path.exists(members_dir):
+        os.makedirs(members_dir)
 except OSError as e:
     st.error(f"❌ Failed to create members directory: {e}")
 
-# Function to calculate statistics
-def get_statistics():
-    members_dir = "members"
-    total_borrowers = 0
-    total_loan_amount = 0.0
-    total_interest_paid = 0.0
+# Keeps the portfolio snapshots the Home page reads up to date
+snapshots.start_scheduler(members_dir)
 
+# Function to read portfolio statistics
+def get_statistics(refresh=False):
+    # The latest snapshot is a few rows; the ledger is only scanned here when
+    # there is no snapshot yet or one is asked for
     try:
-        files = [f for f in os.listdir(members_dir) if f.endswith(".xlsx")]
-        total_borrowers = len(files)
-
-        for file in files:
-            filepath = os.path.join(members_dir, file)
-            try:
-                wb = load_workbook(filepath)
-                ws = wb["Payments"]
-                loan_amount = float(ws['B2'].value or 0)
-                total_loan_amount += loan_amount
-
-                row = 5
-                while ws.cell(row=row, column=8).value:
-                    try:
-                        total_interest_paid += float(ws.cell(row=row, column=8).value)
-                    except:
-                        pass
-                    row += 1
-            except Exception as e:
-                st.warning(f"⚠️ Error reading file {file}: {e}")
-    except OSError as e:
+        if refresh or snapshots.latest(members_dir) is None:
+            with st.spinner("Taking portfolio snapshot..."):
+                for file, e in snapshots.snapshot_now(members_dir, force=refresh):
+                    st.warning(f"⚠️ Error reading file {file}: {e}")
+        return snapshots.latest(members_dir)
+    except (OSError, sqlite3.Error) as e:
         st.error(f"❌ Error accessing members directory: {e}")
-
-    return total_borrowers, total_loan_amount, total_interest_paid
+        return None
 
 # Sidebar menu
 menu_options = ["🏠 Home", "➕ Add Member", "📄 View All Borrowers", "🔍 Search Borrower"]
@@ -68,6 +72,17 @@ menu = st.sidebar.selectbox("Choose Action", menu_options,
 # Update session state with current menu selection
 st.session_state.current_view = menu
 
+if tenant != tenants.DEFAULT_TENANT:
+    st.sidebar.caption(f"🏢 Tenant: {tenant}")
+
+with st.sidebar.expander("⚙️ Parse cache"):
+    cache = parse_cache_stats()
+    st.caption(
+        f"Hits: {cache['hits']} · Misses (workbook reads): {cache['misses']}  \n"
+        f"Entries: {cache['entries']} · {cache['bytes'] / 1024:.0f} KiB · "
+        f"Evictions: {cache['evictions']} · Invalidations: {cache['invalidations']}"
+    )
+
 # Home Page
 if menu == "🏠 Home":
     st.title("🏠 LendTrack - Personal Finance Manager")
@@ -77,14 +92,100 @@ if menu == "🏠 Home":
     """)
 
     # Display statistics
-    total_borrowers, total_loan_amount, total_interest_paid = get_statistics()
+    col1, col2 = st.columns([4, 1])
+    refresh = col2.button("🔄 Refresh", key="refresh_snapshot", use_container_width=True)
+    totals = get_statistics(refresh)
+    if totals is not None:
+        col1.caption(f"📸 Snapshot taken {totals['taken_at'].replace('T', ' ')}")
+    else:
+        totals = {
+            "borrowers": 0, "loan_amount": 0.0, "interest_paid": 0.0,
+            "outstanding_interest": 0.0, "overdue": 0, "collected_this_month": 0.0,
+        }
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Total Borrowers", totals["borrowers"])
+    with col2:
+        st.metric("Total Loan Amount", f"₹{totals['loan_amount']:.2f}")
+    with col3:
+        st.metric("Total Paid", f"₹{totals['interest_paid']:.2f}")
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Total Borrowers", total_borrowers)
+        st.metric("Outstanding Due", f"₹{totals['outstanding_interest']:.2f}")
     with col2:
-        st.metric("Total Loan Amount", f"₹{total_loan_amount:.2f}")
+        st.metric("Overdue Borrowers", totals["overdue"])
     with col3:
-        st.metric("Total Interest Paid", f"₹{total_interest_paid:.2f}")
+        st.metric("Collected This Month", f"₹{totals['collected_this_month']:.2f}")
+
+    if totals["borrowers"]:
+        due_soon = snapshots.reminders(members_dir)
+        if due_soon:
+            st.markdown("---")
+            st.subheader("⏰ Reminders")
+            st.caption(f"Overdue or due within {snapshots.REMINDER_DAYS} days")
+            st.dataframe(
+                [
+                    {
+                        "Borrower": r["name"], "Due Date": r["next_due_date"],
+                        "Status": "⏰ Overdue" if r["overdue"] else "📌 Due soon",
+                        "Remaining Due": r["remaining"],
+                    }
+                    for r in due_soon
+                ],
+                hide_index=True,
+            )
+
+        st.markdown("---")
+        st.subheader("📊 Portfolio")
+        # Charts are plain Vega-Lite specs; st.bar_chart and st.line_chart
+        # would import altair (~0.5s) to build the same thing
+        by_month = snapshots.interest_by_month(members_dir)
+        if by_month:
+            st.markdown("**Interest collected per month**")
+            st.vega_lite_chart(
+                spec={
+                    "data": {"values": [{"Month": m, "Interest Collected": a} for m, a in by_month]},
+                    "mark": "bar",
+                    "encoding": {
+                        "x": {"field": "Month", "type": "ordinal"},
+                        "y": {"field": "Interest Collected", "type": "quantitative"},
+                    },
+                },
+                use_container_width=True,
+            )
+        trend = snapshots.history(members_dir)
+        if len(trend) > 1:
+            st.markdown("**Daily trend**")
+            st.vega_lite_chart(
+                spec={
+                    "data": {"values": [
+                        {"Day": day["day"], "Series": series, "Amount": day[field]}
+                        for day in trend
+                        for series, field in (("Total Paid", "interest_paid"), ("Outstanding Due", "outstanding_interest"))
+                    ]},
+                    "mark": "line",
+                    "encoding": {
+                        "x": {"field": "Day", "type": "temporal"},
+                        "y": {"field": "Amount", "type": "quantitative"},
+                        "color": {"field": "Series", "type": "nominal"},
+                    },
+                },
+                use_container_width=True,
+            )
+        st.markdown("**Largest outstanding balances**")
+        st.dataframe(
+            [
+                {
+                    "Borrower": b["name"], "Loan Amount": b["loan_amount"], "Total Paid": b["total_paid"],
+                    "Outstanding Due": b["remaining"],
+                    "Progress": min(max(b["total_paid"] / b["total_due"], 0.0), 1.0) if b["total_due"] > 0 else 0.0,
+                    "Overdue": bool(b["overdue"]),
+                }
+                for b in snapshots.largest_balances(members_dir)
+            ],
+            hide_index=True,
+            column_config={"Progress": st.column_config.ProgressColumn("Progress", min_value=0, max_value=1)},
+        )
 
     st.markdown("---")
     st.subheader("Quick Actions")
@@ -106,46 +207,119 @@ if menu == "🏠 Home":
 
 # Add Member Page
 elif menu == "➕ Add Member":
+    from core.addmember import add_member
+    from core.bulk_import import import_ledger
+    from core.schedule import METHODS as SCHEDULE_METHODS, installments
+
     st.title("➕ Add New Borrower")
     st.markdown("Enter details to add a new borrower to LendTrack.")
     name = st.text_input("Borrower Name")
     loan = st.number_input("Loan Amount", min_value=0.0, step=100.0)
     interest = st.number_input("Interest Rate (%)", min_value=0.0, step=0.1)
     period = st.number_input("Loan Period (Months)", min_value=1, step=1)
+    repayment = st.selectbox(
+        "Repayment Method", SCHEDULE_METHODS,
+        format_func=lambda m: {"flat": "Flat (interest only)", "reducing": "Reducing balance", "emi": "EMI"}[m],
+    )
 
     if not name.strip():
         st.warning("⚠️ Borrower name cannot be empty.")
     else:
         monthly_interest = (loan * interest) / 100
-        total_interest = monthly_interest * period
+        plan = installments({
+            "loan_amount": loan, "interest_rate": interest, "loan_period": period,
+            "monthly_interest": monthly_interest, "repayment": repayment,
+        })
+        total_due = sum(p + i for p, i in plan)
 
         if loan and interest and period:
             st.info(f"📌 Monthly Interest: ₹{monthly_interest:.2f}")
-            st.info(f"📈 Total Interest Over {int(period)} Months: ₹{total_interest:.2f}")
+            st.info(f"📅 First Installment: ₹{sum(plan[0]):.2f}")
+            st.info(f"📈 Total Due Over {int(period)} Months: ₹{total_due:.2f}")
 
         if st.button("Add", use_container_width=True):
-            if add_member(name, loan, interest, period, monthly_interest):
+            if add_member(name, loan, interest, period, monthly_interest, repayment, tenant):
                 st.success(f"✅ Member '{name}' added successfully!")
             else:
                 st.error("❗ Member already exists.")
 
+    st.markdown("---")
+    with st.expander("📥 Bulk import from CSV / Excel"):
+        st.caption(
+            "One row per borrower and/or payment. Columns: Name, Loan Amount, Interest Rate (%), "
+            "Loan Period (Months), Start Date, Repayment Method, Payment Date, Amount Paid, Notes."
+        )
+        upload = st.file_uploader("Ledger file", type=["csv", "xlsx"])
+        if upload is not None and st.button("Import", use_container_width=True):
+            with st.spinner("Importing..."):
+                report = import_ledger(upload, tenants.get_storage(tenant), kind="xlsx" if upload.name.lower().endswith(".xlsx") else "csv")
+            st.success(f"✅ {report}")
+            for where, message in report.errors[:50]:
+                st.error(f"❌ {where}: {message}")
+
 # View All Borrowers Page
 elif menu == "📄 View All Borrowers":
+    from core.view_all import list_all_borrowers
+
     st.title("📄 All Borrowers")
-    list_all_borrowers()
+    list_all_borrowers(tenant)
 
 # Search Borrower Page
 elif menu == "🔍 Search Borrower":
     st.title("🔍 Search Borrower")
     name = st.text_input("Enter Borrower Name")
+
+    # Type-ahead: prefix matches first, then close spellings
+    if name.strip():
+        from core.name_index import get_name_index
+        try:
+            suggestions = get_name_index(tenants.get_storage(tenant)).suggest(name)
+        except (OSError, sqlite3.Error) as e:
+            st.error(f"❌ Error loading borrower names: {e}")
+            suggestions = []
+        if suggestions and suggestions != [name.strip()]:
+            st.caption("Suggestions")
+            cols = st.columns(min(len(suggestions), 4))
+            for i, suggestion in enumerate(suggestions):
+                if cols[i % len(cols)].button(suggestion, key=f"suggest_{suggestion}", use_container_width=True):
+                    st.session_state.current_borrower = suggestion
+
     if st.button("Search", use_container_width=True):
         if name.strip():
             st.session_state.current_borrower = name
             st.session_state.current_view = "🔍 Search Borrower"
-            search_member(name)
         else:
             st.warning("⚠️ Borrower name cannot be empty.")
 
 # Display borrower profile if selected
 if st.session_state.current_borrower and menu != "📄 View All Borrowers":
-    search_member(st.session_state.current_borrower)
\ No newline at end of file
+    from core.search_member import search_member
+    search_member(st.session_state.current_borrower, tenant)
+
+metrics.observe("render.page", time.perf_counter() - run_started, page=menu)
+
+# Timing panel for operators: set LENDTRACK_ADMIN_TOKEN and open the app
+# with ?admin=<token>
+if metrics.is_admin(st.query_params.get("admin")):
+    with st.sidebar.expander("⏱️ Timings"):
+        timings, counters = metrics.snapshot()
+        st.dataframe(
+            [
+                {
+                    "Operation": t["operation"] + "".join(f" {k}={v}" for k, v in t["labels"].items()),
+                    "Count": t["count"], "Mean ms": t["mean"] * 1000, "p95 ms": t["p95"] * 1000,
+                    "Max ms": t["max"] * 1000, "Total s": t["total"],
+                }
+                for t in timings
+            ],
+            hide_index=True,
+        )
+        st.dataframe(
+            [
+                {"Counter": c["counter"] + "".join(f" {k}={v}" for k, v in c["labels"].items()), "Value": c["value"]}
+                for c in counters
+            ],
+            hide_index=True,
+        )
+        if st.button("Reset timings", key="reset_timings"):
+            metrics.registry.reset()
\ No newline at end of file
@@ -0,0 +1,84 @@
+import sys
+import time
+import random
+from datetime import date
+from core.analytics import Ledger
+from core.models import Borrower
+from core.schedule import add_months
+
+# Compares the per-cell Python loops the pages used with the vectorized
+# Ledger over an in-memory synthetic portfolio.
+# Usage: python -m benchmarks.bench_analytics [borrowers] [payments_each]
+
+
+def synthetic_records(borrowers, payments_each, seed=0):
+    rng = random.Random(seed)
+    records = []
+    for i in range(borrowers):
+        loan = rng.randrange(1000, 100000, 100)
+        rate = rng.choice([1.0, 1.5, 2.0])
+        info = {
+            "name": f"borrower_{i:06d}", "loan_amount": float(loan), "interest_rate": rate,
+            "start_date": f"{rng.randrange(2020, 2026)}-{rng.randrange(1, 13):02d}-01",
+            "loan_period": 24, "monthly_interest": loan * rate / 100,
+        }
+        payments = [
+            [f"{2020 + m // 12}-{m % 12 + 1:02d}-05", info["monthly_interest"], ""]
+            for m in range(rng.randrange(payments_each // 2, payments_each * 3 // 2 + 1))
+        ]
+        records.append((info, payments))
+    return records
+
+
+def loop_analytics(records, today):
+    totals = {"borrowers": 0, "loan_amount": 0.0, "interest_paid": 0.0, "outstanding_interest": 0.0, "overdue": 0}
+    by_month = {}
+    for info, payments in records:
+        totals["borrowers"] += 1
+        totals["loan_amount"] += float(info["loan_amount"])
+        paid = 0.0
+        for payment_date, amount, _ in payments:
+            try:
+                paid += float(amount)
+                by_month[str(payment_date)[:7]] = by_month.get(str(payment_date)[:7], 0.0) + float(amount)
+            except (TypeError, ValueError):
+                pass
+        due = float(info["monthly_interest"]) * int(info["loan_period"])
+        totals["interest_paid"] += paid
+        totals["outstanding_interest"] += due - paid
+        start = date.fromisoformat(str(info["start_date"]))
+        elapsed = sum(1 for k in range(1, int(info["loan_period"]) + 1) if add_months(start, k) < today)
+        totals["overdue"] += float(info["monthly_interest"]) * elapsed > paid + 0.005
+    return totals, by_month
+
+
+def main(borrowers=5000, payments_each=20):
+    records = synthetic_records(borrowers, payments_each)
+    count = sum(len(p) for _, p in records)
+    today = date.today()
+
+    start = time.perf_counter()
+    loop_totals, _ = loop_analytics(records, today)
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ledger = Ledger.from_records(Borrower.from_info(info, payments) for info, payments in records)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    totals = ledger.totals()
+    ledger.interest_by_month()
+    ledger.borrower_frame()
+    vector_time = time.perf_counter() - start
+
+    assert totals["overdue"] == loop_totals["overdue"]
+    assert abs(totals["interest_paid"] - loop_totals["interest_paid"]) < 1e-6 * max(1.0, loop_totals["interest_paid"])
+
+    print(f"{borrowers} borrowers, {count} payments")
+    print(f"python loops:         {loop_time * 1000:8.1f} ms")
+    print(f"columnar load (once): {build_time * 1000:8.1f} ms")
+    print(f"vectorized queries:   {vector_time * 1000:8.1f} ms ({loop_time / vector_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,103 @@
+import io
+import os
+import sys
+import shutil
+import tarfile
+import tempfile
+import subprocess
+
+# Server time for one payment on the Search page, measured by submitting the
+# payment form in two trees: the app as it was before the payments fragment
+# (the submit reran app.py, then st.rerun() ran it again), checked out from
+# git, and this tree, where the submit reruns only the payments fragment.
+# Each tree runs in its own interpreter against its own generated ledger.
+# Usage: python -m benchmarks.bench_fragments [borrowers] [payments_each] [interactions] [baseline_rev]
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BORROWER = "borrower_000000"
+
+CHILD = """
+import os, time
+from streamlit.testing.v1 import AppTest
+from benchmarks.bench_scan import generate
+os.makedirs("members")
+generate("members", {borrowers}, {payments_each})
+if {fragment}:
+    at = AppTest.from_string(
+        "from core.search_member import payments_section\\npayments_section({borrower!r})",
+        default_timeout=120,
+    )
+else:
+    at = AppTest.from_file(os.path.join({app_dir!r}, "app.py"), default_timeout=120)
+    at.session_state["current_view"] = "🔍 Search Borrower"
+    at.session_state["current_borrower"] = {borrower!r}
+at.run()
+elapsed = 0.0
+for i in range({interactions}):
+    [n for n in at.number_input if n.label == "Amount Paid"][0].set_value(1.0)
+    [t for t in at.text_input if t.label == "Note (optional)"][0].input(f"bench {{i}}")
+    submit = [b for b in at.button if b.label == "Add Payment"][0]
+    start = time.perf_counter()
+    submit.click().run()
+    elapsed += time.perf_counter() - start
+    if at.exception:
+        raise SystemExit(at.exception[0].message)
+print(elapsed / {interactions})
+"""
+
+
+def baseline_rev():
+    # The tree just before the commit that added this benchmark
+    added = subprocess.run(
+        ["git", "log", "--diff-filter=A", "--format=%H", "-1", "--", "benchmarks/bench_fragments.py"],
+        cwd=APP_DIR, capture_output=True, text=True, check=True,
+    ).stdout.strip()
+    return f"{added}^"
+
+
+def checkout(rev, directory):
+    top, prefix = subprocess.run(
+        ["git", "rev-parse", "--show-toplevel", "--show-prefix"],
+        cwd=APP_DIR, capture_output=True, text=True, check=True,
+    ).stdout.splitlines()
+    # A tree-ish with a path is only archived from the top of the work tree
+    archive = subprocess.run(["git", "archive", f"{rev}:{prefix}"], cwd=top, capture_output=True, check=True)
+    with tarfile.open(fileobj=io.BytesIO(archive.stdout)) as tar:
+        tar.extractall(directory, filter="data")
+    return directory
+
+
+def time_payment(app_dir, fragment, borrowers, payments_each, interactions):
+    script = CHILD.format(
+        app_dir=app_dir, fragment=fragment, borrower=BORROWER,
+        borrowers=borrowers, payments_each=payments_each, interactions=interactions,
+    )
+    members_root = tempfile.mkdtemp(prefix="lendtrack-fragments-")
+    try:
+        env = dict(os.environ, PYTHONPATH=app_dir)
+        done = subprocess.run(
+            [sys.executable, "-c", script], cwd=members_root, env=env, capture_output=True, text=True,
+        )
+        if done.returncode:
+            raise RuntimeError(f"Payment run in {app_dir} failed: {done.stderr.strip().splitlines()[-1:]}")
+        return float(done.stdout.strip().splitlines()[-1])
+    finally:
+        shutil.rmtree(members_root, ignore_errors=True)
+
+
+def main(borrowers=500, payments_each=24, interactions=10, rev=None):
+    rev = rev or baseline_rev()
+    baseline_dir = tempfile.mkdtemp(prefix="lendtrack-baseline-")
+    try:
+        before = time_payment(checkout(rev, baseline_dir), False, borrowers, payments_each, interactions)
+    finally:
+        shutil.rmtree(baseline_dir, ignore_errors=True)
+    after = time_payment(APP_DIR, True, borrowers, payments_each, interactions)
+
+    print(f"{borrowers} borrowers, {payments_each}+ payments on the profile, {interactions} payments each")
+    print(f"before ({rev}), submit + st.rerun(): {before * 1000:8.1f} ms")
+    print(f"payments fragment only:              {after * 1000:8.1f} ms ({before / after:.1f}x less per payment)")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:4]], *sys.argv[4:5])
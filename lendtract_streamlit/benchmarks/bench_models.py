@@ -0,0 +1,98 @@
+import sys
+import json
+import time
+import random
+import tracemalloc
+import numpy as np
+from core.analytics import _month_index, _ordinal_months
+from core.models import Borrower
+from benchmarks.ledger_data import synthetic_borrower
+
+# Memory and aggregation cost of a loaded ledger held as info dicts with
+# [date, amount, note] payment lists, as storage returned it before, and
+# as core.models Borrower records with payment columns. Both are built from
+# the same JSON text so every string is a fresh object, as after reading
+# workbooks or journals.
+# Usage: python -m benchmarks.bench_models [borrowers] [payments_each]
+
+
+def synthetic_text(borrowers, payments_each, seed=0):
+    rng = random.Random(seed)
+    return json.dumps([synthetic_borrower(i, payments_each, rng) for i in range(borrowers)])
+
+
+def traced_bytes(build):
+    tracemalloc.start()
+    try:
+        result = build()
+        return result, tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def load_rows(text):
+    return [(info, payments) for info, payments in json.loads(text)]
+
+
+def load_borrowers(text):
+    return [Borrower.from_info(info, payments) for info, payments in json.loads(text)]
+
+
+def timed(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def row_columns(records):
+    # What Ledger.from_records did with payment rows
+    amounts, dates, paid = [], [], []
+    for _, payments in records:
+        total = 0.0
+        for payment_date, amount, _ in payments:
+            dates.append(payment_date)
+            amounts.append(amount)
+            total += amount
+        paid.append(total)
+    return np.asarray(amounts, dtype=np.float64), _month_index(dates), paid
+
+
+def model_columns(borrowers):
+    paid = [b.total_paid() for b in borrowers]
+    amounts = np.concatenate([np.frombuffer(b.payments.amounts, dtype=np.float64) for b in borrowers])
+    ordinals = np.concatenate([np.frombuffer(b.payments.dates, dtype=np.int32) for b in borrowers])
+    return amounts, _ordinal_months(ordinals.astype(np.int64)), paid
+
+
+def main(borrowers=20000, payments_each=24):
+    text = synthetic_text(borrowers, payments_each)
+    payments = borrowers * payments_each
+
+    records, row_bytes = traced_bytes(lambda: load_rows(text))
+    models, model_bytes = traced_bytes(lambda: load_borrowers(text))
+
+    row_amounts, row_months, row_paid = row_columns(records)
+    model_amounts, model_months, model_paid = model_columns(models)
+    assert np.array_equal(row_amounts, model_amounts)
+    assert np.array_equal(row_months, model_months)
+    assert row_paid == model_paid
+
+    print(f"{borrowers} borrowers, {payments} payments")
+    print(f"{'':22} {'MiB':>8} {'bytes/payment':>14}")
+    print(f"{'dicts + row lists':22} {row_bytes / 2**20:8.1f} {row_bytes / payments:14.0f}")
+    print(f"{'Borrower + columns':22} {model_bytes / 2**20:8.1f} {model_bytes / payments:14.0f}"
+          f"   ({row_bytes / model_bytes:.1f}x smaller)")
+
+    row_time = timed(lambda: row_columns(records))
+    model_time = timed(lambda: model_columns(models))
+    paid_rows = timed(lambda: [sum(p[1] for p in payments) for _, payments in records])
+    paid_models = timed(lambda: [b.total_paid() for b in models])
+    print(f"ledger payment columns: {row_time:8.1f} ms rows   {model_time:8.1f} ms models ({row_time / model_time:.1f}x)")
+    print(f"total paid per borrower: {paid_rows:7.1f} ms rows   {paid_models:8.1f} ms models ({paid_rows / paid_models:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
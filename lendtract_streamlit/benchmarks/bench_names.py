@@ -0,0 +1,57 @@
+import sys
+import time
+import random
+from core.name_index import NameIndex
+
+# Usage: python -m benchmarks.bench_names [borrowers] [queries]
+
+FIRST = ["Aarav", "Vivaan", "Aditya", "Ananya", "Diya", "Ishaan", "Kavya", "Meera", "Rohan",
+         "Saanvi", "Arjun", "Priya", "Rahul", "Sneha", "Vikram", "Lakshmi", "Harsha", "Nikhil"]
+LAST = ["Sharma", "Reddy", "Iyer", "Patel", "Nair", "Gupta", "Rao", "Menon", "Singh", "Das",
+        "Kumar", "Joshi", "Pillai", "Verma", "Chowdary", "Naidu"]
+
+
+def synthetic_names(count, seed=0):
+    rng = random.Random(seed)
+    return [f"{rng.choice(FIRST)} {rng.choice(LAST)} {i}" for i in range(count)]
+
+
+def typo(name, rng):
+    i = rng.randrange(len(name))
+    return name[:i] + rng.choice("abcdefghijklmnopqrstuvwxyz") + name[i + 1:]
+
+
+def timed(fn, queries):
+    start = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+
+def main(count=50000, query_count=1000):
+    rng = random.Random(1)
+    names = synthetic_names(count)
+
+    start = time.perf_counter()
+    index = NameIndex(names)
+    build = time.perf_counter() - start
+
+    sample = [rng.choice(names) for _ in range(query_count)]
+    prefixes = [n[:rng.randrange(2, 8)].lower() for n in sample]
+    typos = [typo(n, rng) for n in sample]
+
+    recall = sum(n in index.fuzzy(t) for n, t in zip(sample, typos)) / len(sample)
+    top = sum(index.fuzzy(t)[:1] == [n] for n, t in zip(sample, typos)) / len(sample)
+    print(f"{count} names indexed in {build:.2f}s")
+    print(f"fuzzy recall@10 for one-letter typos: {recall:.1%}, first: {top:.1%}")
+    print(f"prefix  {timed(index.prefix, prefixes):.3f} ms/query")
+    print(f"fuzzy   {timed(index.fuzzy, typos):.3f} ms/query")
+    # suggest falls back to fuzzy when a prefix finds too few names, which is
+    # the common case for full names and typos rather than short prefixes
+    print(f"suggest {timed(index.suggest, prefixes):.3f} ms/query (prefixes)")
+    print(f"suggest {timed(index.suggest, sample):.3f} ms/query (full names)")
+    print(f"suggest {timed(index.suggest, typos):.3f} ms/query (typos)")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
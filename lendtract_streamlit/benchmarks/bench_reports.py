@@ -0,0 +1,32 @@
+import io
+import os
+import sys
+import time
+import zipfile
+import tempfile
+from benchmarks.bench_scan import generate
+from core.report import export_statements
+
+# Usage: python -m benchmarks.bench_reports [borrowers] [payments_each]
+
+
+def main(count=200, payments=24):
+    cores = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as members_dir:
+        generate(members_dir, count, payments)
+        names = [f"borrower_{i:06d}" for i in range(count)]
+
+        print(f"{'workers':>8} {'seconds':>8} {'pdf/s':>8} {'pdf/s/core':>11}")
+        for workers in sorted({1, cores}):
+            buffer = io.BytesIO()
+            start = time.perf_counter()
+            written, errors = export_statements(buffer, names=names, workers=workers, members_dir=members_dir)
+            elapsed = time.perf_counter() - start
+            assert written == count and not errors, errors[:3]
+            assert len(zipfile.ZipFile(buffer).namelist()) == count
+            rate = count / elapsed
+            print(f"{workers:>8} {elapsed:>8.2f} {rate:>8.1f} {rate / workers:>11.1f}")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
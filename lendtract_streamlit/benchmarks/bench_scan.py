@@ -0,0 +1,56 @@
+import os
+import sys
+import time
+import random
+import tempfile
+from openpyxl import Workbook
+from core.workbook import HEADER, FIRST_PAYMENT_ROW
+from core.scanner import scan_summaries
+
+# Usage: python -m benchmarks.bench_scan [counts...] (run from lendtract_streamlit/)
+
+
+def write_synthetic_member(path, name, payments, rng):
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Payments")
+    loan = rng.randrange(1000, 100000, 100)
+    rate = rng.choice([1.0, 1.5, 2.0, 2.5])
+    ws.append(HEADER)
+    ws.append([name, loan, rate, "2024-01-01", 24, loan * rate / 100, "", "", ""])
+    for _ in range(FIRST_PAYMENT_ROW - 3):
+        ws.append([])
+    for month in range(payments):
+        ws.append([None] * 6 + [f"2024-{month % 12 + 1:02d}-05", loan * rate / 100, ""])
+    wb.save(path)
+
+
+def generate(directory, count, payments=12, seed=0):
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"borrower_{i:06d}.xlsx")
+        write_synthetic_member(path, f"borrower_{i:06d}", payments, rng)
+        paths.append(path)
+    return paths
+
+
+def timed_scan(paths, workers):
+    start = time.perf_counter()
+    results = sum(1 for _ in scan_summaries(paths, workers))
+    return time.perf_counter() - start, results
+
+
+def main(counts):
+    workers = os.cpu_count() or 1
+    print(f"{'files':>8} {'sequential s':>14} {f'parallel({workers}) s':>16} {'speedup':>8}")
+    for count in counts:
+        with tempfile.TemporaryDirectory() as directory:
+            paths = generate(directory, count)
+            sequential, n = timed_scan(paths, 1)
+            parallel, m = timed_scan(paths, workers)
+            assert n == m == count
+            print(f"{count:>8} {sequential:>14.2f} {parallel:>16.2f} {sequential / parallel:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main([int(c) for c in sys.argv[1:]] or [1000, 10000])
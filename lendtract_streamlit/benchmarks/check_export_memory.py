@@ -0,0 +1,63 @@
+import os
+import sys
+import tempfile
+import tracemalloc
+from core.storage import SqliteStorage
+from core.export import FORMATS, export_ledger
+
+# Checks that ledger export memory does not grow with ledger size: the peak
+# traced allocation for a ledger SCALE times larger must stay within
+# TOLERANCE of the smaller one. Usage: python -m benchmarks.check_export_memory [borrowers]
+
+SCALE = 4
+TOLERANCE = 1.25
+SLACK_BYTES = 512 * 1024
+
+
+def build_ledger(path, borrowers, payments_each=50):
+    storage = SqliteStorage(path)
+    storage.import_groups(
+        (
+            f"borrower_{i:06d}",
+            {
+                "name": f"borrower_{i:06d}", "loan_amount": 10000.0, "interest_rate": 2.0,
+                "start_date": "2025-01-01", "loan_period": 24, "monthly_interest": 200.0,
+            },
+            [(f"2025-{m % 12 + 1:02d}-05", 200.0, "synthetic") for m in range(payments_each)],
+        )
+        for i in range(borrowers)
+    )
+    return storage
+
+
+def peak_bytes(storage, fmt, directory):
+    out = os.path.join(directory, f"ledger.{fmt}")
+    tracemalloc.start()
+    try:
+        export_ledger(out, fmt, storage)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main(borrowers=500):
+    with tempfile.TemporaryDirectory() as directory:
+        small = build_ledger(os.path.join(directory, "small.sqlite"), borrowers)
+        large = build_ledger(os.path.join(directory, "large.sqlite"), borrowers * SCALE)
+
+        failed = False
+        for fmt in FORMATS:
+            # Warm-up so one-off imports and caches are not counted
+            peak_bytes(small, fmt, directory)
+            small_peak = peak_bytes(small, fmt, directory)
+            large_peak = peak_bytes(large, fmt, directory)
+            ok = large_peak <= small_peak * TOLERANCE + SLACK_BYTES
+            failed |= not ok
+            print(f"{fmt:8} {borrowers:>6} borrowers: {small_peak / 1024:8.0f} KiB peak   "
+                  f"{borrowers * SCALE:>6} borrowers: {large_peak / 1024:8.0f} KiB peak   {'ok' if ok else 'GROWS'}")
+
+        assert not failed, "export memory grows with ledger size"
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
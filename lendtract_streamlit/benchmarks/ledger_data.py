@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+import random
+from datetime import date
+from core.storage import get_storage
+from core.schedule import METHODS, add_months, installments
+
+# Seeded synthetic ledgers for the benchmarks. Borrowers go through the
+# bulk import path, so workbooks have the Payments sheet layout add_member
+# writes (or rows in ledger.sqlite with LENDTRACK_BACKEND=sqlite) and the
+# summary index is filled as it would be after an import.
+# Usage: python -m benchmarks.ledger_data <members_dir> [borrowers] [payments_each]
+
+CHUNK = 1000
+PERIODS = (12, 24, 36)
+RATES = (1.0, 1.5, 2.0, 2.5)
+
+
+def borrower_name(i):
+    return f"borrower_{i:06d}"
+
+
+def synthetic_borrower(i, payments_each, rng):
+    loan = float(rng.randrange(1000, 100000, 100))
+    rate = rng.choice(RATES)
+    info = {
+        "name": borrower_name(i),
+        "loan_amount": loan,
+        "interest_rate": rate,
+        "start_date": date(rng.randrange(2023, 2026), rng.randrange(1, 13), rng.randrange(1, 29)).isoformat(),
+        "loan_period": rng.choice(PERIODS),
+        "monthly_interest": round(loan * rate / 100, 2),
+        "repayment": rng.choice(METHODS),
+    }
+    # Borrowers mostly pay their installment, sometimes a bit short
+    start = date.fromisoformat(info["start_date"])
+    due = installments(info)
+    payments = []
+    for k in range(payments_each):
+        principal, interest = due[k % len(due)]
+        amount = round((principal + interest) * rng.choice((1.0, 1.0, 1.0, 0.5)), 2)
+        payments.append([add_months(start, k + 1).isoformat(), amount, "" if k % 4 else "synthetic"])
+    return info, payments
+
+
+def generate_ledger(members_dir, borrowers, payments_each=12, seed=0):
+    os.makedirs(members_dir, exist_ok=True)
+    storage = get_storage(members_dir)
+    rng = random.Random(seed)
+    created = 0
+    for first in range(0, borrowers, CHUNK):
+        groups = []
+        for i in range(first, min(first + CHUNK, borrowers)):
+            info, payments = synthetic_borrower(i, payments_each, rng)
+            groups.append((info["name"], info, payments))
+        added, _, errors = storage.import_groups(groups)
+        if errors:
+            raise RuntimeError(f"Generating borrowers failed: {errors[:3]}")
+        created += added
+    return created
+
+
+def main(members_dir, borrowers=1000, payments_each=12):
+    start = time.perf_counter()
+    created = generate_ledger(members_dir, borrowers, payments_each)
+    print(f"{created} borrowers with {payments_each} payments each in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1], *[int(a) for a in sys.argv[2:]])
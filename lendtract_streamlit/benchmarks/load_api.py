@@ -0,0 +1,168 @@
+import os
+import sys
+import json
+import time
+import random
+import socket
+import argparse
+import tempfile
+import threading
+import http.client
+from urllib.parse import quote, urlsplit
+
+# Concurrent clients against the HTTP API, reporting p50/p99 latency per
+# request kind. Without --url a server is started in-process on a generated
+# ledger. Each client keeps one connection open unless --new-connections.
+# Usage: python -m benchmarks.load_api [--clients N] [--requests N] [--borrowers N]
+#        [--backend xlsx|sqlite] [--read-only] [--new-connections]
+
+MIX = [("list", 40), ("profile", 25), ("summary", 10), ("schedule", 10), ("payment", 15)]
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)] if values else 0.0
+
+
+def build_ledger(members_dir, backend, borrowers):
+    if backend == "xlsx":
+        from benchmarks.bench_scan import generate
+        generate(members_dir, borrowers)
+        return
+    from core.storage import LEDGER_FILE, SqliteStorage
+    storage = SqliteStorage(os.path.join(members_dir, LEDGER_FILE))
+    storage.import_groups(
+        (
+            f"borrower_{i:06d}",
+            {
+                "name": f"borrower_{i:06d}", "loan_amount": 10000.0, "interest_rate": 2.0,
+                "start_date": "2025-01-01", "loan_period": 24, "monthly_interest": 200.0,
+                "repayment": ("flat", "reducing", "emi")[i % 3],
+            },
+            [(f"2025-{m + 1:02d}-05", 200.0, "") for m in range(12)],
+        )
+        for i in range(borrowers)
+    )
+
+
+def start_server(members_dir):
+    import uvicorn
+    from core.api import create_app
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(
+        create_app(members_dir=members_dir), host="127.0.0.1", port=port,
+        log_level="warning", timeout_keep_alive=30,
+    ))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{port}"
+
+
+class Client:
+
+    def __init__(self, url, borrowers, reuse, rng, mix=MIX):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.borrowers = borrowers
+        self.reuse = reuse
+        self.rng = rng
+        self.mix = mix
+        self.conn = None
+        self.etags = {}
+        self.results = []
+
+    def request(self, method, path, body=None, conditional=False):
+        if self.conn is None or not self.reuse:
+            if self.conn is not None:
+                self.conn.close()
+            self.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        if conditional and path in self.etags:
+            headers["If-None-Match"] = self.etags[path]
+        self.conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+        response = self.conn.getresponse()
+        response.read()
+        if response.getheader("ETag"):
+            self.etags[path] = response.getheader("ETag")
+        return response.status
+
+    def step(self):
+        kind = self.rng.choices([k for k, _ in self.mix], weights=[w for _, w in self.mix])[0]
+        name = quote(self.rng.choice(self.borrowers))
+        if kind == "list":
+            path, method, body = f"/borrowers?page={self.rng.randrange(10)}&page_size=25", "GET", None
+        elif kind == "profile":
+            path, method, body = f"/borrowers/{name}", "GET", None
+        elif kind == "summary":
+            path, method, body = "/summary", "GET", None
+        elif kind == "schedule":
+            path, method, body = f"/borrowers/{name}/schedule", "GET", None
+        else:
+            path, method, body = f"/borrowers/{name}/payments", "POST", {"amount": 1.0, "date": "2026-01-01"}
+
+        start = time.perf_counter()
+        status = self.request(method, path, body, conditional=method == "GET")
+        self.results.append((kind, time.perf_counter() - start, status))
+
+    def run(self, count):
+        for _ in range(count):
+            self.step()
+        if self.conn is not None:
+            self.conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the LendTrack HTTP API")
+    parser.add_argument("--url")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=100, help="requests per client")
+    parser.add_argument("--borrowers", type=int, default=1000)
+    parser.add_argument("--backend", choices=("xlsx", "sqlite"), default="sqlite")
+    parser.add_argument("--new-connections", action="store_true", help="open a connection per request")
+    parser.add_argument("--read-only", action="store_true", help="no payments, so repeat GETs can be 304s")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as members_dir:
+        server = None
+        url = args.url
+        if url is None:
+            os.environ["LENDTRACK_BACKEND"] = args.backend
+            build_ledger(members_dir, args.backend, args.borrowers)
+            server, url = start_server(members_dir)
+
+        names = [f"borrower_{i:06d}" for i in range(args.borrowers)]
+        mix = [m for m in MIX if m[0] != "payment"] if args.read_only else MIX
+        clients = [Client(url, names, not args.new_connections, random.Random(i), mix) for i in range(args.clients)]
+        # Warm-up request so the first-request index sync is not timed
+        clients[0].request("GET", "/summary")
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=c.run, args=(args.requests,)) for c in clients]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+
+        if server is not None:
+            server.should_exit = True
+
+    results = [r for c in clients for r in c.results]
+    errors = [r for r in results if r[2] >= 400]
+    print(f"{len(results)} requests from {args.clients} clients in {elapsed:.1f}s "
+          f"({len(results) / elapsed:.0f} req/s), {len(errors)} errors, "
+          f"{sum(r[2] == 304 for r in results)} not-modified")
+    print(f"{'kind':10} {'count':>6} {'p50 ms':>8} {'p99 ms':>8}")
+    for kind, _ in MIX + [("all", 0)]:
+        latencies = [r[1] for r in results if kind in ("all", r[0])]
+        print(f"{kind:10} {len(latencies):>6} {percentile(latencies, 0.5) * 1000:8.1f} "
+              f"{percentile(latencies, 0.99) * 1000:8.1f}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+import os
+import sys
+import shutil
+import tempfile
+import subprocess
+
+# Time to first render of each page in a fresh interpreter, as after a
+# container cold start, with an -X importtime profile of the modules the
+# run imported. Streamlit itself is imported and warmed up before the
+# clock starts, since a server has it loaded before any session, and the
+# ledger has a portfolio snapshot, as it does on a volume the app has used.
+# Usage: python -m benchmarks.startup [borrowers] [top]
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(APP_DIR, "app.py")
+MARKER = "lendtrack-startup-run"
+PAGES = {
+    "home": ("🏠 Home", None),
+    "add_member": ("➕ Add Member", None),
+    "view_all": ("📄 View All Borrowers", None),
+    "search": ("🔍 Search Borrower", "borrower_000000"),
+}
+
+CHILD = """
+import os, time
+from streamlit.testing.v1 import AppTest
+AppTest.from_string("import streamlit as st\\nst.write('warm up')").run()
+os.write(2, {marker!r}.encode() + b"\\n")
+start = time.perf_counter()
+at = AppTest.from_file({app!r}, default_timeout=600)
+at.session_state["current_view"] = {view!r}
+at.session_state["current_borrower"] = {borrower!r}
+at.run()
+elapsed = time.perf_counter() - start
+if at.exception:
+    raise SystemExit(at.exception[0].message)
+print(elapsed)
+"""
+
+
+def parse_importtime(stderr):
+    # Top-level entries imported after the marker, as (module, seconds)
+    lines = stderr.splitlines()
+    if MARKER in lines:
+        lines = lines[lines.index(MARKER) + 1:]
+    imports = []
+    for line in lines:
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if not cumulative.strip().isdigit() or name[1:].startswith(" "):
+            continue
+        imports.append((name.strip(), int(cumulative) / 1e6))
+    return imports
+
+
+def profile_page(members_root, view, borrower):
+    script = CHILD.format(marker=MARKER, app=APP, view=view, borrower=borrower)
+    env = dict(os.environ, PYTHONPATH=APP_DIR)
+    done = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        cwd=members_root, env=env, capture_output=True, text=True,
+    )
+    if done.returncode:
+        raise RuntimeError(f"Rendering {view} failed: {done.stderr.strip().splitlines()[-1:]}")
+    imports = parse_importtime(done.stderr)
+    return {
+        "first_render_seconds": float(done.stdout.strip().splitlines()[-1]),
+        "import_seconds": sum(seconds for _, seconds in imports),
+        "top_imports": sorted(imports, key=lambda i: -i[1])[:25],
+    }
+
+
+def profile_pages(members_root, pages=PAGES):
+    # members_root holds the members/ directory the app reads
+    return {page: profile_page(members_root, view, borrower) for page, (view, borrower) in pages.items()}
+
+
+def measure(borrowers=100):
+    from benchmarks.ledger_data import generate_ledger
+    from core.snapshots import take_snapshot
+
+    root = tempfile.mkdtemp(prefix="lendtrack-startup-")
+    try:
+        generate_ledger(os.path.join(root, "members"), borrowers)
+        take_snapshot(os.path.join(root, "members"))
+        return profile_pages(root)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def report(results, top=8):
+    print(f"{'page':<12} {'first render ms':>16} {'imports ms':>11}")
+    for page, result in results.items():
+        print(f"{page:<12} {result['first_render_seconds'] * 1000:>16.1f} {result['import_seconds'] * 1000:>11.1f}")
+        for module, seconds in result["top_imports"][:top]:
+            print(f"    {module:<40} {seconds * 1000:>8.1f}")
+
+
+def main(borrowers=100, top=8):
+    report(measure(borrowers), top)
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Hammers a single borrower with concurrent payments and checks none are
+# lost. Usage: python -m benchmarks.stress_payments [threads] [payments_per_thread] [processes]
+
+
+def hammer(members_dir, thread_count, per_thread, worker_id, compact_every=25):
+    os.environ["LENDTRACK_BACKEND"] = os.environ.get("LENDTRACK_BACKEND", "xlsx")
+    from core import journal
+    from core.storage import get_storage
+
+    storage = get_storage(members_dir)
+    path = os.path.join(members_dir, "stress.xlsx")
+    errors = []
+
+    def worker(thread_id):
+        for i in range(per_thread):
+            try:
+                storage.append_payment("stress", "2026-01-01", 1, f"{worker_id}-{thread_id}-{i}")
+                if i % compact_every == 0 and hasattr(storage, "members_dir"):
+                    journal.compact(path)
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(t,)) for t in range(thread_count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return errors
+
+
+def main(thread_count=16, per_thread=50, processes=2):
+    from core.storage import get_storage
+
+    with tempfile.TemporaryDirectory() as members_dir:
+        storage = get_storage(members_dir)
+        storage.add_borrower({
+            "name": "stress", "loan_amount": 1000.0, "interest_rate": 1.0,
+            "start_date": "2026-01-01", "loan_period": 12, "monthly_interest": 10.0,
+        })
+
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = [
+                pool.submit(hammer, members_dir, thread_count, per_thread, w)
+                for w in range(processes)
+            ]
+            errors = [e for f in futures for e in f.result()]
+        elapsed = time.perf_counter() - start
+
+        expected = thread_count * per_thread * processes
+        payments = storage.load("stress").payments
+        notes = {p.note for p in payments}
+        print(f"{expected} payments from {processes} processes x {thread_count} threads "
+              f"in {elapsed:.2f}s; stored {len(payments)}, errors {len(errors)}")
+        assert not errors, errors[:5]
+        assert len(payments) == expected, f"lost {expected - len(payments)} payments"
+        assert len(notes) == expected, "duplicate payments"
+        storage.refresh()
+        count, _, paid = storage.totals()
+        assert paid == expected, f"index total {paid} != {expected}"
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,341 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import platform
+import argparse
+import datetime
+import tempfile
+import subprocess
+from statistics import mean, median
+
+# Headless benchmark suite: generates a seeded ledger per size and times the
+# operations behind each page, without a Streamlit server. Every size runs
+# in a fresh interpreter so caches from a smaller size do not carry over.
+# Results are written as JSON so runs on different commits can be compared.
+#
+# Usage (from lendtract_streamlit/):
+#   python -m benchmarks.suite --sizes 100 10000 100000
+#   python -m benchmarks.suite --sizes 100 --startup-only
+#   python -m benchmarks.suite --backend sqlite --data-dir /tmp/ledgers
+#   python -m benchmarks.suite --compare benchmarks/results/a.json benchmarks/results/b.json
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SIZES = (100, 10000)
+STARTUP_BORROWERS = 100
+COMPLETE_MARKER = ".benchmark-complete"
+
+
+def _git(*args):
+    try:
+        return subprocess.run(
+            ["git", *args], cwd=APP_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment(args):
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--", ".")),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "backend": args.backend,
+        "payments_each": args.payments,
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "budget_seconds": args.budget,
+    }
+
+
+# Scenarios, each (name, setup, operation). setup runs untimed before every
+# timed run and returns the operation's argument.
+
+def _random_name(ctx):
+    from benchmarks.ledger_data import borrower_name
+    return borrower_name(ctx["rng"].randrange(ctx["size"]))
+
+
+def _clear_ledger_cache(ctx):
+    # As after any change: the arrays are rebuilt from parsed borrowers
+    from core import analytics
+    analytics._cached.clear()
+
+
+def _clear_all_caches(ctx):
+    # As on the first page load in a new process: every workbook is read
+    from core.parse_cache import parse_cache
+    _clear_ledger_cache(ctx)
+    parse_cache.clear()
+
+
+def _get_statistics(ctx, _):
+    # The full-ledger statistics the Home page computed on every run before
+    # snapshots; now the core of each snapshot build
+    from core.analytics import load_ledger
+    storage = ctx["storage"]
+    storage.refresh()
+    load_ledger(storage).totals()
+
+
+def _take_snapshot(ctx, _):
+    from core import snapshots
+    snapshots.take_snapshot()
+
+
+def _read_snapshot(ctx, _):
+    # Everything the Home page reads
+    from core import snapshots
+    snapshots.latest()
+    snapshots.reminders()
+    snapshots.interest_by_month()
+    snapshots.history()
+    snapshots.largest_balances()
+
+
+def _touch_all(ctx):
+    # New mtimes make the next refresh re-read every workbook
+    stamp = time.time_ns() + ctx["rng"].randrange(1, 10 ** 6)
+    for file in os.listdir("members"):
+        if file.endswith(".xlsx"):
+            os.utime(os.path.join("members", file), ns=(stamp, stamp))
+
+
+def _refresh(ctx, _):
+    ctx["storage"].refresh()
+
+
+def _list_all_borrowers(ctx, _):
+    # The View All page: refresh, then the first page with default and
+    # with overdue/remaining filters
+    storage = ctx["storage"]
+    storage.refresh()
+    storage.query(page=0, page_size=25)
+    storage.query(overdue=True, sort="remaining", descending=True, page=0, page_size=25)
+
+
+def _search_member(ctx, name):
+    from core.ledger import borrower_profile, borrower_schedule
+    borrower_schedule(borrower_profile(name, ctx["storage"]))
+
+
+def _record_payment(ctx, name):
+    from core.record_payment import record_payment
+    if not record_payment(name, 100.0, "2026-01-05", "benchmark"):
+        raise RuntimeError(f"record_payment failed for {name}")
+
+
+def _load_for_pdf(ctx):
+    return ctx["storage"].load(_random_name(ctx))
+
+
+def _generate_pdf(ctx, borrower):
+    from core.report import generate_pdf
+    generate_pdf(borrower.info(), borrower.payments)
+
+
+SCENARIOS = [
+    ("get_statistics.cold", _clear_all_caches, _get_statistics),
+    ("get_statistics.rebuild", _clear_ledger_cache, _get_statistics),
+    ("get_statistics.warm", None, _get_statistics),
+    ("snapshot.build", None, _take_snapshot),
+    ("home.snapshot_read", None, _read_snapshot),
+    ("index.rebuild", _touch_all, _refresh),
+    ("list_all_borrowers", None, _list_all_borrowers),
+    ("search_member.load", _random_name, _search_member),
+    ("record_payment", _random_name, _record_payment),
+    ("report.pdf", _load_for_pdf, _generate_pdf),
+]
+XLSX_ONLY = {"index.rebuild"}
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        "runs": len(samples),
+        "min": ordered[0],
+        "median": median(ordered),
+        "mean": mean(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "max": ordered[-1],
+    }
+
+
+def run_scenario(ctx, setup, operation, repeat, budget):
+    # At least one run; further runs stop once the budget is spent so the
+    # largest sizes finish in reasonable time
+    from core import metrics
+    metrics.registry.reset()
+    samples = []
+    spent = 0.0
+    while len(samples) < repeat and (not samples or spent < budget):
+        argument = setup(ctx) if setup else None
+        start = time.perf_counter()
+        operation(ctx, argument)
+        elapsed = time.perf_counter() - start
+        samples.append(elapsed)
+        spent += elapsed
+    result = summarize(samples)
+    timings, counters = metrics.snapshot()
+    result["breakdown"] = {
+        t["operation"] + "".join(f" {k}={v}" for k, v in sorted(t["labels"].items())): {
+            "count": t["count"], "total": t["total"],
+        }
+        for t in timings
+    }
+    return result
+
+
+def ledger_dir(args, size):
+    if args.data_dir:
+        return os.path.join(os.path.abspath(args.data_dir), f"{args.backend}-{size}x{args.payments}-seed{args.seed}")
+    return tempfile.mkdtemp(prefix=f"lendtrack-bench-{size}-")
+
+
+def run_size(args, size):
+    # Runs inside the child interpreter for one size
+    from benchmarks.ledger_data import generate_ledger
+
+    directory = ledger_dir(args, size)
+    os.makedirs(directory, exist_ok=True)
+    # The app works on members/ relative to the current directory
+    os.chdir(directory)
+
+    generated = None
+    if not os.path.exists(COMPLETE_MARKER):
+        start = time.perf_counter()
+        generate_ledger("members", size, args.payments, args.seed)
+        generated = time.perf_counter() - start
+        open(COMPLETE_MARKER, "w").close()
+
+    from core.storage import get_storage
+    ctx = {"storage": get_storage(), "size": size, "rng": random.Random(args.seed)}
+    result = {"borrowers": size, "generate_seconds": generated, "data_dir": args.data_dir and directory, "scenarios": {}}
+    try:
+        for name, setup, operation in SCENARIOS:
+            if name in XLSX_ONLY and args.backend != "xlsx":
+                continue
+            if args.only and name not in args.only:
+                continue
+            stats = result["scenarios"][name] = run_scenario(ctx, setup, operation, args.repeat, args.budget)
+            print(f"  {name:<24} {stats['median'] * 1000:>10.2f} ms median ({stats['runs']} runs)", flush=True)
+    finally:
+        if not args.data_dir:
+            os.chdir(APP_DIR)
+            shutil.rmtree(directory, ignore_errors=True)
+    return result
+
+
+def child_command(args, size, output):
+    command = [
+        sys.executable, "-m", "benchmarks.suite", "--child", str(size), "--child-output", output,
+        "--backend", args.backend, "--payments", str(args.payments), "--seed", str(args.seed),
+        "--repeat", str(args.repeat), "--budget", str(args.budget),
+    ]
+    if args.data_dir:
+        command += ["--data-dir", args.data_dir]
+    if args.only:
+        command += ["--only", *args.only]
+    return command
+
+
+def run(args):
+    from benchmarks import startup
+
+    results = {"environment": environment(args), "sizes": {}}
+    os.environ["LENDTRACK_BACKEND"] = args.backend
+    env = dict(os.environ, PYTHONPATH=APP_DIR)
+
+    if not args.skip_startup:
+        print(f"Startup: first render per page with {STARTUP_BORROWERS} borrowers", flush=True)
+        results["startup"] = startup.measure(STARTUP_BORROWERS)
+        startup.report(results["startup"], top=3)
+
+    for size in ([] if args.startup_only else args.sizes):
+        print(f"{size} borrowers ({args.backend}, {args.payments} payments each)", flush=True)
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+            output = f.name
+        try:
+            subprocess.run(child_command(args, size, output), cwd=APP_DIR, env=env, check=True)
+            with open(output) as f:
+                results["sizes"][str(size)] = json.load(f)
+        finally:
+            os.remove(output)
+
+    path = args.output
+    if path is None:
+        env_info = results["environment"]
+        name = f"{env_info['commit'] or 'nocommit'}{'-dirty' if env_info['dirty'] else ''}-{args.backend}.json"
+        path = os.path.join(RESULTS_DIR, name)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {path}")
+    return results
+
+
+def compare(base_path, new_path):
+    with open(base_path) as f:
+        base = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"base {base['environment']['commit']}  new {new['environment']['commit']}  (median ms)")
+    if "startup" in new:
+        print(f"{'startup':>10} {'page':<24} {'base':>10} {'new':>10} {'change':>8}")
+        for page, result in new["startup"].items():
+            new_ms = result["first_render_seconds"] * 1000
+            before = base.get("startup", {}).get(page)
+            if before is None:
+                print(f"{'':>10} {page:<24} {'-':>10} {new_ms:>10.2f} {'':>8}")
+                continue
+            base_ms = before["first_render_seconds"] * 1000
+            print(f"{'':>10} {page:<24} {base_ms:>10.2f} {new_ms:>10.2f} {new_ms / base_ms:>7.2f}x")
+    print(f"{'borrowers':>10} {'scenario':<24} {'base':>10} {'new':>10} {'change':>8}")
+    for size, result in new["sizes"].items():
+        before = base["sizes"].get(size, {}).get("scenarios", {})
+        for name, stats in result["scenarios"].items():
+            new_ms = stats["median"] * 1000
+            if name not in before:
+                print(f"{size:>10} {name:<24} {'-':>10} {new_ms:>10.2f} {'':>8}")
+                continue
+            base_ms = before[name]["median"] * 1000
+            print(f"{size:>10} {name:<24} {base_ms:>10.2f} {new_ms:>10.2f} {new_ms / base_ms:>7.2f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the LendTrack benchmark suite")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--payments", type=int, default=12, help="payments per borrower")
+    parser.add_argument("--backend", choices=("xlsx", "sqlite"), default=os.environ.get("LENDTRACK_BACKEND", "xlsx"))
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per scenario")
+    parser.add_argument("--budget", type=float, default=30.0, help="seconds after which a scenario stops repeating")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="+", help="run only these scenarios")
+    parser.add_argument("--data-dir", help="keep generated ledgers here and reuse them on later runs")
+    parser.add_argument("--output", help="results file (default benchmarks/results/<commit>-<backend>.json)")
+    parser.add_argument("--skip-startup", action="store_true", help="do not profile first render and imports")
+    parser.add_argument("--startup-only", action="store_true", help="only profile first render and imports")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="compare two results files")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--child-output", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+    elif args.child is not None:
+        result = run_size(args, args.child)
+        with open(args.child_output, "w") as f:
+            json.dump(result, f)
+    else:
+        run(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,38 +1,12 @@
-import os
-from datetime import datetime
-from openpyxl import Workbook
-from core.utils import get_member_path
-
-def add_member(name, loan_amount, interest_rate, loan_period, monthly_interest):
-    if not name.strip() or loan_amount < 0 or interest_rate < 0 or loan_period < 1:
-        return False  # Invalid inputs
-
-    filename = get_member_path(name)
-    if os.path.exists(filename):
-        return False  # Member already exists
+from core.ledger import create_borrower
+from core.schedule import DEFAULT_METHOD
 
+def add_member(name, loan_amount, interest_rate, loan_period, monthly_interest, repayment=DEFAULT_METHOD, tenant=None):
     try:
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Payments"
-
-        # Header Row
-        ws.append([
-            "Name", "Loan Amount", "Interest Rate (%)", "Start Date",
-            "Loan Period (Months)", "Monthly Interest",
-            "Payment Date", "Amount Paid", "Notes"
-        ])
-
-        # Borrower Info
-        ws.append([
-            name, loan_amount, interest_rate,
-            datetime.now().strftime("%Y-%m-%d"),
-            loan_period, monthly_interest,
-            "", "", ""
-        ])
-
-        wb.save(filename)
+        create_borrower(name, loan_amount, interest_rate, loan_period, monthly_interest, repayment, tenant=tenant)
         return True
+    except (ValueError, FileExistsError):
+        return False  # Invalid inputs or member already exists
     except Exception as e:
         print(f"Error saving member data: {e}")
-        return False
\ No newline at end of file
+        return False
@@ -0,0 +1,162 @@
+import threading
+from datetime import date
+import numpy as np
+import pandas as pd
+from core.models import NO_DATE
+from core.schedule import build_schedule, next_due, total_due
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _ordinal_months(ordinals):
+    # Date ordinals to month indexes without going through date objects;
+    # NO_DATE maps to -1
+    days = (ordinals - EPOCH_ORDINAL).astype("datetime64[D]")
+    months = days.astype("datetime64[M]").astype(np.int64) + 1970 * 12
+    return np.where(ordinals == NO_DATE, -1, months)
+
+
+def _month_index(values):
+    # Calendar months as a single integer (year * 12 + month - 1); -1 when
+    # the date cannot be parsed
+    parsed = pd.to_datetime(pd.Series(values, dtype="object").astype(str), errors="coerce", format="mixed")
+    months = parsed.dt.year * 12 + parsed.dt.month - 1
+    return months.fillna(-1).to_numpy(dtype=np.int64)
+
+
+def _month_label(index):
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+class Ledger:
+    # All borrowers and payments as flat columns: one row per borrower in the
+    # borrower arrays, one row per payment with borrower_idx pointing back.
+    # due and next_due come from each borrower's repayment schedule; next_due
+    # is a date ordinal, NO_DUE_DATE once the schedule is paid off.
+
+    NO_DUE_DATE = np.iinfo(np.int64).max
+
+    def __init__(self, names, loan_amount, due, next_due, borrower_idx, amount, payment_month):
+        self.names = names
+        self.loan_amount = loan_amount
+        self.due = due
+        self.next_due = next_due
+        self.borrower_idx = borrower_idx
+        self.amount = amount
+        self.payment_month = payment_month
+
+    @classmethod
+    def from_records(cls, borrowers):
+        # borrowers are core.models.Borrower records; their payment columns
+        # are joined as they are, without a Python object per payment
+        names, loans, dues, next_dues, counts = [], [], [], [], []
+        amounts, dates = [], []
+        unparsed, offset = {}, 0
+
+        for borrower in borrowers:
+            payments = borrower.payments
+            names.append(borrower.name)
+            loans.append(borrower.loan_amount)
+            counts.append(len(payments))
+            amounts.append(payments.amounts)
+            dates.append(payments.dates)
+            for i, value in payments.unparsed_dates.items():
+                unparsed[offset + i] = value
+            offset += len(payments)
+            packed = build_schedule(borrower.info())
+            due = next_due(borrower.start_date, packed, payments.total())
+            dues.append(total_due(packed))
+            next_dues.append(due[1].toordinal() if due else cls.NO_DUE_DATE)
+
+        amount = np.concatenate([np.frombuffer(a, dtype=np.float64) for a in amounts] or [np.zeros(0)])
+        ordinals = np.concatenate([np.frombuffer(d, dtype=np.int32) for d in dates] or [np.zeros(0, np.int32)])
+        payment_month = _ordinal_months(ordinals.astype(np.int64))
+        if unparsed:
+            # Dates imported as text in other formats
+            positions = np.fromiter(unparsed, dtype=np.int64, count=len(unparsed))
+            payment_month[positions] = _month_index(list(unparsed.values()))
+
+        return cls(
+            names,
+            np.asarray(loans, dtype=np.float64),
+            np.asarray(dues, dtype=np.float64),
+            np.asarray(next_dues, dtype=np.int64),
+            np.repeat(np.arange(len(names), dtype=np.int64), counts),
+            amount,
+            payment_month,
+        )
+
+    def __len__(self):
+        return len(self.names)
+
+    def paid(self):
+        return np.bincount(self.borrower_idx, weights=self.amount, minlength=len(self))
+
+    def interest_due(self):
+        return self.due
+
+    def outstanding_interest(self):
+        return self.interest_due() - self.paid()
+
+    def progress(self):
+        due = self.interest_due()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(due > 0, self.paid() / due, 0.0)
+        return np.clip(ratio, 0.0, 1.0)
+
+    def overdue(self, today=None):
+        today = today or date.today()
+        return self.next_due < today.toordinal()
+
+    def totals(self):
+        paid = self.paid()
+        due = self.interest_due()
+        return {
+            "borrowers": len(self),
+            "loan_amount": float(self.loan_amount.sum()),
+            "interest_paid": float(paid.sum()),
+            "interest_due": float(due.sum()),
+            "outstanding_interest": float((due - paid).sum()),
+            "overdue": int(self.overdue().sum()),
+        }
+
+    def interest_by_month(self):
+        valid = self.payment_month >= 0
+        if not valid.any():
+            return pd.Series(dtype=np.float64, name="Interest Collected")
+        months = self.payment_month[valid]
+        first = int(months.min())
+        sums = np.bincount(months - first, weights=self.amount[valid])
+        labels = [_month_label(first + i) for i in range(len(sums))]
+        return pd.Series(sums, index=labels, name="Interest Collected")
+
+    def borrower_frame(self):
+        paid = self.paid()
+        return pd.DataFrame({
+            "Borrower": self.names,
+            "Loan Amount": self.loan_amount,
+            "Total Paid": paid,
+            "Outstanding Due": self.interest_due() - paid,
+            "Progress": self.progress(),
+            "Overdue": self.overdue(),
+        })
+
+
+_cached = {}
+_cached_lock = threading.Lock()
+
+
+def load_ledger(storage):
+    # Rebuilt only when the storage reports a new version, so reruns with
+    # unchanged data reuse the arrays
+    storage.refresh()
+    version = storage.version()
+    key = id(storage)
+    with _cached_lock:
+        cached = _cached.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+    ledger = Ledger.from_records(storage.iter_ledger())
+    with _cached_lock:
+        _cached[key] = (version, ledger)
+    return ledger
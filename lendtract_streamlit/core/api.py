@@ -0,0 +1,321 @@
+import sys
+import json
+import time
+import hashlib
+import logging
+import argparse
+import threading
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+from starlette.routing import Mount, Route, Router
+from core import ledger, metrics, tenants
+from core.utils import MEMBERS_DIR
+from core.storage import get_storage
+from core.report import get_pdf
+
+logger = logging.getLogger(__name__)
+
+# HTTP API over core.ledger for clients that cannot use the Streamlit pages.
+# Run with `python -m core.api` (needs uvicorn) or any ASGI server pointed at
+# core.api:app. Storage calls block, so they run in Starlette's thread pool;
+# the SQLite backend keeps one connection per pool thread. The routes below
+# serve the default tenant at / and every other tenant under
+# /tenants/{tenant}/, each against its own partition.
+
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 500
+# Changes made by other processes reach the summary index at most this late
+REFRESH_INTERVAL = 5.0
+
+
+class JSON(JSONResponse):
+    # Dates from workbooks are datetime objects
+    def render(self, content):
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _error(status, message):
+    return JSON({"error": message}, status_code=status)
+
+
+async def _not_found(request, e):
+    return _error(404, f"Borrower not found: {e.args[0] if e.args else ''}")
+
+
+async def _bad_request(request, e):
+    return _error(400, str(e))
+
+
+async def _conflict(request, e):
+    return _error(409, str(e))
+
+
+class RequestTimer:
+    # ASGI middleware timing each request under the endpoint the router
+    # matched, which it records in the scope
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            endpoint = getattr(scope.get("endpoint"), "__name__", "unmatched")
+            metrics.observe("api.request", time.perf_counter() - start, endpoint=endpoint, method=scope["method"])
+
+
+async def prometheus(request):
+    # Scrapers authenticate with "Authorization: Bearer <LENDTRACK_ADMIN_TOKEN>"
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not metrics.is_admin(token.strip()):
+        return _error(401, "Admin token required")
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+class Api:
+
+    def __init__(self, storage=None, members_dir=MEMBERS_DIR):
+        self._storage = storage
+        self.members_dir = members_dir
+        self._refreshed = 0.0
+        self._refresh_lock = threading.Lock()
+
+    @property
+    def storage(self):
+        if self._storage is None:
+            self._storage = get_storage(self.members_dir)
+        return self._storage
+
+    def _version(self):
+        # Picks up other writers' changes without a directory scan per request
+        if time.monotonic() - self._refreshed >= REFRESH_INTERVAL and self._refresh_lock.acquire(blocking=False):
+            try:
+                self.storage.refresh()
+                self._refreshed = time.monotonic()
+            finally:
+                self._refresh_lock.release()
+        return self.storage.version()
+
+    async def _conditional(self, request, build):
+        # The ETag is derived from the storage version and the URL, so a
+        # matching If-None-Match is answered without loading anything
+        version = await run_in_threadpool(self._version)
+        etag = 'W/"' + hashlib.sha1(repr((version, str(request.url.path), str(request.url.query))).encode()).hexdigest() + '"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=headers)
+        response = await run_in_threadpool(build)
+        response.headers.update(headers)
+        return response
+
+    @staticmethod
+    def _page(request):
+        try:
+            page = int(request.query_params.get("page", 0))
+            page_size = int(request.query_params.get("page_size", DEFAULT_PAGE_SIZE))
+        except ValueError:
+            raise ValueError("page and page_size must be integers")
+        if page < 0 or not 1 <= page_size <= MAX_PAGE_SIZE:
+            raise ValueError(f"page must be >= 0 and page_size between 1 and {MAX_PAGE_SIZE}")
+        return page, page_size
+
+    async def list_borrowers(self, request):
+        params = request.query_params
+        page, page_size = self._page(request)
+        try:
+            filters = {
+                "prefix": params.get("prefix") or None,
+                "min_balance": float(params["min_balance"]) if params.get("min_balance") else None,
+                "max_balance": float(params["max_balance"]) if params.get("max_balance") else None,
+                "overdue": {"true": True, "false": False}.get(params.get("overdue", "").lower()),
+                "sort": params.get("sort", "name"),
+                "descending": params.get("descending", "").lower() == "true",
+            }
+        except ValueError:
+            raise ValueError("min_balance and max_balance must be numbers")
+
+        def build():
+            rows, total = self.storage.query(**filters, page=page, page_size=page_size)
+            return JSON({
+                "items": rows, "total": total, "page": page, "page_size": page_size,
+                "pages": (total + page_size - 1) // page_size,
+            })
+
+        return await self._conditional(request, build)
+
+    async def create_borrower(self, request):
+        body = await request.json()
+        missing = [f for f in ("name", "loan_amount", "interest_rate", "loan_period") if f not in body]
+        if missing:
+            raise ValueError(f"Missing fields: {', '.join(missing)}")
+        info = await run_in_threadpool(
+            ledger.create_borrower, body["name"], body["loan_amount"], body["interest_rate"],
+            body["loan_period"], body.get("monthly_interest"), body.get("repayment", "flat"),
+            body.get("start_date"), self.storage,
+        )
+        return JSON(info, status_code=201, headers={"Location": f"/borrowers/{info['name']}"})
+
+    async def get_borrower(self, request):
+        name = request.path_params["name"]
+
+        def build():
+            profile = ledger.borrower_profile(name, self.storage)
+            payments = profile.pop("payments")
+            profile["payment_count"] = len(payments)
+            return JSON(profile)
+
+        return await self._conditional(request, build)
+
+    async def update_borrower(self, request):
+        name = request.path_params["name"]
+        changes = await request.json()
+        await run_in_threadpool(ledger.update_borrower, name, changes, self.storage)
+        profile = await run_in_threadpool(ledger.borrower_profile, name, self.storage)
+        profile.pop("payments")
+        return JSON(profile)
+
+    async def delete_borrower(self, request):
+        await run_in_threadpool(ledger.delete_borrower, request.path_params["name"], self.storage)
+        return Response(status_code=204)
+
+    async def list_payments(self, request):
+        name = request.path_params["name"]
+        page, page_size = self._page(request)
+
+        def build():
+            payments = ledger.borrower_profile(name, self.storage)["payments"]
+            items = [
+                {"date": p.date, "amount": p.amount, "note": p.note or ""}
+                for p in payments[page * page_size:(page + 1) * page_size]
+            ]
+            return JSON({
+                "items": items, "total": len(payments), "page": page, "page_size": page_size,
+                "pages": (len(payments) + page_size - 1) // page_size,
+            })
+
+        return await self._conditional(request, build)
+
+    async def add_payment(self, request):
+        name = request.path_params["name"]
+        body = await request.json()
+        if "amount" not in body:
+            raise ValueError("Missing fields: amount")
+        await run_in_threadpool(
+            ledger.add_payment, name, body["amount"], body.get("date"), body.get("note", ""), self.storage,
+        )
+        return JSON({"name": name, "amount": float(body["amount"])}, status_code=201)
+
+    async def get_schedule(self, request):
+        name = request.path_params["name"]
+
+        def build():
+            return JSON(ledger.borrower_schedule(ledger.borrower_profile(name, self.storage)))
+
+        return await self._conditional(request, build)
+
+    async def get_report(self, request):
+        name = request.path_params["name"]
+
+        def build():
+            profile = ledger.borrower_profile(name, self.storage)
+            return Response(
+                get_pdf(profile["info"], profile["payments"], self.members_dir), media_type="application/pdf",
+                headers={"Content-Disposition": f'attachment; filename="{name}_report.pdf"'},
+            )
+
+        return await self._conditional(request, build)
+
+    async def summary(self, request):
+        def build():
+            count, loan_total, paid_total = self.storage.totals()
+            _, overdue = self.storage.query(overdue=True, page_size=1)
+            return JSON({
+                "borrowers": count, "loan_amount": loan_total,
+                "interest_paid": paid_total, "overdue": overdue,
+            })
+
+        return await self._conditional(request, build)
+
+    def routes(self):
+        return [
+            Route("/summary", self.summary),
+            Route("/borrowers", self.list_borrowers),
+            Route("/borrowers", self.create_borrower, methods=["POST"]),
+            Route("/borrowers/{name}", self.get_borrower),
+            Route("/borrowers/{name}", self.update_borrower, methods=["PATCH"]),
+            Route("/borrowers/{name}", self.delete_borrower, methods=["DELETE"]),
+            Route("/borrowers/{name}/payments", self.list_payments),
+            Route("/borrowers/{name}/payments", self.add_payment, methods=["POST"]),
+            Route("/borrowers/{name}/schedule", self.get_schedule),
+            Route("/borrowers/{name}/report.pdf", self.get_report),
+        ]
+
+
+class TenantApps:
+    # ASGI app behind /tenants/{tenant}: one router and Api per tenant,
+    # made on the tenant's first request
+
+    def __init__(self):
+        self._apps = {}
+        self._lock = threading.Lock()
+
+    def app(self, tenant):
+        with self._lock:
+            app = self._apps.get(tenant)
+            if app is None:
+                app = self._apps[tenant] = Router(routes=Api(members_dir=tenants.members_dir(tenant)).routes())
+            return app
+
+    async def __call__(self, scope, receive, send):
+        tenant = scope["path_params"]["tenant"]
+        try:
+            tenants.validate(tenant)
+        except ValueError as e:
+            return await _error(400, str(e))(scope, receive, send)
+        if not tenants.exists(tenant):
+            return await _error(404, f"Tenant not found: {tenant}")(scope, receive, send)
+        await self.app(tenant)(scope, receive, send)
+
+
+def create_app(storage=None, members_dir=MEMBERS_DIR, expose_metrics=True):
+    routes = Api(storage, members_dir).routes()
+    routes.append(Mount("/tenants/{tenant}", app=TenantApps()))
+    if expose_metrics:
+        routes.append(Route("/metrics", prometheus))
+    return Starlette(
+        routes=routes,
+        middleware=[Middleware(RequestTimer)],
+        exception_handlers={KeyError: _not_found, ValueError: _bad_request, FileExistsError: _conflict},
+    )
+
+
+app = create_app()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the LendTrack HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--members-dir", default=MEMBERS_DIR)
+    parser.add_argument("--no-metrics", action="store_true", help="do not serve /metrics")
+    args = parser.parse_args(argv)
+
+    try:
+        import uvicorn
+    except ImportError:
+        raise RuntimeError("Serving the API needs uvicorn (pip install uvicorn)")
+
+    # Keep-alive lets clients reuse one connection for many requests
+    uvicorn.run(create_app(members_dir=args.members_dir, expose_metrics=not args.no_metrics), host=args.host, port=args.port,
+                timeout_keep_alive=30, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+import io
+import os
+import csv
+import math
+import sys
+import time
+import logging
+import argparse
+from datetime import date
+from core.utils import MEMBERS_DIR, validate_name
+from core.storage import get_storage
+from core import tenants
+from core.ledger import _terms
+from core.schedule import DEFAULT_METHOD, parse_date
+
+logger = logging.getLogger(__name__)
+
+# Accepted column headers (case-insensitive) for each field. A row that has
+# loan fields defines a borrower; a row with payment fields adds a payment.
+# One row may do both.
+COLUMNS = {
+    "name": ("name", "borrower", "borrower name"),
+    "loan_amount": ("loan_amount", "loan amount"),
+    "interest_rate": ("interest_rate", "interest rate", "interest rate (%)"),
+    "start_date": ("start_date", "start date"),
+    "loan_period": ("loan_period", "loan period", "loan period (months)"),
+    "monthly_interest": ("monthly_interest", "monthly interest"),
+    "repayment": ("repayment", "repayment method", "method"),
+    "payment_date": ("payment_date", "payment date", "date"),
+    "amount": ("amount", "amount paid", "amount_paid"),
+    "note": ("note", "notes"),
+}
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportReport:
+
+    def __init__(self):
+        self.rows = 0
+        self.borrowers = 0
+        self.payments = 0
+        self.error_count = 0
+        self.errors = []
+        self.seconds = 0.0
+
+    def error(self, where, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((where, message))
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (
+            f"{self.rows} rows in {self.seconds:.1f}s ({self.rows_per_second:,.0f} rows/s): "
+            f"{self.borrowers} borrowers, {self.payments} payments, {self.error_count} errors"
+        )
+
+
+def _field_map(header):
+    lookup = {alias: field for field, aliases in COLUMNS.items() for alias in aliases}
+    mapping = {}
+    for position, title in enumerate(header):
+        field = lookup.get(str(title or "").strip().lower())
+        if field is not None and field not in mapping:
+            mapping[field] = position
+    if "name" not in mapping:
+        raise ValueError("Import file needs a name column")
+    return mapping
+
+
+def _records(rows):
+    rows = iter(rows)
+    mapping = _field_map(next(rows, []))
+    for row in rows:
+        yield {
+            field: (row[position] if position < len(row) else None)
+            for field, position in mapping.items()
+        }
+
+
+def read_records(source, kind=None):
+    # Streams dict records from a CSV or xlsx path or binary file object
+    name = source if isinstance(source, str) else getattr(source, "name", "")
+    kind = kind or ("xlsx" if str(name).lower().endswith(".xlsx") else "csv")
+
+    if kind == "xlsx":
+        from openpyxl import load_workbook
+        wb = load_workbook(source, read_only=True)
+        try:
+            yield from _records(wb.active.iter_rows(values_only=True))
+        finally:
+            wb.close()
+        return
+
+    if isinstance(source, str):
+        with open(source, newline="", encoding="utf-8-sig") as f:
+            yield from _records(csv.reader(f))
+    else:
+        yield from _records(csv.reader(io.TextIOWrapper(source, newline="", encoding="utf-8-sig")))
+
+
+def _blank(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _text_date(value):
+    # Cells may hold dates, datetimes or text; the result is YYYY-MM-DD
+    parsed = parse_date(value.strip() if isinstance(value, str) else value)
+    if parsed is None:
+        raise ValueError(f"invalid date: {value}")
+    return parsed.isoformat()
+
+
+def _borrower_info(record, name):
+    # The same checks as ledger.create_borrower
+    loan_period = record.get("loan_period") or 0
+    if isinstance(loan_period, str):
+        # Spreadsheets and CSV exports may write whole numbers as "12.0"
+        loan_period = float(loan_period)
+    monthly = record.get("monthly_interest")
+    return {"name": name, **_terms({
+        "loan_amount": record["loan_amount"],
+        "interest_rate": record.get("interest_rate") or 0,
+        "start_date": record["start_date"] if not _blank(record.get("start_date")) else date.today(),
+        "loan_period": loan_period,
+        "monthly_interest": None if _blank(monthly) else monthly,
+        "repayment": str(record.get("repayment") or DEFAULT_METHOD).strip().lower(),
+    })}
+
+
+def import_ledger(source, storage=None, kind=None):
+    # Validates and groups every row by borrower, then hands each borrower's
+    # data to the storage in a single write
+    storage = storage or get_storage()
+    report = ImportReport()
+    start = time.perf_counter()
+    groups = {}
+
+    try:
+        for row_number, record in enumerate(read_records(source, kind), start=2):
+            report.rows += 1
+            name = "" if _blank(record.get("name")) else str(record["name"]).strip()
+            if not name:
+                report.error(f"row {row_number}", "missing borrower name")
+                continue
+            try:
+                validate_name(name)
+                info = None
+                if not _blank(record.get("loan_amount")):
+                    info = _borrower_info(record, name)
+                payment = None
+                if not _blank(record.get("amount")):
+                    amount = float(record["amount"])
+                    if not math.isfinite(amount) or amount < 0:
+                        raise ValueError("payment amount must be a number >= 0")
+                    payment = (
+                        _text_date(record["payment_date"]) if not _blank(record.get("payment_date")) else "",
+                        amount,
+                        "" if _blank(record.get("note")) else str(record["note"]),
+                    )
+            except (TypeError, ValueError) as e:
+                report.error(f"row {row_number}", str(e))
+                continue
+
+            group = groups.get(name)
+            if group is None:
+                group = groups[name] = [None, []]
+            if info is not None:
+                if group[0] is not None and group[0] != info:
+                    report.error(f"row {row_number}", f"conflicting loan details for {name}")
+                    continue
+                group[0] = info
+            if payment is not None:
+                group[1].append(payment)
+    except (OSError, ValueError) as e:
+        report.error("file", str(e))
+
+    created, written, errors = storage.import_groups(
+        (name, info, payments) for name, (info, payments) in groups.items()
+    )
+    report.borrowers = created
+    report.payments = written
+    for name, message in errors:
+        report.error(name, message)
+
+    report.seconds = time.perf_counter() - start
+    logger.info(f"Bulk import: {report}")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import borrowers and payments from a CSV or xlsx file")
+    parser.add_argument("source")
+    parser.add_argument("--members-dir", default=MEMBERS_DIR)
+    tenants.add_tenant_argument(parser)
+    args = parser.parse_args(argv)
+
+    members_dir = tenants.resolve_members_dir(args)
+    os.makedirs(members_dir, exist_ok=True)
+    report = import_ledger(args.source, get_storage(members_dir))
+    print(report)
+    for where, message in report.errors[:20]:
+        print(f"  {where}: {message}")
+    return 1 if report.error_count else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
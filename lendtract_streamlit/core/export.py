@@ -0,0 +1,146 @@
+import os
+import csv
+import sys
+import time
+import argparse
+import logging
+from core.utils import MEMBERS_DIR
+from core.storage import get_storage
+from core import tenants
+from core.schedule import build_schedule, total_due
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("xlsx", "csv", "parquet")
+BATCH_ROWS = 10000
+
+# One row per payment with the borrower's loan details repeated, plus one
+# row for each borrower without payments. The column names match what
+# core.bulk_import accepts, so a CSV export can be imported again.
+LEDGER_COLUMNS = [
+    "Name", "Loan Amount", "Interest Rate (%)", "Start Date", "Loan Period (Months)",
+    "Monthly Interest", "Repayment Method", "Payment Date", "Amount Paid", "Notes",
+]
+BORROWER_COLUMNS = [
+    "Name", "Loan Amount", "Interest Rate (%)", "Start Date", "Loan Period (Months)",
+    "Monthly Interest", "Repayment Method", "Paid", "Payments", "Remaining",
+]
+PAYMENT_COLUMNS = ["Name", "Payment Date", "Amount Paid", "Notes"]
+
+
+def _borrower_fields(borrower):
+    return [
+        borrower.name, borrower.loan_amount, borrower.interest_rate, str(borrower.start_date or ""),
+        borrower.loan_period, borrower.monthly_interest, borrower.repayment,
+    ]
+
+
+def iter_ledger_rows(ledger):
+    for borrower in ledger:
+        fields = _borrower_fields(borrower)
+        if not borrower.payments:
+            yield fields + ["", None, ""]
+        for payment_date, amount, note in borrower.payments:
+            yield fields + [str(payment_date or ""), amount, note or ""]
+
+
+def _write_xlsx(ledger, out):
+    # write_only sheets stream rows to temporary files, so neither sheet is
+    # held in memory
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    borrowers = wb.create_sheet("Borrowers")
+    payments_ws = wb.create_sheet("Payments")
+    borrowers.append(BORROWER_COLUMNS)
+    payments_ws.append(PAYMENT_COLUMNS)
+
+    rows = 0
+    for borrower in ledger:
+        paid = borrower.total_paid()
+        due = total_due(build_schedule(borrower.info()))
+        borrowers.append(_borrower_fields(borrower) + [paid, len(borrower.payments), due - paid])
+        for payment_date, amount, note in borrower.payments:
+            payments_ws.append([borrower.name, str(payment_date or ""), amount, note or ""])
+            rows += 1
+    wb.save(out)
+    return rows
+
+
+def _write_csv(ledger, out):
+    rows = 0
+    with open(out, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(LEDGER_COLUMNS)
+        for row in iter_ledger_rows(ledger):
+            writer.writerow(row)
+            rows += 1
+    return rows
+
+
+def _write_parquet(ledger, out):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+
+    schema = pa.schema([
+        ("name", pa.string()), ("loan_amount", pa.float64()), ("interest_rate", pa.float64()),
+        ("start_date", pa.string()), ("loan_period", pa.int64()), ("monthly_interest", pa.float64()),
+        ("repayment", pa.string()),
+        ("payment_date", pa.string()), ("amount", pa.float64()), ("note", pa.string()),
+    ])
+
+    rows = 0
+    batch = [[] for _ in schema.names]
+
+    def flush(writer):
+        writer.write_batch(pa.record_batch(
+            [pa.array(column, type=field.type) for column, field in zip(batch, schema)], schema=schema,
+        ))
+        for column in batch:
+            column.clear()
+
+    with pq.ParquetWriter(out, schema) as writer:
+        for row in iter_ledger_rows(ledger):
+            for column, value in zip(batch, row):
+                column.append(value)
+            rows += 1
+            if len(batch[0]) >= BATCH_ROWS:
+                flush(writer)
+        if batch[0]:
+            flush(writer)
+    return rows
+
+
+WRITERS = {"xlsx": _write_xlsx, "csv": _write_csv, "parquet": _write_parquet}
+
+
+def export_ledger(out, fmt="xlsx", storage=None):
+    # Streams every borrower and payment into one file; memory is bounded by
+    # a single borrower's history plus one write batch, not the ledger size
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    storage = storage or get_storage()
+    storage.refresh()
+    return WRITERS[fmt](storage.iter_ledger(cached=False), out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the whole ledger to one file")
+    parser.add_argument("--format", choices=FORMATS, default="xlsx")
+    parser.add_argument("--out")
+    parser.add_argument("--members-dir", default=MEMBERS_DIR)
+    tenants.add_tenant_argument(parser)
+    args = parser.parse_args(argv)
+
+    out = args.out or f"ledger.{args.format}"
+    start = time.perf_counter()
+    rows = export_ledger(out, args.format, get_storage(tenants.resolve_members_dir(args)))
+    print(f"Wrote {rows} payment rows to {out} in {time.perf_counter() - start:.1f}s "
+          f"({os.path.getsize(out) / 1024 / 1024:.1f} MiB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,317 @@
+import os
+import sqlite3
+import logging
+import threading
+from contextlib import closing
+from datetime import date
+from core.utils import MEMBERS_DIR
+from core.journal import member_stat
+from core.parse_cache import read_member_summary
+from core.scanner import scan_summaries
+from core import metrics, schedule
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = ".index.sqlite"
+COMMIT_EVERY = 200
+# Bumped whenever the borrowers table changes; an older index is dropped and
+# rebuilt from the workbooks on the next sync
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS borrowers (
+    file TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    loan_amount REAL NOT NULL DEFAULT 0,
+    interest_rate REAL NOT NULL DEFAULT 0,
+    start_date TEXT,
+    loan_period INTEGER NOT NULL DEFAULT 0,
+    monthly_interest REAL NOT NULL DEFAULT 0,
+    total_paid REAL NOT NULL DEFAULT 0,
+    payment_count INTEGER NOT NULL DEFAULT 0,
+    repayment TEXT NOT NULL DEFAULT 'flat',
+    schedule BLOB,
+    total_due REAL NOT NULL DEFAULT 0,
+    next_due_date TEXT,
+    next_due_amount REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS borrowers_name ON borrowers (name);
+CREATE INDEX IF NOT EXISTS borrowers_next_due ON borrowers (next_due_date);
+"""
+
+SUMMARY_COLUMNS = (
+    "name", "loan_amount", "interest_rate", "start_date", "loan_period",
+    "monthly_interest", "total_paid", "payment_count",
+    "repayment", "total_due", "next_due_date", "next_due_amount",
+)
+
+
+def connect(members_dir=MEMBERS_DIR):
+    conn = sqlite3.connect(os.path.join(members_dir, INDEX_FILE), timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    # The index can always be rebuilt from the workbooks
+    conn.execute("PRAGMA synchronous=NORMAL")
+    if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+        with conn:
+            conn.execute("DROP TABLE IF EXISTS borrowers")
+            conn.executescript(SCHEMA)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    schedule.register(conn)
+    return conn
+
+
+_local = threading.local()
+
+
+def reader(members_dir=MEMBERS_DIR):
+    # Per-thread connection for the read-only queries below, which are
+    # cheaper than opening a connection
+    conns = _local.__dict__.setdefault("conns", {})
+    conn = conns.get(members_dir)
+    if conn is None:
+        conn = conns[members_dir] = connect(members_dir)
+    return conn
+
+
+def _stat(path):
+    return member_stat(path)
+
+
+def _upsert(conn, file, stat, summary):
+    packed = schedule.annotate(summary)
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO borrowers (
+            file, name, mtime_ns, size, loan_amount, interest_rate, start_date,
+            loan_period, monthly_interest, total_paid, payment_count,
+            repayment, schedule, total_due, next_due_date, next_due_amount
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            file, str(summary["name"]), stat[0], stat[1],
+            summary["loan_amount"], summary["interest_rate"],
+            str(summary["start_date"] or ""), summary["loan_period"],
+            summary["monthly_interest"], summary["total_paid"],
+            summary["payment_count"], summary["repayment"], packed,
+            summary["total_due"], summary["next_due_date"], summary["next_due_amount"],
+        ),
+    )
+
+
+def update_file(path):
+    # Called right after a workbook write so the index never lags behind it
+    members_dir = os.path.dirname(path) or "."
+    try:
+        summary = read_member_summary(path)
+        with closing(connect(members_dir)) as conn, conn:
+            _upsert(conn, os.path.basename(path), _stat(path), summary)
+    except Exception as e:
+        logger.error(f"Error indexing {path}: {e}")
+
+
+def record_summaries(members_dir, items):
+    # For writers that already know the summary of each (path, summary) they wrote
+    with closing(connect(members_dir)) as conn, conn:
+        for path, summary in items:
+            _upsert(conn, os.path.basename(path), _stat(path), summary)
+
+
+def apply_payment(path, before, amount, count=1):
+    # Incremental update after a journal append; falls back to a re-parse
+    # when the entry was already out of date before this payment
+    members_dir = os.path.dirname(path) or "."
+    try:
+        mtime_ns, size = _stat(path)
+        with closing(connect(members_dir)) as conn, conn:
+            cur = conn.execute(
+                """
+                UPDATE borrowers
+                SET total_paid = total_paid + :amount, payment_count = payment_count + :count,
+                    next_due_date = schedule_next_date(start_date, schedule, total_paid + :amount),
+                    next_due_amount = schedule_next_amount(start_date, schedule, total_paid + :amount),
+                    mtime_ns = :mtime_ns, size = :size
+                WHERE file = :file AND mtime_ns = :before_mtime_ns AND size = :before_size
+                """,
+                {
+                    "amount": float(amount), "count": count,
+                    "mtime_ns": mtime_ns, "size": size, "file": os.path.basename(path),
+                    "before_mtime_ns": before[0], "before_size": before[1],
+                },
+            )
+            updated = cur.rowcount
+    except Exception as e:
+        logger.error(f"Error indexing {path}: {e}")
+        updated = 0
+    if not updated:
+        update_file(path)
+
+
+def restat(path, before):
+    # For writes that move data between files without changing the summary
+    members_dir = os.path.dirname(path) or "."
+    try:
+        with closing(connect(members_dir)) as conn, conn:
+            conn.execute(
+                "UPDATE borrowers SET mtime_ns = ?, size = ? WHERE file = ? AND mtime_ns = ? AND size = ?",
+                (*_stat(path), os.path.basename(path), *before),
+            )
+    except Exception as e:
+        logger.error(f"Error indexing {path}: {e}")
+
+
+def remove_file(path):
+    members_dir = os.path.dirname(path) or "."
+    with closing(connect(members_dir)) as conn, conn:
+        conn.execute("DELETE FROM borrowers WHERE file = ?", (os.path.basename(path),))
+
+
+def iter_sync(members_dir=MEMBERS_DIR, workers=None):
+    # Yields (file, summary, error) for every workbook: unchanged files
+    # straight from the index, changed ones as the scanner finishes them
+    with metrics.timed("members.listdir"):
+        files = [f for f in os.listdir(members_dir) if f.endswith(".xlsx")]
+
+    with closing(connect(members_dir)) as conn:
+        indexed = {
+            row[0]: row[1:]
+            for row in conn.execute(
+                f"SELECT file, mtime_ns, size, {', '.join(SUMMARY_COLUMNS)} FROM borrowers"
+            )
+        }
+
+        stale = {}
+        for file in files:
+            path = os.path.join(members_dir, file)
+            try:
+                stat = _stat(path)
+            except OSError as e:
+                yield file, None, e
+                continue
+            row = indexed.get(file)
+            if row is not None and tuple(row[:2]) == stat:
+                yield file, dict(zip(SUMMARY_COLUMNS, row[2:])), None
+            else:
+                stale[path] = stat
+
+        removed = set(indexed) - set(files)
+        with conn:
+            conn.executemany("DELETE FROM borrowers WHERE file = ?", [(f,) for f in removed])
+
+        pending = 0
+        for path, summary, error in scan_summaries(stale, workers):
+            file = os.path.basename(path)
+            if error is not None:
+                logger.warning(f"Error indexing {file}: {error}")
+                yield file, None, error
+                continue
+            _upsert(conn, file, stale[path], summary)
+            pending += 1
+            if pending >= COMMIT_EVERY:
+                conn.commit()
+                pending = 0
+            yield file, summary, None
+        conn.commit()
+
+
+@metrics.timed("index.sync")
+def sync_index(members_dir=MEMBERS_DIR, workers=None):
+    return [
+        (file, error)
+        for file, _, error in iter_sync(members_dir, workers)
+        if error is not None
+    ]
+
+
+def get_totals(members_dir=MEMBERS_DIR):
+    count, loan_total, paid_total = reader(members_dir).execute(
+        "SELECT COUNT(*), TOTAL(loan_amount), TOTAL(total_paid) FROM borrowers"
+    ).fetchone()
+    return count, loan_total, paid_total
+
+
+def get_version(members_dir=MEMBERS_DIR):
+    # Changes whenever any indexed workbook or journal changes
+    return reader(members_dir).execute(
+        "SELECT COUNT(*), MAX(mtime_ns), TOTAL(size), TOTAL(total_paid) FROM borrowers"
+    ).fetchone()
+
+
+def get_balance_version(members_dir=MEMBERS_DIR):
+    # Sums of the summary columns balances are computed from; unlike
+    # get_version it stays the same when compaction rewrites a workbook
+    return reader(members_dir).execute(
+        "SELECT COUNT(*), TOTAL(loan_amount), TOTAL(interest_rate), TOTAL(julianday(start_date)),"
+        " TOTAL(loan_period), TOTAL(monthly_interest), TOTAL(total_paid), TOTAL(payment_count),"
+        " TOTAL(total_due) FROM borrowers"
+    ).fetchone()
+
+
+def get_summaries(members_dir=MEMBERS_DIR):
+    rows = reader(members_dir).execute(
+        f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM borrowers ORDER BY name"
+    ).fetchall()
+    return [dict(zip(SUMMARY_COLUMNS, row)) for row in rows]
+
+
+# Shared by the index and the SQLite backend, whose borrowers tables carry
+# the same summary columns. next_due_date is kept current on every payment,
+# so overdue is a range scan on borrowers_next_due.
+REMAINING_SQL = "(total_due - total_paid)"
+OVERDUE_SQL = "(next_due_date IS NOT NULL AND next_due_date < :today)"
+SORT_KEYS = {
+    "name": "name COLLATE NOCASE",
+    "loan_amount": "loan_amount",
+    "remaining": REMAINING_SQL,
+}
+
+
+def query_summaries(conn, prefix=None, min_balance=None, max_balance=None, overdue=None,
+                    sort="name", descending=False, page=0, page_size=25, today=None, key_column="id"):
+    # Each row also gets "key", unique per borrower row (names need not be
+    # unique in the index: two workbooks can carry the same name)
+    if sort not in SORT_KEYS:
+        raise ValueError(f"Unknown sort key: {sort}")
+
+    params = {"today": today or date.today().isoformat()}
+    where = []
+    if prefix:
+        escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        where.append("name LIKE :prefix ESCAPE '\\'")
+        params["prefix"] = f"{escaped}%"
+    if min_balance is not None:
+        where.append(f"{REMAINING_SQL} >= :min_balance")
+        params["min_balance"] = min_balance
+    if max_balance is not None:
+        where.append(f"{REMAINING_SQL} <= :max_balance")
+        params["max_balance"] = max_balance
+    if overdue is not None:
+        where.append(OVERDUE_SQL if overdue else f"NOT {OVERDUE_SQL}")
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+
+    total = conn.execute(f"SELECT COUNT(*) FROM borrowers {where_sql}", params).fetchone()[0]
+
+    params["limit"] = page_size
+    params["offset"] = page * page_size
+    rows = conn.execute(
+        f"""
+        SELECT {', '.join(SUMMARY_COLUMNS)}, {key_column}, {OVERDUE_SQL}
+        FROM borrowers {where_sql}
+        ORDER BY {SORT_KEYS[sort]} {'DESC' if descending else 'ASC'}, name
+        LIMIT :limit OFFSET :offset
+        """,
+        params,
+    ).fetchall()
+
+    page_rows = []
+    for row in rows:
+        summary = dict(zip(SUMMARY_COLUMNS, row))
+        summary["key"] = row[-2]
+        summary["overdue"] = bool(row[-1])
+        page_rows.append(summary)
+    return page_rows, total
+
+
+def query_borrowers(members_dir=MEMBERS_DIR, **filters):
+    return query_summaries(reader(members_dir), key_column="file", **filters)
@@ -0,0 +1,323 @@
+import os
+import json
+import time
+import uuid
+import atexit
+import hashlib
+import logging
+import threading
+from core import metrics
+from core.locks import atomic_save, borrower_lock, thread_lock
+from core.workbook import FIRST_PAYMENT_ROW, read_workbook
+
+logger = logging.getLogger(__name__)
+
+# Payments for the xlsx backend are appended to members/.journal/<name>.jsonl
+# and folded into the workbook's Payments sheet by a background compactor,
+# so a payment costs one small append instead of a full workbook rewrite.
+JOURNAL_DIR = ".journal"
+COMPACTING_SUFFIX = ".compacting"
+
+# A journal append is flushed immediately (other readers see it) but only
+# fsynced every FSYNC_BATCH records or FSYNC_INTERVAL seconds
+FSYNC_BATCH = 32
+FSYNC_INTERVAL = 1.0
+COMPACT_INTERVAL = 30.0
+
+# Every journal file starts with a line naming its batch. The workbook
+# records the digest of the last batch folded into it, and the header keeps
+# two batches holding the same payments (same day, amount and note) from
+# having the same digest.
+
+# Open append handles by journal path, plus the workbook each belongs to
+_handles = {}
+_owners = {}
+_unsynced = {}
+_last_sync = {}
+
+
+def journal_path(path):
+    directory, file = os.path.split(path)
+    stem = os.path.splitext(file)[0]
+    return os.path.join(directory, JOURNAL_DIR, f"{stem}.jsonl")
+
+
+def compacting_path(path):
+    return journal_path(path) + COMPACTING_SUFFIX
+
+
+def member_stat(path):
+    # Combined (mtime_ns, size) of a workbook and its journal files, so the
+    # summary index notices journal-only changes
+    st = os.stat(path)
+    mtime_ns, size = st.st_mtime_ns, st.st_size
+    for extra in (compacting_path(path), journal_path(path)):
+        try:
+            st = os.stat(extra)
+        except FileNotFoundError:
+            continue
+        mtime_ns = max(mtime_ns, st.st_mtime_ns)
+        size += st.st_size
+    return mtime_ns, size
+
+
+def _fsync(jpath):
+    handle = _handles.get(jpath)
+    if handle is not None and _unsynced.get(jpath):
+        os.fsync(handle.fileno())
+    _unsynced[jpath] = 0
+    _last_sync[jpath] = time.monotonic()
+
+
+def _close(jpath):
+    handle = _handles.pop(jpath, None)
+    if handle is not None:
+        if _unsynced.get(jpath):
+            os.fsync(handle.fileno())
+        handle.close()
+    _unsynced.pop(jpath, None)
+
+
+def _open(path, jpath):
+    # A cached handle goes stale when another replica renames the journal
+    # away for compaction; appending to it would write into the batch
+    handle = _handles.get(jpath)
+    if handle is not None:
+        try:
+            current = os.stat(jpath)
+            opened = os.fstat(handle.fileno())
+            if (current.st_dev, current.st_ino) != (opened.st_dev, opened.st_ino):
+                _close(jpath)
+        except FileNotFoundError:
+            _close(jpath)
+
+    if jpath not in _handles:
+        os.makedirs(os.path.dirname(jpath), exist_ok=True)
+        handle = open(jpath, "a", encoding="utf-8")
+        if handle.tell() == 0:
+            handle.write(json.dumps({"batch": uuid.uuid4().hex}) + "\n")
+        _handles[jpath] = handle
+        _owners[jpath] = path
+    return _handles[jpath]
+
+
+def append(path, date, amount, note="", on_appended=None):
+    # on_appended(before_stat) runs while the borrower is still locked, so
+    # derived state such as the summary index is updated in append order
+    append_many(path, [(date, amount, note)], on_appended)
+
+
+def append_many(path, payments, on_appended=None, keep_open=True):
+    # Bulk writers touching many borrowers pass keep_open=False: a cached
+    # handle per borrower would run the process out of file descriptors
+    jpath = journal_path(path)
+    records = "".join(
+        json.dumps({"date": date, "amount": float(amount), "note": note}, ensure_ascii=False) + "\n"
+        for date, amount, note in payments
+    )
+
+    with borrower_lock(path):
+        before = member_stat(path)
+        handle = _open(path, jpath)
+        handle.write(records)
+        handle.flush()
+
+        _unsynced[jpath] = _unsynced.get(jpath, 0) + len(payments)
+        if (_unsynced[jpath] >= FSYNC_BATCH
+                or time.monotonic() - _last_sync.get(jpath, 0) >= FSYNC_INTERVAL):
+            _fsync(jpath)
+        if not keep_open:
+            _close(jpath)
+            _owners.pop(jpath, None)
+
+        if on_appended is not None:
+            on_appended(before)
+
+
+def discard(path):
+    # Drops a deleted borrower's journal; the caller holds both the
+    # workbook and the compacting locks
+    jpath = journal_path(path)
+    _close(jpath)
+    _owners.pop(jpath, None)
+    for file in (jpath, compacting_path(path)):
+        try:
+            os.remove(file)
+        except FileNotFoundError:
+            pass
+
+
+def sync_all():
+    for jpath in list(_handles):
+        # discard() may have dropped the journal since the list was taken
+        owner = _owners.get(jpath)
+        if owner is None:
+            continue
+        try:
+            with thread_lock(owner):
+                _fsync(jpath)
+        except (OSError, ValueError) as e:
+            logger.error(f"Error syncing journal {jpath}: {e}")
+
+
+def _read_lines(jpath):
+    entries = []
+    try:
+        with open(jpath, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn final line from a crash mid-append
+                    logger.warning(f"Skipping unreadable journal line in {jpath}")
+                    continue
+                if "batch" in record:
+                    continue
+                entries.append([record["date"], float(record["amount"]), record.get("note")])
+    except FileNotFoundError:
+        pass
+    return entries
+
+
+def _digest(jpath):
+    with open(jpath, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def signature(path):
+    signature = []
+    for file in (path, compacting_path(path), journal_path(path)):
+        try:
+            st = os.stat(file)
+            signature.append((st.st_ino, st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            signature.append(None)
+    return signature
+
+
+def read_member(path, attempts=5):
+    # The workbook records the digest of the last journal batch folded into
+    # it, so a batch left behind by a crash between saving the workbook and
+    # deleting the batch is never counted twice. Reads that overlap a
+    # rename or fold are retried.
+    cpath = compacting_path(path)
+    for _ in range(attempts):
+        before = signature(path)
+        borrower, folded_digest = read_workbook(path)
+        try:
+            if os.path.exists(cpath) and _digest(cpath) != folded_digest:
+                borrower.payments.extend(_read_lines(cpath))
+        except FileNotFoundError:
+            continue
+        borrower.payments.extend(_read_lines(journal_path(path)))
+        if signature(path) == before:
+            break
+    return borrower
+
+
+def read_member_summary(path):
+    return read_member(path).summary()
+
+
+def compact(path):
+    jpath = journal_path(path)
+    cpath = compacting_path(path)
+
+    with borrower_lock(cpath):
+        # Appends only wait for the rename; later ones start a fresh journal
+        with borrower_lock(path):
+            if not os.path.exists(cpath):
+                if not os.path.exists(jpath) or os.path.getsize(jpath) == 0:
+                    return 0
+                _close(jpath)
+                os.replace(jpath, cpath)
+
+        entries = _read_lines(cpath)
+        digest = _digest(cpath)
+
+        from openpyxl import load_workbook
+        with metrics.timed("workbook.open", mode="edit"):
+            wb = load_workbook(path)
+        if wb.properties.identifier != digest:
+            ws = wb["Payments"]
+            row = FIRST_PAYMENT_ROW
+            while ws.cell(row=row, column=7).value or ws.cell(row=row, column=8).value:
+                row += 1
+            for payment_date, amount, note in entries:
+                ws.cell(row=row, column=7).value = payment_date
+                ws.cell(row=row, column=8).value = amount
+                ws.cell(row=row, column=9).value = note
+                row += 1
+            wb.properties.identifier = digest
+            atomic_save(wb, path)
+        os.remove(cpath)
+
+    return len(entries)
+
+
+def pending_members(members_dir):
+    directory = os.path.join(members_dir, JOURNAL_DIR)
+    try:
+        with metrics.timed("members.listdir"):
+            files = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    stems = set()
+    for file in files:
+        if file.endswith(".jsonl") or file.endswith(".jsonl" + COMPACTING_SUFFIX):
+            stems.add(file.split(".jsonl")[0])
+    return [os.path.join(members_dir, f"{stem}.xlsx") for stem in sorted(stems)]
+
+
+def compact_all(members_dir, on_compacted=None):
+    folded = 0
+    for path in pending_members(members_dir):
+        if not os.path.exists(path):
+            continue
+        try:
+            before = member_stat(path)
+            folded += compact(path)
+            if on_compacted is not None:
+                on_compacted(path, before)
+        except Exception as e:
+            logger.error(f"Error compacting journal for {path}: {e}")
+    return folded
+
+
+# One compactor thread serves every members directory in use (each tenant
+# has its own): members_dir -> [interval, on_compacted, last compaction]
+_compactors = {}
+_compactors_guard = threading.Lock()
+
+
+def _compactor_loop():
+    while True:
+        time.sleep(FSYNC_INTERVAL)
+        try:
+            sync_all()
+        except Exception as e:
+            logger.error(f"Error syncing journals: {e}")
+        with _compactors_guard:
+            entries = list(_compactors.items())
+        for members_dir, entry in entries:
+            interval, on_compacted, last_compact = entry
+            if time.monotonic() - last_compact < interval:
+                continue
+            entry[2] = time.monotonic()
+            try:
+                compact_all(members_dir, on_compacted)
+            except Exception as e:
+                logger.error(f"Error compacting journals for {members_dir}: {e}")
+
+
+def start_compactor(members_dir, interval=COMPACT_INTERVAL, on_compacted=None):
+    with _compactors_guard:
+        if members_dir in _compactors:
+            return
+        first = not _compactors
+        _compactors[members_dir] = [interval, on_compacted, time.monotonic()]
+        if first:
+            threading.Thread(target=_compactor_loop, name="journal-compactor", daemon=True).start()
+
+
+atexit.register(sync_all)
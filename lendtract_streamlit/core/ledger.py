@@ -0,0 +1,135 @@
+import math
+import logging
+from datetime import date
+from core import metrics, tenants
+from core.utils import validate_name
+from core.name_index import add_name, remove_name
+from core.schedule import DEFAULT_METHOD, METHODS, build_schedule, next_due, parse_date, schedule_rows, total_due
+
+logger = logging.getLogger(__name__)
+
+# Borrower operations shared by the Streamlit pages and core.api. Nothing
+# here renders; errors are raised as ValueError (bad input), KeyError
+# (unknown borrower) or FileExistsError (duplicate name). Each call works on
+# one tenant's partition: the storage passed in, or that of tenant (the
+# default tenant when neither is given).
+
+TERM_FIELDS = ("loan_amount", "interest_rate", "start_date", "loan_period", "monthly_interest", "repayment")
+
+
+def _terms(values):
+    terms = {}
+    try:
+        for field in ("loan_amount", "interest_rate", "monthly_interest"):
+            if field == "monthly_interest" and values.get(field) is None:
+                continue
+            if field in values:
+                terms[field] = float(values[field])
+        if "loan_period" in values:
+            terms["loan_period"] = int(values["loan_period"])
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(f"Invalid loan terms: {values}")
+    if not all(math.isfinite(terms[f]) for f in ("loan_amount", "interest_rate", "monthly_interest") if f in terms):
+        raise ValueError(f"Invalid loan terms: {values}")
+    if "monthly_interest" in values and "monthly_interest" not in terms:
+        # No monthly interest given: the loan's rate applied to its amount
+        if "loan_amount" not in terms or "interest_rate" not in terms:
+            raise ValueError("Monthly interest needs the loan amount and interest rate")
+        terms["monthly_interest"] = terms["loan_amount"] * terms["interest_rate"] / 100
+    if "start_date" in values:
+        start = parse_date(values["start_date"])
+        if start is None:
+            raise ValueError(f"Invalid start date: {values['start_date']}")
+        terms["start_date"] = start.isoformat()
+    if "repayment" in values:
+        if values["repayment"] not in METHODS:
+            raise ValueError(f"Repayment method must be one of {', '.join(METHODS)}")
+        terms["repayment"] = values["repayment"]
+
+    if terms.get("loan_amount", 0) < 0 or terms.get("interest_rate", 0) < 0 or terms.get("loan_period", 1) < 1:
+        raise ValueError("Loan amount and interest rate must be >= 0 and loan period >= 1")
+    return terms
+
+
+def _require(storage, name):
+    if not name or not storage.exists(name):
+        raise KeyError(name)
+
+
+def create_borrower(name, loan_amount, interest_rate, loan_period, monthly_interest=None,
+                    repayment=DEFAULT_METHOD, start_date=None, storage=None, tenant=None):
+    storage = storage or tenants.get_storage(tenant)
+    if not name or not name.strip():
+        raise ValueError("Borrower name cannot be empty")
+    validate_name(name)
+    info = {"name": name, **_terms({
+        "loan_amount": loan_amount, "interest_rate": interest_rate, "loan_period": loan_period,
+        "start_date": start_date or date.today(), "repayment": repayment,
+        "monthly_interest": monthly_interest,
+    })}
+    if storage.exists(name):
+        raise FileExistsError(f"Borrower already exists: {name}")
+
+    storage.add_borrower(info)
+    add_name(storage, name)
+    return info
+
+
+def update_borrower(name, changes, storage=None, tenant=None):
+    storage = storage or tenants.get_storage(tenant)
+    unknown = set(changes) - set(TERM_FIELDS)
+    if unknown:
+        raise ValueError(f"Cannot change {', '.join(sorted(unknown))}")
+    _require(storage, name)
+    storage.update_borrower(name, _terms(changes))
+
+
+def delete_borrower(name, storage=None, tenant=None):
+    storage = storage or tenants.get_storage(tenant)
+    _require(storage, name)
+    storage.delete_borrower(name)
+    remove_name(storage, name)
+
+
+def add_payment(name, amount, payment_date=None, note="", storage=None, tenant=None):
+    storage = storage or tenants.get_storage(tenant)
+    try:
+        amount = float(amount)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid amount: {amount}")
+    if not math.isfinite(amount):
+        raise ValueError(f"Invalid amount: {amount}")
+    if amount < 0:
+        raise ValueError("Amount cannot be negative")
+    payment_date = payment_date or date.today()
+    parsed = parse_date(payment_date)
+    # Strings must be exactly YYYY-MM-DD; parse_date alone reads the first
+    # ten characters
+    if parsed is None or isinstance(payment_date, str) and parsed.isoformat() != payment_date:
+        raise ValueError(f"Invalid payment date: {payment_date}")
+    _require(storage, name)
+    with metrics.timed("payment.save"):
+        storage.append_payment(name, parsed.isoformat(), amount, note or "")
+
+
+def borrower_profile(name, storage=None, today=None, tenant=None):
+    storage = storage or tenants.get_storage(tenant)
+    _require(storage, name)
+    borrower = storage.load(name)
+
+    total_paid = borrower.total_paid()
+    packed = build_schedule(borrower.info())
+    due = next_due(borrower.start_date, packed, total_paid)
+    return {
+        "info": borrower.info(),
+        "payments": borrower.payments,
+        "total_paid": total_paid,
+        "total_due": total_due(packed),
+        "remaining": round(total_due(packed) - total_paid, 2),
+        "next_due": {"installment": due[0], "date": due[1], "amount": due[2]} if due else None,
+        "overdue": bool(due) and due[1] < (today or date.today()),
+    }
+
+
+def borrower_schedule(profile, today=None):
+    return schedule_rows(profile["info"], profile["total_paid"], today)
@@ -0,0 +1,125 @@
+import os
+import threading
+from contextlib import contextmanager
+from core import metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows: in-process locking only
+    fcntl = None
+
+# Lock files live in members/.locks so replicas sharing the volume
+# serialize on the same inode per borrower
+LOCK_DIR = ".locks"
+
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+
+
+def thread_lock(path):
+    key = os.path.abspath(path)
+    with _thread_locks_guard:
+        lock = _thread_locks.get(key)
+        if lock is None:
+            lock = _thread_locks[key] = threading.Lock()
+        return lock
+
+
+def _open_lock_file(path):
+    directory, file = os.path.split(os.path.abspath(path))
+    lock_dir = os.path.join(directory, LOCK_DIR)
+    os.makedirs(lock_dir, exist_ok=True)
+    return os.open(os.path.join(lock_dir, f"{file}.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+
+
+@contextmanager
+def borrower_lock(path):
+    # The thread lock keeps sessions in this process from contending on the
+    # flock, which is per open file description rather than per thread
+    with thread_lock(path):
+        if fcntl is None:
+            yield
+            return
+
+        fd = _open_lock_file(path)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+
+@contextmanager
+def try_lock(path):
+    # Like borrower_lock, but yields False at once when another thread or
+    # process holds the lock, for work that only one of them needs to do
+    lock = thread_lock(path)
+    if not lock.acquire(blocking=False):
+        yield False
+        return
+    try:
+        if fcntl is None:
+            yield True
+            return
+
+        fd = _open_lock_file(path)
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+    finally:
+        lock.release()
+
+
+@metrics.timed("workbook.save")
+def atomic_save(wb, path, durable=True):
+    # Readers see either the old or the new workbook, never a partial one.
+    # Bulk writers pass durable=False and call sync_saved when they are done.
+    directory = os.path.dirname(os.path.abspath(path))
+    tmp_path = os.path.join(
+        directory, f".{os.path.basename(path)}.{os.getpid()}.{threading.get_ident()}.tmp"
+    )
+    try:
+        wb.save(tmp_path)
+        if durable:
+            with open(tmp_path, "rb") as f:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    if durable:
+        _fsync_directory(directory)
+
+
+def _fsync_directory(directory):
+    # Makes renames into the directory durable
+    if hasattr(os, "O_DIRECTORY"):
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def sync_saved(paths):
+    # For files written with atomic_save(durable=False): each file, then
+    # each directory once
+    directories = set()
+    for path in paths:
+        with open(path, "rb") as f:
+            os.fsync(f.fileno())
+        directories.add(os.path.dirname(os.path.abspath(path)))
+    for directory in directories:
+        _fsync_directory(directory)
@@ -0,0 +1,172 @@
+import os
+import hmac
+import json
+import time
+import logging
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# In-process counters and latency histograms for the hot paths. Everything
+# is kept per process (process-pool workers are not included) and read via
+# snapshot() for the admin timing panel or render_prometheus() for
+# /metrics in core.api. With LENDTRACK_METRICS_LOG=1 every timed operation
+# is also logged as one JSON object. Both are only shown to operators
+# holding LENDTRACK_ADMIN_TOKEN.
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STRUCTURED_LOG = os.environ.get("LENDTRACK_METRICS_LOG") == "1"
+PREFIX = "lendtrack"
+ADMIN_TOKEN_ENV = "LENDTRACK_ADMIN_TOKEN"
+
+
+def is_admin(token):
+    # Compared in constant time so response timing says nothing about the
+    # token; without a configured token nobody is an admin
+    expected = os.environ.get(ADMIN_TOKEN_ENV)
+    if not expected or not token:
+        return False
+    return hmac.compare_digest(str(token).encode("utf-8"), expected.encode("utf-8"))
+
+
+class Histogram:
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS + (self.max,), self.buckets):
+            seen += count
+            if seen >= rank and count:
+                return min(bound, self.max)
+        return self.max
+
+
+class Registry:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+
+    def increment(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def snapshot(self):
+        with self._lock:
+            timings = [
+                {
+                    "operation": name, "labels": dict(labels), "count": h.count,
+                    "total": h.sum, "mean": h.sum / h.count if h.count else 0.0,
+                    "p50": h.quantile(0.5), "p95": h.quantile(0.95), "max": h.max,
+                }
+                for (name, labels), h in self.histograms.items()
+            ]
+            counters = [
+                {"counter": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in self.counters.items()
+            ]
+        timings.sort(key=lambda t: -t["total"])
+        counters.sort(key=lambda c: c["counter"])
+        return timings, counters
+
+    def render_prometheus(self):
+        lines = []
+        with self._lock:
+            for family, items in _families(self.counters, "_total").items():
+                lines.append(f"# TYPE {family} counter")
+                for labels, value in items:
+                    lines.append(f"{family}{_labels(labels)} {value}")
+            for family, items in _families(self.histograms, "_seconds").items():
+                lines.append(f"# TYPE {family} histogram")
+                for labels, h in items:
+                    cumulative = 0
+                    for bound, count in zip(BUCKETS, h.buckets):
+                        cumulative += count
+                        lines.append(f"{family}_bucket{_labels(labels + (('le', repr(bound)),))} {cumulative}")
+                    lines.append(f"{family}_bucket{_labels(labels + (('le', '+Inf'),))} {h.count}")
+                    lines.append(f"{family}_sum{_labels(labels)} {h.sum}")
+                    lines.append(f"{family}_count{_labels(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _families(metrics, suffix):
+    families = {}
+    for (name, labels), value in sorted(metrics.items()):
+        family = PREFIX + "_" + name.replace(".", "_").replace("-", "_") + suffix
+        families.setdefault(family, []).append((labels, value))
+    return families
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    escaped = (
+        key + '="' + str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for key, value in labels
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+registry = Registry()
+
+
+def increment(name, value=1, **labels):
+    registry.increment(name, value, **labels)
+
+
+def observe(name, seconds, **labels):
+    registry.observe(name, seconds, **labels)
+    if STRUCTURED_LOG:
+        logger.info(json.dumps({"operation": name, "seconds": round(seconds, 6), **labels}, default=str))
+
+
+@contextmanager
+def timed(name, **labels):
+    # Usable as `with timed("op"):` or as a decorator; failures are timed
+    # too and counted under <name>.errors
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        increment(f"{name}.errors", **labels)
+        raise
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+
+def snapshot():
+    return registry.snapshot()
+
+
+def render_prometheus():
+    return registry.render_prometheus()
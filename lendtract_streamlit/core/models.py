@@ -0,0 +1,160 @@
+from array import array
+from datetime import date, datetime
+from core.utils import to_float, to_int
+from core.schedule import DEFAULT_METHOD, parse_date
+
+# Borrowers as loaded from storage. Values are parsed and validated once
+# here, so readers get floats, ints and dates without converting again.
+# Payments are kept as columns: amounts in an array('d'), dates as date
+# ordinals in an array('i') and notes only where there is one, which is
+# a few dozen bytes per payment instead of a list, a float, a string and a
+# note per row. Dates that are not ISO dates (text from an import, say)
+# get NO_DATE and keep their original value in unparsed_dates.
+
+NO_DATE = 0
+
+
+def _payment_date(value):
+    # Strings must be exactly YYYY-MM-DD: schedule.parse_date reads the
+    # first ten characters, which would turn "2025-02-01 late" into a date
+    if isinstance(value, (date, datetime)):
+        return parse_date(value)
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = date.fromisoformat(value)
+    except ValueError:
+        return None
+    return parsed if parsed.isoformat() == value else None
+
+
+BORROWER_FIELDS = (
+    "name", "loan_amount", "interest_rate", "start_date", "loan_period", "monthly_interest", "repayment",
+)
+
+
+class Payment:
+    __slots__ = ("date", "amount", "note")
+
+    def __init__(self, date, amount, note=None):
+        self.date = date
+        self.amount = amount
+        self.note = note
+
+    def __iter__(self):
+        # Unpacks as the (date, amount, note) rows the writers take
+        return iter((self.date, self.amount, self.note))
+
+    def __repr__(self):
+        return f"Payment({self.date!r}, {self.amount!r}, {self.note!r})"
+
+
+class Payments:
+    __slots__ = ("dates", "amounts", "notes", "unparsed_dates")
+
+    def __init__(self, rows=()):
+        self.dates = array("i")
+        self.amounts = array("d")
+        self.notes = {}
+        self.unparsed_dates = {}
+        self.extend(rows)
+
+    def append(self, payment_date, amount, note=None):
+        i = len(self.amounts)
+        parsed = _payment_date(payment_date) if payment_date else None
+        if parsed is None:
+            self.dates.append(NO_DATE)
+            if payment_date:
+                self.unparsed_dates[i] = payment_date
+        else:
+            self.dates.append(parsed.toordinal())
+        self.amounts.append(to_float(amount))
+        if note:
+            self.notes[i] = note
+
+    def extend(self, rows):
+        for payment_date, amount, note in rows:
+            self.append(payment_date, amount, note)
+
+    def copy(self):
+        payments = Payments()
+        payments.dates = array("i", self.dates)
+        payments.amounts = array("d", self.amounts)
+        payments.notes = dict(self.notes)
+        payments.unparsed_dates = dict(self.unparsed_dates)
+        return payments
+
+    def date(self, i):
+        ordinal = self.dates[i]
+        if ordinal == NO_DATE:
+            return self.unparsed_dates.get(i)
+        return date.fromordinal(ordinal)
+
+    def __len__(self):
+        return len(self.amounts)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        return Payment(self.date(i), self.amounts[i], self.notes.get(i))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def total(self):
+        return sum(self.amounts)
+
+    def rows(self):
+        # [date, amount, note] as text and float, for tables
+        return [[str(p.date or ""), p.amount, p.note or ""] for p in self]
+
+
+class Borrower:
+    __slots__ = BORROWER_FIELDS + ("payments",)
+
+    def __init__(self, name, loan_amount=0.0, interest_rate=0.0, start_date=None, loan_period=0,
+                 monthly_interest=0.0, repayment=DEFAULT_METHOD, payments=None):
+        self.name = name
+        self.loan_amount = loan_amount
+        self.interest_rate = interest_rate
+        self.start_date = start_date
+        self.loan_period = loan_period
+        self.monthly_interest = monthly_interest
+        self.repayment = repayment
+        self.payments = payments if payments is not None else Payments()
+
+    @classmethod
+    def from_info(cls, info, payments=()):
+        # info is a borrower row as stored; payments are (date, amount, note)
+        # rows or a Payments
+        return cls(
+            info["name"],
+            to_float(info.get("loan_amount")),
+            to_float(info.get("interest_rate")),
+            info.get("start_date"),
+            to_int(info.get("loan_period")),
+            to_float(info.get("monthly_interest")),
+            info.get("repayment") or DEFAULT_METHOD,
+            payments if isinstance(payments, Payments) else Payments(payments),
+        )
+
+    def info(self):
+        return {field: getattr(self, field) for field in BORROWER_FIELDS}
+
+    def total_paid(self):
+        return self.payments.total()
+
+    def summary(self):
+        summary = self.info()
+        summary["total_paid"] = self.total_paid()
+        summary["payment_count"] = len(self.payments)
+        return summary
+
+    def copy(self):
+        return Borrower(**self.info(), payments=self.payments.copy())
+
+    def __repr__(self):
+        return f"Borrower({self.name!r}, {len(self.payments)} payments)"
@@ -0,0 +1,195 @@
+import bisect
+import threading
+from collections import Counter
+
+MAX_CANDIDATES = 30
+POSTING_BUDGET = 2000
+
+
+def _key(name):
+    return " ".join(str(name).casefold().split())
+
+
+def _trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _distance(a, b, limit):
+    # Levenshtein distance restricted to the diagonal band |i - j| <= limit;
+    # anything beyond the limit is reported as limit + 1
+    over = limit + 1
+    if abs(len(a) - len(b)) > limit:
+        return over
+    previous = [j if j <= limit else over for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        current = [over] * (len(b) + 1)
+        current[0] = i if i <= limit else over
+        row_min = current[0]
+        ca = a[i - 1]
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != b[j - 1]))
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return over
+        previous = current
+    return min(previous[-1], over)
+
+
+class NameIndex:
+    # Borrower names as a sorted array of casefolded keys (prefix lookups by
+    # bisection) plus a trigram posting list for typo-tolerant matching.
+    # Names differing only in case ("Alice", "alice") share a key.
+
+    def __init__(self, names=()):
+        self._lock = threading.Lock()
+        self._names = {}
+        self._sorted = []
+        self._postings = {}
+        # Borrower rows the index was built from, kept current by add_name
+        # and remove_name; get_name_index compares it with the storage
+        self.rows = 0
+        for name in names:
+            self._add(name)
+
+    def __len__(self):
+        return sum(len(names) for names in self._names.values())
+
+    def __contains__(self, name):
+        return _key(name) in self._names
+
+    def _add(self, name):
+        self.rows += 1
+        key = _key(name)
+        if not key:
+            return
+        names = self._names.get(key)
+        if names is not None:
+            if name not in names:
+                names.append(name)
+            return
+        self._names[key] = [name]
+        bisect.insort(self._sorted, key)
+        for gram in _trigrams(key):
+            self._postings.setdefault(gram, set()).add(key)
+
+    def add(self, name):
+        with self._lock:
+            self._add(name)
+
+    def remove(self, name):
+        key = _key(name)
+        with self._lock:
+            self.rows -= 1
+            names = self._names.get(key)
+            if names is None or name not in names:
+                return
+            names.remove(name)
+            if names:
+                return
+            del self._names[key]
+            del self._sorted[bisect.bisect_left(self._sorted, key)]
+            for gram in _trigrams(key):
+                keys = self._postings.get(gram)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._postings[gram]
+
+    def prefix(self, query, limit=10):
+        key = _key(query)
+        matches = []
+        with self._lock:
+            i = bisect.bisect_left(self._sorted, key)
+            while i < len(self._sorted) and len(matches) < limit and self._sorted[i].startswith(key):
+                matches.extend(self._names[self._sorted[i]])
+                i += 1
+        return matches[:limit]
+
+    def fuzzy(self, query, limit=10, max_distance=2):
+        key = _key(query)
+        if not key:
+            return []
+        with self._lock:
+            # Trigrams are counted rarest first until the posting budget is
+            # spent: common ones ("sha", "rma") would touch most of the
+            # index for little selectivity
+            grams = _trigrams(key)
+            postings = sorted((self._postings[g] for g in grams if g in self._postings), key=len)
+            shared = Counter()
+            spent = 0
+            for keys in postings:
+                if spent and spent + len(keys) > POSTING_BUDGET:
+                    break
+                shared.update(keys)
+                spent += len(keys)
+            names = self._names
+
+        scored = []
+        close = 0
+        # Each edit breaks at most three of the query's trigrams (one more
+        # for a prefix, which lacks the closing one), so candidates sharing
+        # fewer cannot be close enough and skip the distance computation
+        needed = len(grams) - 3 * max_distance - 1
+        for candidate, count in shared.most_common(MAX_CANDIDATES):
+            if len(grams & _trigrams(candidate)) < needed:
+                continue
+            distance = _distance(key, candidate, max_distance)
+            partial = 0
+            if distance > max_distance and len(candidate) > len(key):
+                # The query may be a misspelt start of a longer name
+                distance = _distance(key, candidate[:len(key)], max_distance)
+                partial = 1
+            if distance <= max_distance:
+                scored.append((distance, partial, -count, candidate))
+                # Candidates come most shared first, so once there are limit
+                # whole-name matches one edit away the rest cannot rank above
+                close += distance <= 1 and not partial
+                if close == limit:
+                    break
+        scored.sort()
+        return [name for *_, candidate in scored[:limit] for name in names[candidate]][:limit]
+
+    def suggest(self, query, limit=8):
+        matches = self.prefix(query, limit)
+        # A name typed out in full needs no typo correction
+        if len(matches) < limit and query not in self:
+            for name in self.fuzzy(query, limit):
+                if name not in matches:
+                    matches.append(name)
+                if len(matches) == limit:
+                    break
+        return matches
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_name_index(storage):
+    # Built once per storage; add_member keeps it current in this process
+    # and a changed borrower count (another replica) triggers a rebuild
+    count = storage.totals()[0]
+    with _indexes_lock:
+        name_index = _indexes.get(id(storage))
+    if name_index is None or name_index.rows != count:
+        name_index = NameIndex(s["name"] for s in storage.summaries())
+        with _indexes_lock:
+            _indexes[id(storage)] = name_index
+    return name_index
+
+
+def add_name(storage, name):
+    with _indexes_lock:
+        name_index = _indexes.get(id(storage))
+    if name_index is not None:
+        name_index.add(name)
+
+
+def remove_name(storage, name):
+    with _indexes_lock:
+        name_index = _indexes.get(id(storage))
+    if name_index is not None:
+        name_index.remove(name)
@@ -0,0 +1,100 @@
+import os
+import threading
+from collections import OrderedDict
+from core import journal
+
+# Parsed borrowers shared by every session in the process. Entries are keyed
+# by path and validated against the (inode, mtime, size) signature of the
+# workbook and its journal files, so a hit costs three stat calls and no
+# workbook I/O.
+CACHE_BYTES = int(os.environ.get("LENDTRACK_PARSE_CACHE_MB", "64")) * 1024 * 1024
+
+# Rough in-memory footprint used for the byte cap, as measured with
+# benchmarks.bench_models: payment columns cost 12 bytes a payment, a note
+# about 100 more
+ENTRY_BYTES = 1024
+PAYMENT_BYTES = 12
+NOTE_BYTES = 100
+
+
+class ParseCache:
+
+    def __init__(self, max_bytes=CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _drop(self, path):
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self.size -= entry[2]
+        return entry
+
+    def read_member(self, path):
+        sig = journal.signature(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == sig:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[1].copy()
+            self.misses += 1
+
+        borrower = journal.read_member(path)
+        payments = borrower.payments
+        cost = ENTRY_BYTES + PAYMENT_BYTES * len(payments) + NOTE_BYTES * len(payments.notes)
+        if cost <= self.max_bytes:
+            with self._lock:
+                self._drop(path)
+                self._entries[path] = (sig, borrower, cost)
+                self.size += cost
+                while self.size > self.max_bytes:
+                    _, (_, _, evicted) = self._entries.popitem(last=False)
+                    self.size -= evicted
+                    self.evictions += 1
+        return borrower.copy()
+
+    def invalidate(self, path):
+        with self._lock:
+            if self._drop(path) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+parse_cache = ParseCache()
+
+
+def read_member(path):
+    return parse_cache.read_member(path)
+
+
+def read_member_summary(path):
+    return parse_cache.read_member(path).summary()
+
+
+def invalidate(path):
+    parse_cache.invalidate(path)
+
+
+def stats():
+    return parse_cache.stats()
@@ -1,34 +1,18 @@
-import os
-from openpyxl import load_workbook
-from core.utils import get_member_path
+from core.ledger import add_payment
 import logging
 
 logger = logging.getLogger(__name__)
 
-def record_payment(name, amount, date, note=""):
-    if amount < 0 or not name.strip():
-        logger.error(f"Invalid input: name='{name}', amount={amount}")
-        return False
-
-    filename = get_member_path(name)
-    if not os.path.exists(filename):
-        logger.error(f"File not found: {filename}")
-        return False
-
+def record_payment(name, amount, date, note="", tenant=None):
     try:
-        wb = load_workbook(filename)
-        ws = wb["Payments"]
-
-        row = 5
-        while ws.cell(row=row, column=7).value or ws.cell(row=row, column=8).value:
-            row += 1
-
-        ws.cell(row=row, column=7).value = date
-        ws.cell(row=row, column=8).value = float(amount)
-        ws.cell(row=row, column=9).value = note
-
-        wb.save(filename)
+        add_payment(name, amount, date, note, tenant=tenant)
         return True
+    except ValueError as e:
+        logger.error(f"Invalid input: name='{name}', amount={amount}: {e}")
+        return False
+    except KeyError:
+        logger.error(f"Borrower not found: {name}")
+        return False
     except Exception as e:
         logger.error(f"Error recording payment for {name}: {e}")
-        return False
\ No newline at end of file
+        return False
@@ -0,0 +1,229 @@
+import io
+import os
+import sys
+import json
+import time
+import logging
+import zipfile
+import argparse
+import hashlib
+import threading
+from datetime import date
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from core import metrics
+from core.utils import MEMBERS_DIR, pool_context
+from core.storage import get_storage, reset_storages
+from core import tenants
+from core.schedule import DEFAULT_METHOD, build_schedule, paid_label, total_due
+
+logger = logging.getLogger(__name__)
+
+PDF_CACHE_BYTES = 64 * 1024 * 1024
+
+
+@metrics.timed("report.pdf")
+def generate_pdf(info, payments, title="Borrower Profile Report"):
+    # reportlab takes about 0.15s to import, so pages that never build a
+    # report do not load it
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib import colors
+
+    total_interest_paid = payments.total()
+    remaining_interest = total_due(build_schedule(info)) - total_interest_paid
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+    styles = getSampleStyleSheet()
+    elements = []
+
+    elements.append(Paragraph(title, styles['Title']))
+    elements.append(Spacer(1, 12))
+    elements.append(Paragraph(f"Name: {info['name']}", styles['Normal']))
+    elements.append(Paragraph(f"Loan Amount: ₹{info['loan_amount']}", styles['Normal']))
+    elements.append(Paragraph(f"Interest Rate: {info['interest_rate']}%", styles['Normal']))
+    elements.append(Paragraph(f"Start Date: {info['start_date']}", styles['Normal']))
+    elements.append(Paragraph(f"Loan Period: {info['loan_period']} months", styles['Normal']))
+    elements.append(Paragraph(f"Monthly Interest: ₹{info['monthly_interest']}", styles['Normal']))
+    elements.append(Paragraph(f"Repayment Method: {info.get('repayment') or DEFAULT_METHOD}", styles['Normal']))
+    elements.append(Spacer(1, 12))
+    elements.append(Paragraph("Payment History", styles['Heading2']))
+
+    table_data = [["Date", "Amount Paid", "Note"]] + [
+        [payment_date, f"₹{amount:.2f}", note] for payment_date, amount, note in payments.rows()
+    ]
+    table = Table(table_data)
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ]))
+    elements.append(table)
+
+    elements.append(Spacer(1, 12))
+    elements.append(Paragraph(f"{paid_label(info.get('repayment'))}: ₹{total_interest_paid:.2f}", styles['Normal']))
+    elements.append(Paragraph(f"Remaining Due: ₹{remaining_interest:.2f}", styles['Normal']))
+
+    doc.build(elements)
+    pdf = buffer.getvalue()
+    buffer.close()
+    return pdf
+
+
+def report_key(info, payments, members_dir=MEMBERS_DIR):
+    # Every date, amount and note printed in the report goes into the key,
+    # so an edited payment never serves a stale PDF; the members directory
+    # keeps tenants with identical borrower rows apart
+    digest = hashlib.sha256()
+    header = [os.path.abspath(members_dir), info, len(payments)]
+    digest.update(json.dumps(header, sort_keys=True, default=str).encode("utf-8"))
+    digest.update(payments.dates.tobytes())
+    digest.update(payments.amounts.tobytes())
+    notes = [sorted(payments.notes.items()), sorted(payments.unparsed_dates.items())]
+    digest.update(json.dumps(notes, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class PdfCache:
+    # LRU cache bounded by the total size of the cached PDFs
+
+    def __init__(self, max_bytes=PDF_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            pdf = self._entries.get(key)
+            if pdf is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return pdf
+
+    def put(self, key, pdf):
+        if len(pdf) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._entries[key] = pdf
+            self.size += len(pdf)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+pdf_cache = PdfCache()
+
+
+def get_pdf(info, payments, members_dir=MEMBERS_DIR):
+    key = report_key(info, payments, members_dir)
+    pdf = pdf_cache.get(key)
+    if pdf is None:
+        pdf = generate_pdf(info, payments)
+        pdf_cache.put(key, pdf)
+    return pdf
+
+
+# --- Bulk statements ---
+STATEMENT_BATCH = 8
+
+
+def statement_title(period=None):
+    return f"Statement — {(period or date.today()):%B %Y}"
+
+
+def _render_statements(members_dir, names, title):
+    storage = get_storage(members_dir)
+    results = []
+    for name in names:
+        try:
+            borrower = storage.load(name)
+            results.append((name, generate_pdf(borrower.info(), borrower.payments, title), None))
+        except Exception as e:
+            results.append((name, None, str(e)))
+    return results
+
+
+def export_statements(out, names=None, prefix=None, workers=None, progress=None,
+                      members_dir=MEMBERS_DIR, title=None):
+    # Renders one statement per borrower across a process pool and streams
+    # each PDF into the zip as soon as its batch completes. out may be a path
+    # or a binary file object; progress(done, total) is called per batch.
+    if names is None:
+        storage = get_storage(members_dir)
+        storage.refresh()
+        names = [s["name"] for s in storage.summaries()]
+    if prefix:
+        names = [n for n in names if n.lower().startswith(prefix.lower())]
+    title = title or statement_title()
+    workers = workers or os.cpu_count() or 1
+
+    batches = [names[i:i + STATEMENT_BATCH] for i in range(0, len(names), STATEMENT_BATCH)]
+    written = 0
+    errors = []
+
+    def collect(results, zf):
+        nonlocal written
+        for name, pdf, error in results:
+            if error is not None:
+                logger.error(f"Error rendering statement for {name}: {error}")
+                errors.append((name, error))
+                continue
+            zf.writestr(f"{name}_statement.pdf", pdf)
+            written += 1
+        if progress is not None:
+            progress(written + len(errors), len(names))
+
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as zf:
+        if workers <= 1 or len(batches) <= 1:
+            for batch in batches:
+                collect(_render_statements(members_dir, batch, title), zf)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=pool_context(), initializer=reset_storages) as pool:
+                futures = [pool.submit(_render_statements, members_dir, batch, title) for batch in batches]
+                for future in as_completed(futures):
+                    collect(future.result(), zf)
+
+    return written, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export PDF statements for all borrowers into a zip")
+    parser.add_argument("--out", default=f"statements_{date.today():%Y_%m}.zip")
+    parser.add_argument("--prefix", help="only borrowers whose name starts with this")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--members-dir", default=MEMBERS_DIR)
+    tenants.add_tenant_argument(parser)
+    args = parser.parse_args(argv)
+
+    def progress(done, total):
+        print(f"\r{done}/{total} statements", end="", file=sys.stderr, flush=True)
+
+    start = time.perf_counter()
+    written, errors = export_statements(
+        args.out, prefix=args.prefix, workers=args.workers,
+        progress=progress, members_dir=tenants.resolve_members_dir(args),
+    )
+    elapsed = time.perf_counter() - start
+    print(file=sys.stderr)
+    print(f"Wrote {written} statements to {args.out} in {elapsed:.1f}s ({len(errors)} errors)")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
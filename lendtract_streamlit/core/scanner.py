@@ -0,0 +1,49 @@
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from core import metrics
+from core.utils import pool_context
+from core.parse_cache import read_member_summary
+
+logger = logging.getLogger(__name__)
+
+# Below this many files the process pool start-up costs more than it saves
+PARALLEL_THRESHOLD = 32
+BATCH_SIZE = 16
+
+
+def _read_batch(paths):
+    results = []
+    for path in paths:
+        try:
+            results.append((path, read_member_summary(path), None))
+        except Exception as e:
+            results.append((path, None, str(e)))
+    return results
+
+
+def scan_summaries(paths, workers=None):
+    # Yields (path, summary, error) as each workbook is parsed; the order
+    # follows completion, not the input
+    paths = list(paths)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1 or len(paths) < PARALLEL_THRESHOLD:
+        metrics.increment("scan.files", len(paths), mode="serial")
+        for result in _read_batch(paths):
+            yield result
+        return
+
+    metrics.increment("scan.files", len(paths), mode="parallel")
+    batches = [paths[i:i + BATCH_SIZE] for i in range(0, len(paths), BATCH_SIZE)]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=pool_context()) as pool:
+        futures = {pool.submit(_read_batch, batch): batch for batch in batches}
+        for future in as_completed(futures):
+            try:
+                results = future.result()
+            except Exception as e:
+                logger.error(f"Scanner worker failed: {e}")
+                results = [(path, None, str(e)) for path in futures[future]]
+            for result in results:
+                yield result
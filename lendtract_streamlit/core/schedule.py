@@ -0,0 +1,169 @@
+import calendar
+from array import array
+from bisect import bisect_right
+from datetime import date, datetime
+
+# Repayment schedules. Installment k (1-based) falls due k months after the
+# start date. Payments are matched to installments in order, so a
+# borrower's position in the schedule follows from total_paid alone.
+#   flat      interest only on the original amount, the app's original model
+#   reducing  equal principal parts plus interest on the remaining balance
+#   emi       equal monthly installments (annuity)
+METHODS = ("flat", "reducing", "emi")
+DEFAULT_METHOD = "flat"
+
+
+def paid_label(repayment):
+    # Flat schedules are interest only; the others repay principal as well
+    return "Total Interest Paid" if (repayment or DEFAULT_METHOD) == "flat" else "Total Paid"
+
+
+# Amounts within half a paisa count as settled
+TOLERANCE = 0.005
+
+
+def parse_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value).strip()[:10])
+    except ValueError:
+        return None
+
+
+def add_months(start, months):
+    month = start.month - 1 + months
+    year = start.year + month // 12
+    month = month % 12 + 1
+    return date(year, month, min(start.day, calendar.monthrange(year, month)[1]))
+
+
+def installments(info):
+    # [(principal, interest)] per installment, rounded to paise
+    method = info.get("repayment") or DEFAULT_METHOD
+    loan = float(info["loan_amount"] or 0)
+    rate = float(info["interest_rate"] or 0) / 100
+    period = int(info["loan_period"] or 0)
+    if period < 1:
+        return []
+
+    if method == "flat":
+        monthly = info.get("monthly_interest")
+        monthly = float(monthly) if monthly is not None else loan * rate
+        return [(0.0, round(monthly, 2))] * period
+
+    if method == "reducing":
+        part = round(loan / period, 2)
+        rows = []
+        for k in range(period):
+            # As with emi, the last installment takes up the rounding
+            principal = round(loan - part * k, 2) if k == period - 1 else part
+            rows.append((principal, round((loan - part * k) * rate, 2)))
+        return rows
+
+    if method == "emi":
+        if rate:
+            emi = loan * rate / (1 - (1 + rate) ** -period)
+        else:
+            emi = loan / period
+        rows = []
+        balance = loan
+        for k in range(period):
+            interest = balance * rate
+            # The balance goes down by the rounded principal, so the last
+            # installment clears whatever rounding left behind
+            principal = round(balance if k == period - 1 else emi - interest, 2)
+            balance -= principal
+            rows.append((principal, round(interest, 2)))
+        return rows
+
+    raise ValueError(f"Unknown repayment method: {method}")
+
+
+def build_schedule(info):
+    # Stored form: running totals of the installment amounts as packed
+    # doubles, 8 bytes per installment
+    cumulative = array("d")
+    running = 0.0
+    for principal, interest in installments(info):
+        running += principal + interest
+        cumulative.append(round(running, 2))
+    return cumulative.tobytes()
+
+
+def _cumulative(schedule):
+    cumulative = array("d")
+    if schedule:
+        cumulative.frombytes(schedule)
+    return cumulative
+
+
+def total_due(schedule):
+    cumulative = _cumulative(schedule)
+    return cumulative[-1] if cumulative else 0.0
+
+
+def next_due(start_date, schedule, total_paid):
+    # (installment number, due date, amount still owed on it), or None once
+    # the schedule is paid off
+    cumulative = _cumulative(schedule)
+    start = parse_date(start_date)
+    covered = bisect_right(cumulative, float(total_paid or 0) + TOLERANCE)
+    if start is None or covered >= len(cumulative):
+        return None
+    return covered + 1, add_months(start, covered + 1), round(cumulative[covered] - float(total_paid or 0), 2)
+
+
+def annotate(summary):
+    # Adds total_due and the next_due_* fields to a borrower summary and
+    # returns the packed schedule they came from
+    schedule = build_schedule(summary)
+    due = next_due(summary["start_date"], schedule, summary["total_paid"])
+    summary["repayment"] = summary.get("repayment") or DEFAULT_METHOD
+    summary["total_due"] = total_due(schedule)
+    summary["next_due_date"] = due[1].isoformat() if due else None
+    summary["next_due_amount"] = due[2] if due else 0.0
+    return schedule
+
+
+def schedule_rows(info, total_paid, today=None):
+    # The full schedule with payments matched to installments, for display
+    today = today or date.today()
+    start = parse_date(info["start_date"])
+    remaining = float(total_paid or 0)
+    rows = []
+    for k, (principal, interest) in enumerate(installments(info), start=1):
+        amount = round(principal + interest, 2)
+        paid = min(amount, max(remaining, 0.0))
+        remaining -= paid
+        due_date = add_months(start, k) if start else None
+        if paid >= amount - TOLERANCE:
+            status = "Paid"
+        elif due_date is not None and due_date < today:
+            status = "Overdue"
+        else:
+            status = "Partial" if paid else "Due"
+        rows.append({
+            "#": k, "Due Date": str(due_date or ""), "Principal": principal, "Interest": interest,
+            "Amount": amount, "Paid": round(paid, 2), "Status": status,
+        })
+    return rows
+
+
+def _sql_next_due_date(start_date, schedule, total_paid):
+    due = next_due(start_date, schedule, total_paid)
+    return due[1].isoformat() if due else None
+
+
+def _sql_next_due_amount(start_date, schedule, total_paid):
+    due = next_due(start_date, schedule, total_paid)
+    return due[2] if due else 0.0
+
+
+def register(conn):
+    # Lets UPDATE statements move next_due_* forward in the same statement
+    # that adds a payment to total_paid
+    conn.create_function("schedule_next_date", 3, _sql_next_due_date, deterministic=True)
+    conn.create_function("schedule_next_amount", 3, _sql_next_due_amount, deterministic=True)
@@ -1,150 +1,138 @@
 import streamlit as st
 from datetime import datetime
-import os
-from openpyxl import load_workbook
-from core.utils import get_member_path
 from core.record_payment import record_payment
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
-import io
+from core.report import get_pdf
+from core.ledger import borrower_profile, borrower_schedule
+from core.schedule import DEFAULT_METHOD, paid_label
+from core import metrics, tenants
 import logging
 
 logger = logging.getLogger(__name__)
 
-def search_member(name):
-    filename = get_member_path(name)
-    if not os.path.exists(filename):
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def load_profile(name, revision, tenant=None):
+    # revision is only part of the cache key: it changes with the
+    # borrower's data, so a stale profile is never served
+    return borrower_profile(name, tenant=tenant)
+
+
+def current_profile(name, tenant=None):
+    return load_profile(name, tenants.get_storage(tenant).revision(name), tenant)
+
+
+def search_member(name, tenant=None):
+    storage = tenants.get_storage(tenant)
+    if not storage.exists(name):
         st.error("❌ Member not found.")
         return
 
     try:
-        wb = load_workbook(filename)
-        ws = wb["Payments"]
-
-        borrower_name = ws['A2'].value
-        loan_amount = ws['B2'].value
-        interest = ws['C2'].value
-        start_date = ws['D2'].value
-        loan_period = ws['E2'].value
-        monthly_interest = ws['F2'].value
-
-        st.subheader("📄 Borrower Profile")
-        st.markdown(f"**👤 Name:** {borrower_name}")
-        st.markdown(f"**💰 Loan Amount:** ₹{float(loan_amount):.2f}")
-        st.markdown(f"**📈 Interest Rate:** {float(interest):.2f}%")
-        st.markdown(f"**📅 Start Date:** {start_date}")
-        st.markdown(f"**⏳ Loan Period:** {int(loan_period)} months")
-        st.markdown(f"**💸 Monthly Interest:** ₹{float(monthly_interest):.2f}")
-
-        def load_payment_history():
-            row = 5
-            history = []
-            total_interest_paid = 0
-
-            while row <= ws.max_row:
-                payment_date = ws.cell(row=row, column=7).value
-                amount_paid = ws.cell(row=row, column=8).value
-                note = ws.cell(row=row, column=9).value
-
-                if not payment_date and not amount_paid:
-                    break
-
-                try:
-                    amount_val = float(amount_paid)
-                    total_interest_paid += amount_val
-                except:
-                    amount_val = 0
-
-                history.append([payment_date, amount_val, note])
-                row += 1
-
-            total_interest_due = float(monthly_interest) * int(loan_period)
-            remaining_interest = total_interest_due - total_interest_paid
-            return history, total_interest_paid, remaining_interest
-
-        history, total_interest_paid, remaining_interest = load_payment_history()
-
-        st.markdown("---")
-        st.subheader("📜 Payment History")
-
-        if history:
-            st.table(history)
-            st.success(f"💰 Total Interest Paid: ₹{total_interest_paid:.2f}")
-            st.warning(f"📉 Remaining Interest Due: ₹{remaining_interest:.2f}")
-
-            progress = min(int((total_interest_paid / (float(monthly_interest) * int(loan_period))) * 100), 100)
-            st.progress(progress)
-        else:
-            st.info("No payments made yet.")
-
-        st.markdown("---")
-        st.subheader("➕ Record New Payment")
-
-        form_key = f"add_payment_form_{name}"
-        with st.form(form_key):
-            payment_date = st.date_input("Payment Date", value=datetime.today())
-            amount_paid = st.number_input("Amount Paid", min_value=0.0)
-            note = st.text_input("Note (optional)")
-            submitted = st.form_submit_button("Add Payment")
-
-            if submitted:
-                success = record_payment(name, amount_paid, str(payment_date), note)
-                if success:
-                    st.success(f"✅ Payment of ₹{amount_paid:.2f} added on {payment_date}.")
-                    st.session_state.current_borrower = name
-                    st.session_state.current_view = "🔍 Search Borrower"
-                    st.rerun()
-                else:
-                    st.error("❌ Failed to record payment. Check logs for details.")
-
-        st.markdown("---")
-        st.subheader("📥 Download Borrower PDF Report")
-
-        def generate_pdf():
-            buffer = io.BytesIO()
-            doc = SimpleDocTemplate(buffer, pagesize=A4)
-            styles = getSampleStyleSheet()
-            elements = []
-
-            elements.append(Paragraph("Borrower Profile Report", styles['Title']))
-            elements.append(Spacer(1, 12))
-            elements.append(Paragraph(f"Name: {borrower_name}", styles['Normal']))
-            elements.append(Paragraph(f"Loan Amount: ₹{loan_amount}", styles['Normal']))
-            elements.append(Paragraph(f"Interest Rate: {interest}%", styles['Normal']))
-            elements.append(Paragraph(f"Start Date: {start_date}", styles['Normal']))
-            elements.append(Paragraph(f"Loan Period: {loan_period} months", styles['Normal']))
-            elements.append(Paragraph(f"Monthly Interest: ₹{monthly_interest}", styles['Normal']))
-            elements.append(Spacer(1, 12))
-            elements.append(Paragraph("Payment History", styles['Heading2']))
-
-            table_data = [["Date", "Amount Paid", "Note"]] + [
-                [str(p[0]), f"₹{p[1]:.2f}", str(p[2] or "")] for p in history
-            ]
-            table = Table(table_data)
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ]))
-            elements.append(table)
-
-            elements.append(Spacer(1, 12))
-            elements.append(Paragraph(f"Total Interest Paid: ₹{total_interest_paid:.2f}", styles['Normal']))
-            elements.append(Paragraph(f"Remaining Interest Due: ₹{remaining_interest:.2f}", styles['Normal']))
-
-            doc.build(elements)
-            pdf = buffer.getvalue()
-            buffer.close()
-            return pdf
-
-        pdf_bytes = generate_pdf()
-        st.download_button("📄 Download as PDF", data=pdf_bytes, file_name=f"{borrower_name}_report.pdf", mime="application/pdf")
-
+        profile_section(name, tenant)
+        payments_section(name, tenant)
+        downloads_section(name, tenant)
     except Exception as e:
         logger.error(f"Error loading borrower data for {name}: {e}")
-        st.error(f"❌ Error loading borrower data: {e}")
\ No newline at end of file
+        st.error(f"❌ Error loading borrower data: {e}")
+
+
+def profile_section(name, tenant=None):
+    info = current_profile(name, tenant)["info"]
+
+    st.subheader("📄 Borrower Profile")
+    st.markdown(f"**👤 Name:** {info['name']}")
+    st.markdown(f"**💰 Loan Amount:** ₹{info['loan_amount']:.2f}")
+    st.markdown(f"**📈 Interest Rate:** {info['interest_rate']:.2f}%")
+    st.markdown(f"**📅 Start Date:** {info['start_date']}")
+    st.markdown(f"**⏳ Loan Period:** {info['loan_period']} months")
+    st.markdown(f"**💸 Monthly Interest:** ₹{info['monthly_interest']:.2f}")
+    st.markdown(f"**🧮 Repayment Method:** {info.get('repayment') or DEFAULT_METHOD}")
+
+
+def _submit_payment(name, tenant=None):
+    # Runs before the fragment reruns, so the history above the form is
+    # drawn with the new payment already in it
+    amount_paid = st.session_state[f"payment_amount_{name}"]
+    payment_date = st.session_state[f"payment_date_{name}"]
+    note = st.session_state[f"payment_note_{name}"]
+    if record_payment(name, amount_paid, str(payment_date), note, tenant):
+        st.session_state[f"payment_message_{name}"] = ("success", f"✅ Payment of ₹{amount_paid:.2f} added on {payment_date}.")
+    else:
+        st.session_state[f"payment_message_{name}"] = ("error", "❌ Failed to record payment. Check logs for details.")
+
+
+@st.fragment
+@metrics.timed("render.payments_fragment")
+def payments_section(name, tenant=None):
+    # Schedule status, history, totals and the payment form rerun on their
+    # own when a payment is added; the rest of the page is left as drawn
+    profile = current_profile(name, tenant)
+    history = profile["payments"]
+    total_interest_paid = profile["total_paid"]
+    total_interest_due = profile["total_due"]
+    remaining_interest = profile["remaining"]
+
+    st.markdown("---")
+    st.subheader("🗓️ Repayment Schedule")
+    due = profile["next_due"]
+    if due is None:
+        st.success("✅ Schedule fully paid.")
+    elif profile["overdue"]:
+        st.error(f"⏰ Installment {due['installment']} of ₹{due['amount']:.2f} was due on {due['date']}.")
+    else:
+        st.info(f"📌 Next installment: {due['installment']} of ₹{due['amount']:.2f} due on {due['date']}.")
+    with st.expander("View full schedule"):
+        st.dataframe(borrower_schedule(profile), hide_index=True, use_container_width=True)
+
+    st.markdown("---")
+    st.subheader("📜 Payment History")
+
+    if history:
+        st.table(history.rows())
+        st.success(f"💰 {paid_label(profile['info'].get('repayment'))}: ₹{total_interest_paid:.2f}")
+        st.warning(f"📉 Remaining Due: ₹{remaining_interest:.2f}")
+
+        progress = min(int((total_interest_paid / total_interest_due) * 100), 100) if total_interest_due else 100
+        st.progress(progress)
+    else:
+        st.info("No payments made yet.")
+
+    st.markdown("---")
+    st.subheader("➕ Record New Payment")
+
+    form_key = f"add_payment_form_{name}"
+    with st.form(form_key, clear_on_submit=True):
+        st.date_input("Payment Date", value=datetime.today(), key=f"payment_date_{name}")
+        st.number_input("Amount Paid", min_value=0.0, key=f"payment_amount_{name}")
+        st.text_input("Note (optional)", key=f"payment_note_{name}")
+        st.form_submit_button("Add Payment", on_click=_submit_payment, args=(name, tenant))
+
+    message = st.session_state.pop(f"payment_message_{name}", None)
+    if message is not None:
+        kind, text = message
+        (st.success if kind == "success" else st.error)(text)
+
+
+@st.fragment
+def downloads_section(name, tenant=None):
+    profile = current_profile(name, tenant)
+    borrower_name = profile["info"]["name"]
+
+    st.markdown("---")
+    st.subheader("📥 Download Borrower PDF Report")
+
+    # Reports are only built on request; repeat requests for unchanged
+    # data are served from the PDF cache
+    pdf_flag = f"pdf_requested_{name}"
+    if st.button("🧾 Prepare PDF Report", key=f"prepare_pdf_{name}"):
+        st.session_state[pdf_flag] = True
+    if st.session_state.get(pdf_flag):
+        pdf_bytes = get_pdf(profile["info"], profile["payments"], tenants.members_dir(tenant))
+        st.download_button("📄 Download as PDF", data=pdf_bytes, file_name=f"{borrower_name}_report.pdf", mime="application/pdf")
+
+    st.markdown("---")
+    xlsx_flag = f"xlsx_requested_{name}"
+    if st.button("📥 Prepare Borrower File", key=f"prepare_xlsx_{name}"):
+        st.session_state[xlsx_flag] = True
+    if st.session_state.get(xlsx_flag):
+        st.download_button("📥 Download Borrower File", data=tenants.get_storage(tenant).export_xlsx(name), file_name=f"{borrower_name}.xlsx")
@@ -0,0 +1,266 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import logging
+import threading
+from contextlib import closing
+from datetime import date, datetime, timedelta
+from core import metrics
+from core.utils import MEMBERS_DIR
+from core.locks import borrower_lock, try_lock
+from core.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+# Daily snapshots of the portfolio, materialized in the background so the
+# Home page reads a few rows instead of scanning every borrower. One row per
+# day in portfolio (rewritten through the day, kept as the trend history),
+# per-borrower balances for the last RETENTION_DAYS days and interest
+# collected per calendar month.
+#
+# The scheduler thread snapshots after writes that can change a balance
+# (seen as a new storage balance version, at most every MIN_GAP seconds),
+# when the day changes and at least every SNAPSHOT_INTERVAL seconds. Processes sharing members/ take
+# turns through a lock, and the stored version keeps them from repeating
+# each other's work. LENDTRACK_SNAPSHOT_INTERVAL=0 turns the scheduler off.
+# Take one by hand with `python -m core.snapshots [members_dir]`.
+
+SNAPSHOT_FILE = ".snapshots.sqlite"
+SCHEMA_VERSION = 1
+SNAPSHOT_INTERVAL = float(os.environ.get("LENDTRACK_SNAPSHOT_INTERVAL", "3600"))
+MIN_GAP = float(os.environ.get("LENDTRACK_SNAPSHOT_MIN_GAP", "30"))
+CHECK_INTERVAL = 5.0
+RETENTION_DAYS = int(os.environ.get("LENDTRACK_SNAPSHOT_RETENTION_DAYS", "90"))
+REMINDER_DAYS = 7
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS portfolio (
+    day TEXT PRIMARY KEY,
+    taken_at TEXT NOT NULL,
+    version TEXT NOT NULL,
+    borrowers INTEGER NOT NULL,
+    loan_amount REAL NOT NULL,
+    interest_paid REAL NOT NULL,
+    interest_due REAL NOT NULL,
+    outstanding_interest REAL NOT NULL,
+    overdue INTEGER NOT NULL,
+    collected_this_month REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS balances (
+    day TEXT NOT NULL,
+    name TEXT NOT NULL,
+    loan_amount REAL NOT NULL,
+    total_paid REAL NOT NULL,
+    total_due REAL NOT NULL,
+    remaining REAL NOT NULL,
+    next_due_date TEXT,
+    overdue INTEGER NOT NULL,
+    PRIMARY KEY (day, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS balances_remaining ON balances (day, remaining);
+CREATE INDEX IF NOT EXISTS balances_next_due ON balances (day, next_due_date);
+CREATE TABLE IF NOT EXISTS monthly_interest (
+    month TEXT PRIMARY KEY,
+    amount REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+PORTFOLIO_COLUMNS = (
+    "day", "taken_at", "version", "borrowers", "loan_amount", "interest_paid", "interest_due",
+    "outstanding_interest", "overdue", "collected_this_month",
+)
+BALANCE_COLUMNS = ("name", "loan_amount", "total_paid", "total_due", "remaining", "next_due_date", "overdue")
+
+
+def connect(members_dir=MEMBERS_DIR):
+    conn = sqlite3.connect(os.path.join(members_dir, SNAPSHOT_FILE), timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    # Snapshots can always be taken again from the ledger
+    conn.execute("PRAGMA synchronous=NORMAL")
+    if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+        with conn:
+            for table in ("portfolio", "balances", "monthly_interest"):
+                conn.execute(f"DROP TABLE IF EXISTS {table}")
+            conn.executescript(SCHEMA)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return conn
+
+
+_local = threading.local()
+
+
+def reader(members_dir=MEMBERS_DIR):
+    conns = _local.__dict__.setdefault("conns", {})
+    conn = conns.get(members_dir)
+    if conn is None:
+        conn = conns[members_dir] = connect(members_dir)
+    return conn
+
+
+def _version_key(version):
+    return json.dumps(version, default=str)
+
+
+@metrics.timed("snapshot.build")
+def take_snapshot(members_dir=MEMBERS_DIR, today=None):
+    # Returns the (file, error) pairs the storage refresh reported
+    from core.analytics import Ledger, load_ledger
+
+    today = today or date.today()
+    storage = get_storage(members_dir)
+    errors = storage.refresh()
+    for file, e in errors:
+        logger.warning(f"Snapshot skipped unreadable {file}: {e}")
+    version = storage.balance_version()
+    ledger = load_ledger(storage)
+
+    totals = ledger.totals()
+    paid = ledger.paid()
+    remaining = ledger.outstanding_interest()
+    overdue = ledger.overdue(today)
+    this_month = today.year * 12 + today.month - 1
+    collected = float(ledger.amount[ledger.payment_month == this_month].sum())
+    by_month = ledger.interest_by_month()
+
+    balances = [
+        (
+            today.isoformat(), name, float(ledger.loan_amount[i]), float(paid[i]), float(ledger.due[i]),
+            float(remaining[i]),
+            None if ledger.next_due[i] == Ledger.NO_DUE_DATE else date.fromordinal(int(ledger.next_due[i])).isoformat(),
+            int(overdue[i]),
+        )
+        for i, name in enumerate(ledger.names)
+    ]
+
+    with closing(connect(members_dir)) as conn, conn:
+        conn.execute(
+            f"INSERT OR REPLACE INTO portfolio ({', '.join(PORTFOLIO_COLUMNS)}) VALUES ({', '.join('?' * len(PORTFOLIO_COLUMNS))})",
+            (
+                today.isoformat(), datetime.now().isoformat(timespec="seconds"), _version_key(version),
+                totals["borrowers"], totals["loan_amount"], totals["interest_paid"], totals["interest_due"],
+                totals["outstanding_interest"], int(overdue.sum()), collected,
+            ),
+        )
+        conn.execute("DELETE FROM balances WHERE day = ? OR day < ?",
+                     (today.isoformat(), (today - timedelta(days=RETENTION_DAYS)).isoformat()))
+        conn.executemany(
+            f"INSERT INTO balances (day, {', '.join(BALANCE_COLUMNS)}) VALUES ({', '.join('?' * (len(BALANCE_COLUMNS) + 1))})",
+            balances,
+        )
+        conn.execute("DELETE FROM monthly_interest")
+        conn.executemany(
+            "INSERT INTO monthly_interest (month, amount) VALUES (?, ?)",
+            [(month, float(amount)) for month, amount in by_month.items()],
+        )
+    logger.info(f"Snapshot of {len(balances)} borrowers taken for {today}")
+    return errors
+
+
+def latest(members_dir=MEMBERS_DIR):
+    row = reader(members_dir).execute(
+        f"SELECT {', '.join(PORTFOLIO_COLUMNS)} FROM portfolio ORDER BY day DESC LIMIT 1"
+    ).fetchone()
+    return dict(zip(PORTFOLIO_COLUMNS, row)) if row else None
+
+
+def history(members_dir=MEMBERS_DIR, days=RETENTION_DAYS):
+    rows = reader(members_dir).execute(
+        f"SELECT {', '.join(PORTFOLIO_COLUMNS)} FROM portfolio ORDER BY day DESC LIMIT ?", (days,)
+    ).fetchall()
+    return [dict(zip(PORTFOLIO_COLUMNS, row)) for row in reversed(rows)]
+
+
+def interest_by_month(members_dir=MEMBERS_DIR):
+    return reader(members_dir).execute("SELECT month, amount FROM monthly_interest ORDER BY month").fetchall()
+
+
+def _balances(members_dir, where, order, limit, params=()):
+    snapshot = latest(members_dir)
+    if snapshot is None:
+        return []
+    rows = reader(members_dir).execute(
+        f"SELECT {', '.join(BALANCE_COLUMNS)} FROM balances WHERE day = ? {where} ORDER BY {order} LIMIT ?",
+        (snapshot["day"], *params, limit),
+    ).fetchall()
+    return [dict(zip(BALANCE_COLUMNS, row)) for row in rows]
+
+
+def largest_balances(members_dir=MEMBERS_DIR, limit=10):
+    return _balances(members_dir, "", "remaining DESC", limit)
+
+
+def reminders(members_dir=MEMBERS_DIR, within_days=REMINDER_DAYS, limit=50, today=None):
+    # Overdue borrowers and those with an installment due within
+    # within_days, earliest first
+    until = ((today or date.today()) + timedelta(days=within_days)).isoformat()
+    return _balances(members_dir, "AND next_due_date <= ?", "next_due_date, name", limit, (until,))
+
+
+def _due(members_dir, today):
+    snapshot = latest(members_dir)
+    if snapshot is None or snapshot["day"] != today.isoformat():
+        return True
+    taken = datetime.fromisoformat(snapshot["taken_at"])
+    age = (datetime.now() - taken).total_seconds()
+    if age >= SNAPSHOT_INTERVAL:
+        return True
+    return age >= MIN_GAP and snapshot["version"] != _version_key(get_storage(members_dir).balance_version())
+
+
+def snapshot_now(members_dir=MEMBERS_DIR, force=True):
+    # For callers that cannot go on without a snapshot: waits for one being
+    # taken elsewhere rather than scanning the ledger at the same time
+    with borrower_lock(os.path.join(members_dir, SNAPSHOT_FILE)):
+        if force or latest(members_dir) is None:
+            return take_snapshot(members_dir)
+    return []
+
+
+def snapshot_if_due(members_dir=MEMBERS_DIR):
+    today = date.today()
+    if not _due(members_dir, today):
+        return False
+    with try_lock(os.path.join(members_dir, SNAPSHOT_FILE)) as locked:
+        # Another process is taking it; the next check sees its result
+        if not locked or not _due(members_dir, today):
+            return False
+        take_snapshot(members_dir, today)
+        return True
+
+
+# One scheduler thread takes turns over every members directory that asked
+# for snapshots, so visiting more tenants adds no threads
+_scheduled = []
+_scheduled_guard = threading.Lock()
+
+
+def _scheduler_loop():
+    while True:
+        with _scheduled_guard:
+            members_dirs = list(_scheduled)
+        for members_dir in members_dirs:
+            try:
+                snapshot_if_due(members_dir)
+            except Exception as e:
+                logger.error(f"Error taking snapshot for {members_dir}: {e}")
+        time.sleep(CHECK_INTERVAL)
+
+
+def start_scheduler(members_dir=MEMBERS_DIR):
+    if SNAPSHOT_INTERVAL <= 0:
+        return
+    with _scheduled_guard:
+        if members_dir in _scheduled:
+            return
+        _scheduled.append(members_dir)
+        if len(_scheduled) == 1:
+            threading.Thread(target=_scheduler_loop, name="snapshot-scheduler", daemon=True).start()
+
+
+if __name__ == "__main__":
+    members_dir = sys.argv[1] if len(sys.argv) > 1 else MEMBERS_DIR
+    start = time.perf_counter()
+    failed = take_snapshot(members_dir)
+    print(f"Snapshot taken in {time.perf_counter() - start:.2f}s ({len(failed)} unreadable files)")
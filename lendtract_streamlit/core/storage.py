@@ -0,0 +1,581 @@
+import os
+import sqlite3
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from core.utils import MEMBERS_DIR, get_member_path, pool_context
+from core import index, journal, metrics, parse_cache, schedule
+from core.locks import atomic_save, borrower_lock, sync_saved
+from core.models import Borrower
+from core.workbook import build_workbook, update_info, workbook_bytes
+from core.scanner import BATCH_SIZE, PARALLEL_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+BACKEND_ENV = "LENDTRACK_BACKEND"
+LEDGER_FILE = "ledger.sqlite"
+INFO_COLUMNS = (
+    "name", "loan_amount", "interest_rate", "start_date", "loan_period", "monthly_interest", "repayment",
+)
+
+
+class Storage:
+    # Every backend loads borrowers as core.models.Borrower records and
+    # takes writes as the info dict plus (date, amount, note) payment rows.
+
+    def exists(self, name):
+        raise NotImplementedError
+
+    def add_borrower(self, info):
+        raise NotImplementedError
+
+    def append_payment(self, name, date, amount, note=""):
+        raise NotImplementedError
+
+    def update_borrower(self, name, changes):
+        # changes maps loan-term fields of the info dict to new values; the
+        # repayment schedule is regenerated from the result
+        raise NotImplementedError
+
+    def delete_borrower(self, name):
+        raise NotImplementedError
+
+    def load(self, name):
+        raise NotImplementedError
+
+    def refresh(self):
+        return []
+
+    def summaries(self):
+        raise NotImplementedError
+
+    def totals(self):
+        raise NotImplementedError
+
+    def version(self):
+        # Opaque value that changes whenever any borrower or payment changes
+        raise NotImplementedError
+
+    def revision(self, name):
+        # Like version() but only has to change when this borrower changes
+        return self.version()
+
+    def balance_version(self):
+        # Like version() but only has to change when a balance can change,
+        # not when the same data is rewritten
+        return self.version()
+
+    def iter_ledger(self, cached=True):
+        # Yields a Borrower for every borrower, one at a time;
+        # cached=False keeps one-off full scans out of the parse cache
+        for summary in self.summaries():
+            yield self.load(summary["name"])
+
+    def query(self, **filters):
+        # Filters and paging as in core.index.query_summaries; returns
+        # (page_rows, total_matching)
+        raise NotImplementedError
+
+    def export_xlsx(self, name):
+        borrower = self.load(name)
+        return workbook_bytes(borrower.info(), borrower.payments)
+
+    def import_groups(self, groups):
+        # groups yields (name, info, payments): info is None to append the
+        # payments to an existing borrower. Each borrower is written in one
+        # pass; returns (borrowers_created, payments_written, errors).
+        created = written = 0
+        errors = []
+        for name, info, payments in groups:
+            try:
+                if info is not None:
+                    self.add_borrower(info)
+                    created += 1
+                for payment_date, amount, note in payments:
+                    self.append_payment(name, payment_date, amount, note)
+                written += len(payments)
+            except Exception as e:
+                errors.append((name, str(e)))
+        return created, written, errors
+
+
+class XlsxStorage(Storage):
+    # One workbook per borrower, with core.index as the aggregate cache
+
+    def __init__(self, members_dir=MEMBERS_DIR):
+        self.members_dir = members_dir
+        journal.start_compactor(members_dir, on_compacted=index.restat)
+
+    def path(self, name):
+        return get_member_path(name, self.members_dir)
+
+    def exists(self, name):
+        try:
+            return os.path.exists(self.path(name))
+        except ValueError:
+            # Not a name any borrower can have
+            return False
+
+    def add_borrower(self, info):
+        filename = self.path(info["name"])
+        with borrower_lock(filename):
+            if os.path.exists(filename):
+                raise FileExistsError(filename)
+            atomic_save(build_workbook(info), filename)
+        parse_cache.invalidate(filename)
+        index.update_file(filename)
+
+    def append_payment(self, name, date, amount, note=""):
+        filename = self.path(name)
+        journal.append(
+            filename, date, amount, note,
+            on_appended=lambda before: index.apply_payment(filename, before, amount),
+        )
+        parse_cache.invalidate(filename)
+
+    def update_borrower(self, name, changes):
+        filename = self.path(name)
+        # The compacting lock keeps the compactor from saving an older copy
+        # of the workbook over this one
+        with borrower_lock(journal.compacting_path(filename)), borrower_lock(filename):
+            if not os.path.exists(filename):
+                raise KeyError(name)
+            atomic_save(update_info(filename, changes), filename)
+        parse_cache.invalidate(filename)
+        index.update_file(filename)
+
+    def delete_borrower(self, name):
+        filename = self.path(name)
+        with borrower_lock(journal.compacting_path(filename)), borrower_lock(filename):
+            if not os.path.exists(filename):
+                raise KeyError(name)
+            journal.discard(filename)
+            os.remove(filename)
+        parse_cache.invalidate(filename)
+        index.remove_file(filename)
+
+    def load(self, name):
+        return parse_cache.read_member(self.path(name))
+
+    def import_groups(self, groups, workers=None):
+        created = written = 0
+        errors = []
+        new = []
+
+        for name, info, payments in groups:
+            if info is not None:
+                new.append((self.path(name), info, payments))
+                continue
+            filename = self.path(name)
+            if not os.path.exists(filename):
+                errors.append((name, "Borrower not found"))
+                continue
+            try:
+                total = sum(p[1] for p in payments)
+                journal.append_many(
+                    filename, payments,
+                    on_appended=lambda before: index.apply_payment(filename, before, total, len(payments)),
+                    keep_open=False,
+                )
+                parse_cache.invalidate(filename)
+                written += len(payments)
+            except Exception as e:
+                errors.append((name, str(e)))
+
+        # New borrowers get their whole history in one workbook write each,
+        # spread over a process pool for large imports
+        indexed = []
+        for path, summary, error in _write_new_workbooks(new, workers):
+            if error is not None:
+                errors.append((os.path.splitext(os.path.basename(path))[0], error))
+                continue
+            indexed.append((path, summary))
+            created += 1
+            written += summary["payment_count"]
+        # Only what this import wrote is flushed, not every dirty page on
+        # the machine; journals were synced as their handles were closed
+        sync_saved([path for path, _ in indexed])
+        index.record_summaries(self.members_dir, indexed)
+        return created, written, errors
+
+    def refresh(self):
+        return index.sync_index(self.members_dir)
+
+    def summaries(self):
+        return index.get_summaries(self.members_dir)
+
+    def totals(self):
+        return index.get_totals(self.members_dir)
+
+    def version(self):
+        return index.get_version(self.members_dir)
+
+    def balance_version(self):
+        return index.get_balance_version(self.members_dir)
+
+    def revision(self, name):
+        return tuple(journal.signature(self.path(name)))
+
+    def iter_ledger(self, cached=True):
+        read = parse_cache.read_member if cached else journal.read_member
+        with metrics.timed("members.listdir"):
+            files = sorted(os.listdir(self.members_dir))
+        for file in files:
+            if file.endswith(".xlsx"):
+                try:
+                    yield read(os.path.join(self.members_dir, file))
+                except Exception as e:
+                    logger.error(f"Error loading {file}: {e}")
+
+    def query(self, **filters):
+        return index.query_borrowers(self.members_dir, **filters)
+
+    def export_xlsx(self, name):
+        filename = self.path(name)
+        before = journal.member_stat(filename)
+        if journal.compact(filename):
+            index.restat(filename, before)
+        with open(filename, "rb") as f:
+            return f.read()
+
+
+class SqliteStorage(Storage):
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS borrowers (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE,
+        loan_amount REAL NOT NULL DEFAULT 0,
+        interest_rate REAL NOT NULL DEFAULT 0,
+        start_date TEXT,
+        loan_period INTEGER NOT NULL DEFAULT 0,
+        monthly_interest REAL NOT NULL DEFAULT 0,
+        total_paid REAL NOT NULL DEFAULT 0,
+        payment_count INTEGER NOT NULL DEFAULT 0,
+        repayment TEXT NOT NULL DEFAULT 'flat',
+        schedule BLOB,
+        total_due REAL NOT NULL DEFAULT 0,
+        next_due_date TEXT,
+        next_due_amount REAL NOT NULL DEFAULT 0
+    );
+    CREATE TABLE IF NOT EXISTS payments (
+        id INTEGER PRIMARY KEY,
+        borrower_id INTEGER NOT NULL REFERENCES borrowers (id),
+        payment_date TEXT,
+        amount REAL NOT NULL,
+        note TEXT
+    );
+    CREATE INDEX IF NOT EXISTS payments_borrower ON payments (borrower_id, id);
+    CREATE TABLE IF NOT EXISTS meta (version INTEGER NOT NULL);
+    INSERT INTO meta (version) SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM meta);
+    """
+    SCHEDULE_COLUMNS = (
+        ("repayment", "TEXT NOT NULL DEFAULT 'flat'"),
+        ("schedule", "BLOB"),
+        ("total_due", "REAL NOT NULL DEFAULT 0"),
+        ("next_due_date", "TEXT"),
+        ("next_due_amount", "REAL NOT NULL DEFAULT 0"),
+    )
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self.SCHEMA)
+            self._migrate(conn)
+
+    def _migrate(self, conn):
+        # Ledgers created before repayment schedules get the columns added
+        # and a flat schedule generated for every borrower
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(borrowers)")}
+        for column, definition in self.SCHEDULE_COLUMNS:
+            if column not in existing:
+                conn.execute(f"ALTER TABLE borrowers ADD COLUMN {column} {definition}")
+        conn.execute("CREATE INDEX IF NOT EXISTS borrowers_next_due ON borrowers (next_due_date)")
+
+        rows = conn.execute(
+            f"SELECT id, {', '.join(INFO_COLUMNS)}, total_paid FROM borrowers WHERE schedule IS NULL"
+        ).fetchall()
+        for row in rows:
+            summary = dict(zip(INFO_COLUMNS + ("total_paid",), row[1:]))
+            packed = schedule.annotate(summary)
+            conn.execute(
+                "UPDATE borrowers SET schedule = ?, total_due = ?, next_due_date = ?, next_due_amount = ? WHERE id = ?",
+                (packed, summary["total_due"], summary["next_due_date"], summary["next_due_amount"], row[0]),
+            )
+
+    def _connect(self):
+        # sqlite3 connections may not be shared across threads, and Streamlit
+        # runs each session on its own script thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            schedule.register(conn)
+            self._local.conn = conn
+        return conn
+
+    def exists(self, name):
+        row = self._connect().execute("SELECT 1 FROM borrowers WHERE name = ?", (name,)).fetchone()
+        return row is not None
+
+    def add_borrower(self, info, payments=()):
+        with self._connect() as conn:
+            self._insert_borrower(conn, info, payments)
+            self._bump(conn)
+
+    def _bump(self, conn):
+        # Every write transaction bumps meta.version, which version() reports
+        conn.execute("UPDATE meta SET version = version + 1")
+
+    def _insert_borrower(self, conn, info, payments):
+        # The schedule is generated once here; payments only move next_due_*
+        summary = dict(info, total_paid=sum(float(amount) for _, amount, _ in payments))
+        packed = schedule.annotate(summary)
+        cur = conn.execute(
+            """
+            INSERT INTO borrowers (
+                name, loan_amount, interest_rate, start_date, loan_period,
+                monthly_interest, total_paid, payment_count,
+                repayment, schedule, total_due, next_due_date, next_due_amount
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                info["name"], info["loan_amount"], info["interest_rate"],
+                str(info["start_date"] or ""), info["loan_period"],
+                info["monthly_interest"], summary["total_paid"], len(payments),
+                summary["repayment"], packed, summary["total_due"],
+                summary["next_due_date"], summary["next_due_amount"],
+            ),
+        )
+        conn.executemany(
+            "INSERT INTO payments (borrower_id, payment_date, amount, note) VALUES (?, ?, ?, ?)",
+            [(cur.lastrowid, str(d or ""), float(a), n) for d, a, n in payments],
+        )
+
+    def append_payment(self, name, date, amount, note=""):
+        with self._connect() as conn:
+            row = conn.execute("SELECT id FROM borrowers WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                raise KeyError(name)
+            conn.execute(
+                "INSERT INTO payments (borrower_id, payment_date, amount, note) VALUES (?, ?, ?, ?)",
+                (row[0], date, float(amount), note),
+            )
+            self._add_paid(conn, row[0], float(amount), 1)
+            self._bump(conn)
+
+    def update_borrower(self, name, changes):
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT id, {', '.join(INFO_COLUMNS)}, total_paid FROM borrowers WHERE name = ?", (name,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(name)
+            summary = dict(zip(INFO_COLUMNS + ("total_paid",), row[1:]))
+            summary.update(changes)
+            packed = schedule.annotate(summary)
+            conn.execute(
+                """
+                UPDATE borrowers
+                SET loan_amount = ?, interest_rate = ?, start_date = ?, loan_period = ?,
+                    monthly_interest = ?, repayment = ?, schedule = ?, total_due = ?,
+                    next_due_date = ?, next_due_amount = ?
+                WHERE id = ?
+                """,
+                (
+                    summary["loan_amount"], summary["interest_rate"], str(summary["start_date"] or ""),
+                    summary["loan_period"], summary["monthly_interest"], summary["repayment"],
+                    packed, summary["total_due"], summary["next_due_date"], summary["next_due_amount"],
+                    row[0],
+                ),
+            )
+            self._bump(conn)
+
+    def delete_borrower(self, name):
+        with self._connect() as conn:
+            row = conn.execute("SELECT id FROM borrowers WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                raise KeyError(name)
+            conn.execute("DELETE FROM payments WHERE borrower_id = ?", (row[0],))
+            conn.execute("DELETE FROM borrowers WHERE id = ?", (row[0],))
+            self._bump(conn)
+
+    def _add_paid(self, conn, borrower_id, amount, count):
+        conn.execute(
+            """
+            UPDATE borrowers
+            SET total_paid = total_paid + :amount, payment_count = payment_count + :count,
+                next_due_date = schedule_next_date(start_date, schedule, total_paid + :amount),
+                next_due_amount = schedule_next_amount(start_date, schedule, total_paid + :amount)
+            WHERE id = :id
+            """,
+            {"amount": amount, "count": count, "id": borrower_id},
+        )
+
+    def load(self, name):
+        conn = self._connect()
+        row = conn.execute(
+            f"SELECT id, {', '.join(INFO_COLUMNS)} FROM borrowers WHERE name = ?",
+            (name,),
+        ).fetchone()
+        if row is None:
+            raise KeyError(name)
+
+        return Borrower.from_info(
+            dict(zip(INFO_COLUMNS, row[1:])),
+            conn.execute(
+                "SELECT payment_date, amount, note FROM payments WHERE borrower_id = ? ORDER BY id",
+                (row[0],),
+            ),
+        )
+
+    def summaries(self):
+        rows = self._connect().execute(
+            f"SELECT {', '.join(index.SUMMARY_COLUMNS)} FROM borrowers ORDER BY name"
+        ).fetchall()
+        return [dict(zip(index.SUMMARY_COLUMNS, row)) for row in rows]
+
+    def totals(self):
+        return self._connect().execute(
+            "SELECT COUNT(*), TOTAL(loan_amount), TOTAL(total_paid) FROM borrowers"
+        ).fetchone()
+
+    def version(self):
+        return self._connect().execute("SELECT version FROM meta").fetchone()
+
+    def iter_ledger(self, cached=True):
+        # One streamed join in name order; both sides are read through
+        # indexes, so memory stays at one borrower's payments
+        borrower = None
+        current = None
+        for row in self._connect().execute(
+            """
+            SELECT b.id, b.name, b.loan_amount, b.interest_rate, b.start_date, b.loan_period,
+                   b.monthly_interest, b.repayment, p.id, p.payment_date, p.amount, p.note
+            FROM borrowers b LEFT JOIN payments p ON p.borrower_id = b.id
+            ORDER BY b.name, p.id
+            """
+        ):
+            if row[0] != current:
+                if borrower is not None:
+                    yield borrower
+                current = row[0]
+                borrower = Borrower.from_info(dict(zip(INFO_COLUMNS, row[1:8])))
+            if row[8] is not None:
+                borrower.payments.append(row[9], row[10], row[11])
+        if borrower is not None:
+            yield borrower
+
+    def query(self, **filters):
+        return index.query_summaries(self._connect(), **filters)
+
+    def import_groups(self, groups):
+        # One transaction for the whole import
+        conn = self._connect()
+        created = written = 0
+        errors = []
+        with conn:
+            self._bump(conn)
+            for name, info, payments in groups:
+                if info is not None:
+                    if self.exists(name):
+                        errors.append((name, "Borrower already exists"))
+                        continue
+                    self._insert_borrower(conn, info, payments)
+                    created += 1
+                    written += len(payments)
+                    continue
+
+                row = conn.execute("SELECT id FROM borrowers WHERE name = ?", (name,)).fetchone()
+                if row is None:
+                    errors.append((name, "Borrower not found"))
+                    continue
+                conn.executemany(
+                    "INSERT INTO payments (borrower_id, payment_date, amount, note) VALUES (?, ?, ?, ?)",
+                    [(row[0], str(d or ""), float(a), n) for d, a, n in payments],
+                )
+                self._add_paid(conn, row[0], sum(float(p[1]) for p in payments), len(payments))
+                written += len(payments)
+        return created, written, errors
+
+    def import_workbook(self, path):
+        # Payments still in the borrower's journal count too
+        borrower = journal.read_member(path)
+        if self.exists(borrower.name):
+            return False
+        self.add_borrower(borrower.info(), borrower.payments)
+        return True
+
+
+def _write_new_batch(items):
+    results = []
+    for path, info, payments in items:
+        try:
+            with borrower_lock(path):
+                if os.path.exists(path):
+                    raise FileExistsError("Borrower already exists")
+                atomic_save(build_workbook(info, payments), path, durable=False)
+            results.append((path, Borrower.from_info(info, payments).summary(), None))
+        except Exception as e:
+            results.append((path, None, str(e)))
+    return results
+
+
+def _write_new_workbooks(items, workers=None):
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(items) < PARALLEL_THRESHOLD:
+        yield from _write_new_batch(items)
+        return
+
+    batches = [items[i:i + BATCH_SIZE] for i in range(0, len(items), BATCH_SIZE)]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=pool_context()) as pool:
+        for results in pool.map(_write_new_batch, batches):
+            yield from results
+
+
+_storages = {}
+_storages_lock = threading.Lock()
+
+
+def get_storage(members_dir=MEMBERS_DIR):
+    backend = os.environ.get(BACKEND_ENV, "xlsx")
+    key = (backend, members_dir)
+    with _storages_lock:
+        if key not in _storages:
+            if backend == "sqlite":
+                _storages[key] = SqliteStorage(os.path.join(members_dir, LEDGER_FILE))
+            elif backend == "xlsx":
+                _storages[key] = XlsxStorage(members_dir)
+            else:
+                raise ValueError(f"Unknown storage backend: {backend}")
+        return _storages[key]
+
+
+def reset_storages():
+    # For worker processes: a SQLite connection must not be used on
+    # both sides of a fork, so workers open their own storages
+    with _storages_lock:
+        _storages.clear()
+
+
+def import_members_dir(members_dir=MEMBERS_DIR):
+    # One-off migration of existing workbooks into the SQLite ledger
+    storage = SqliteStorage(os.path.join(members_dir, LEDGER_FILE))
+    imported = 0
+    for file in sorted(os.listdir(members_dir)):
+        if not file.endswith(".xlsx"):
+            continue
+        try:
+            imported += storage.import_workbook(os.path.join(members_dir, file))
+        except Exception as e:
+            logger.error(f"Error importing {file}: {e}")
+    return imported
+
+
+if __name__ == "__main__":
+    import sys
+
+    members_dir = sys.argv[1] if len(sys.argv) > 1 else MEMBERS_DIR
+    print(f"Imported {import_members_dir(members_dir)} borrowers into {os.path.join(members_dir, LEDGER_FILE)}")
@@ -0,0 +1,106 @@
+import os
+import re
+import sys
+import hashlib
+import argparse
+from core.utils import MEMBERS_DIR
+from core.storage import get_storage as storage_for_dir
+
+# Each tenant (lender) gets its own partition: a members directory with its
+# own workbooks, journal, summary index and snapshots, or its own
+# ledger.sqlite on the SQLite backend. Every aggregate is computed over one
+# partition, so listings and scans grow with the tenant's borrowers only.
+# The default tenant keeps the original members/ directory. Other tenants
+# live under TENANTS_DIR, fanned out over 256 shard directories so the
+# root stays small with many tenants:
+#   tenants/3f/acme/          (shard = first byte of sha1("acme"))
+# Create one with `python -m core.tenants create <tenant>`.
+
+DEFAULT_TENANT = "default"
+TENANTS_DIR = os.environ.get("LENDTRACK_TENANTS_DIR", "tenants")
+TENANT_PATTERN = re.compile(r"[a-z0-9][a-z0-9_-]{0,62}")
+
+
+def validate(tenant):
+    if not isinstance(tenant, str) or not TENANT_PATTERN.fullmatch(tenant):
+        raise ValueError(f"Invalid tenant: {tenant!r} (lowercase letters, digits, '-' and '_')")
+    return tenant
+
+
+def shard(tenant):
+    return hashlib.sha1(tenant.encode()).hexdigest()[:2]
+
+
+def members_dir(tenant=None):
+    tenant = validate(tenant or DEFAULT_TENANT)
+    if tenant == DEFAULT_TENANT:
+        return MEMBERS_DIR
+    return os.path.join(TENANTS_DIR, shard(tenant), tenant)
+
+
+def exists(tenant=None):
+    return os.path.isdir(members_dir(tenant))
+
+
+def create(tenant):
+    path = members_dir(tenant)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def get_storage(tenant=None):
+    # Only tenants that were created are served; the default one is made
+    # on first use like members/ always was
+    tenant = tenant or DEFAULT_TENANT
+    if not exists(tenant):
+        if tenant != DEFAULT_TENANT:
+            raise KeyError(f"Unknown tenant: {tenant}")
+        create(tenant)
+    return storage_for_dir(members_dir(tenant))
+
+
+def list_tenants():
+    tenants = [DEFAULT_TENANT] if exists(DEFAULT_TENANT) else []
+    try:
+        shards = sorted(os.listdir(TENANTS_DIR))
+    except FileNotFoundError:
+        return tenants
+    for name in shards:
+        path = os.path.join(TENANTS_DIR, name)
+        if os.path.isdir(path):
+            tenants.extend(t for t in sorted(os.listdir(path)) if TENANT_PATTERN.fullmatch(t))
+    return tenants
+
+
+def add_tenant_argument(parser):
+    # For the command line tools: --tenant picks the partition, --members-dir
+    # still points anywhere
+    parser.add_argument("--tenant", help="tenant whose partition to use (default: --members-dir)")
+
+
+def resolve_members_dir(args):
+    if not args.tenant:
+        return args.members_dir
+    if args.tenant != DEFAULT_TENANT and not exists(args.tenant):
+        sys.exit(f"Unknown tenant: {args.tenant} (create it with python -m core.tenants create)")
+    return members_dir(args.tenant)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage LendTrack tenants")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="list tenants")
+    create_parser = commands.add_parser("create", help="create a tenant partition")
+    create_parser.add_argument("tenant")
+    args = parser.parse_args(argv)
+
+    if args.command == "create":
+        print(f"Created {create(args.tenant)}")
+    else:
+        for tenant in list_tenants():
+            print(f"{tenant}\t{members_dir(tenant)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
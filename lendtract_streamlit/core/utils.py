@@ -1,3 +1,43 @@
-def get_member_path(name):
-    import os
-    return os.path.join("members", f"{name}.xlsx")
+import os
+
+MEMBERS_DIR = "members"
+
+
+def validate_name(name):
+    # Borrower names become file names in members_dir, so nothing that
+    # could point elsewhere or hide the file is accepted
+    if (not isinstance(name, str) or not name.strip() or name.startswith(".") or ".." in name
+            or "\0" in name or "/" in name or "\\" in name):
+        raise ValueError(f"Invalid borrower name: {name!r}")
+    return name
+
+
+def pool_context():
+    # Process pools start their workers from a forkserver (spawn where there
+    # is none) rather than forking the app: a fork copies locks the journal
+    # compactor or snapshot scheduler threads may hold, and a child that
+    # needs one of them hangs
+    import multiprocessing
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+
+def get_member_path(name, members_dir=MEMBERS_DIR):
+    path = os.path.join(members_dir, f"{name}.xlsx")
+    if os.path.dirname(os.path.abspath(path)) != os.path.abspath(members_dir):
+        raise ValueError(f"Invalid borrower name: {name!r}")
+    return path
+
+
+def to_float(value, default=0.0):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def to_int(value, default=0):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
@@ -1,75 +1,170 @@
+import io
 import os
+import sqlite3
+import tempfile
 import streamlit as st
-from openpyxl import load_workbook
-from core.utils import get_member_path
+from datetime import date
 from core.search_member import search_member
+from core.report import export_statements
+from core.export import FORMATS, export_ledger
+from core import tenants
+from core.schedule import paid_label
 import logging
 
 logger = logging.getLogger(__name__)
 
-def to_float(value, default=0.0):
-    try:
-        return float(value)
-    except:
-        return default
+SORT_OPTIONS = {
+    "Name": ("name", False),
+    "Loan Amount (high to low)": ("loan_amount", True),
+    "Loan Amount (low to high)": ("loan_amount", False),
+    "Remaining Due (high to low)": ("remaining", True),
+    "Remaining Due (low to high)": ("remaining", False),
+}
+OVERDUE_OPTIONS = {"All": None, "Overdue": True, "Up to date": False}
+PAGE_SIZES = [10, 25, 50, 100]
 
-def to_int(value, default=0):
-    try:
-        return int(value)
-    except:
-        return default
 
-def list_all_borrowers():
-    members_dir = "members"
+def list_all_borrowers(tenant=None):
+    storage = tenants.get_storage(tenant)
+
     try:
-        files = [f for f in os.listdir(members_dir) if f.endswith(".xlsx")]
-    except OSError as e:
+        with st.spinner("Updating borrower index..."):
+            errors = storage.refresh()
+    except (OSError, sqlite3.Error) as e:
         logger.error(f"Error accessing members directory: {e}")
         st.error(f"❌ Error accessing members directory: {e}")
         return
 
-    if not files:
+    for file, e in errors:
+        logger.error(f"Error loading data for {file}: {e}")
+        st.error(f"❌ Error loading data for {file}: {e}")
+
+    col1, col2, col3 = st.columns([2, 1, 1])
+    prefix = col1.text_input("Name starts with", key="view_all_prefix")
+    min_balance = col2.number_input("Min remaining due", value=None, step=100.0, key="view_all_min")
+    max_balance = col3.number_input("Max remaining due", value=None, step=100.0, key="view_all_max")
+
+    col1, col2, col3 = st.columns([2, 1, 1])
+    sort_label = col1.selectbox("Sort by", list(SORT_OPTIONS), key="view_all_sort")
+    overdue_label = col2.selectbox("Status", list(OVERDUE_OPTIONS), key="view_all_overdue")
+    page_size = col3.selectbox("Per page", PAGE_SIZES, index=1, key="view_all_page_size")
+
+    sort, descending = SORT_OPTIONS[sort_label]
+    filters = {
+        "prefix": prefix.strip() or None,
+        "min_balance": min_balance,
+        "max_balance": max_balance,
+        "overdue": OVERDUE_OPTIONS[overdue_label],
+        "sort": sort,
+        "descending": descending,
+        "page_size": page_size,
+    }
+
+    # Only the requested page is read from the index and rendered
+    page = st.session_state.get("view_all_page", 1) - 1
+    try:
+        borrowers, total = storage.query(**filters, page=page)
+        pages = max((total + page_size - 1) // page_size, 1)
+        if page >= pages:
+            page = pages - 1
+            st.session_state.view_all_page = pages
+            borrowers, total = storage.query(**filters, page=page)
+    except sqlite3.Error as e:
+        logger.error(f"Error querying borrowers: {e}")
+        st.error(f"❌ Error querying borrowers: {e}")
+        return
+
+    if not total:
         st.warning("No borrowers found.")
         return
 
     st.subheader("📄 All Borrowers Summary")
+    first = page * page_size + 1
+    st.caption(f"Showing {first}–{first + len(borrowers) - 1} of {total} borrowers")
+
+    for borrower in borrowers:
+        render_borrower(borrower, tenant)
+
+    st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, key="view_all_page")
+
+    st.markdown("---")
+    export_statements_action(storage, filters, total, tenant)
+    export_ledger_action(storage)
 
-    for file in files:
-        filepath = os.path.join(members_dir, file)
+
+def export_statements_action(storage, filters, total, tenant=None):
+    st.subheader("🗂️ Monthly Statements")
+    if not st.button(f"Export statements for {total} borrower(s)", use_container_width=True):
+        return
+
+    matching, _ = storage.query(**{**filters, "page": 0, "page_size": total})
+    progress = st.progress(0, text="Rendering statements...")
+    buffer = io.BytesIO()
+    written, errors = export_statements(
+        buffer, names=[b["name"] for b in matching],
+        progress=lambda done, count: progress.progress(done / count, text=f"{done}/{count} statements"),
+        members_dir=tenants.members_dir(tenant),
+    )
+
+    for name, e in errors:
+        st.error(f"❌ Error rendering statement for {name}: {e}")
+    st.download_button(
+        f"📦 Download {written} statements (zip)", data=buffer.getvalue(),
+        file_name=f"statements_{date.today():%Y_%m}.zip", mime="application/zip",
+    )
+
+
+def export_ledger_action(storage):
+    st.subheader("📚 Full Ledger Export")
+    col1, col2 = st.columns([1, 3])
+    fmt = col1.selectbox("Format", FORMATS, key="ledger_export_format")
+    if not col2.button("Export every borrower and payment", use_container_width=True):
+        return
+
+    # The export streams to a temp file; only the finished file is read back
+    # for the download button
+    with tempfile.TemporaryDirectory() as directory:
+        out = os.path.join(directory, f"ledger.{fmt}")
         try:
-            wb = load_workbook(filepath)
-            ws = wb["Payments"]
-
-            name = ws['A2'].value or "Unknown"
-            loan_amount = to_float(ws['B2'].value)
-            interest_rate = to_float(ws['C2'].value)
-            loan_period = to_int(ws['E2'].value)
-            monthly_interest = to_float(ws['F2'].value)
-
-            total_paid = 0
-            row = 5
-            while ws.cell(row=row, column=7).value:
-                try:
-                    total_paid += float(ws.cell(row=row, column=8).value)
-                except:
-                    pass
-                row += 1
-
-            total_due = monthly_interest * loan_period
-            remaining = total_due - total_paid
-
-            with st.expander(f"👤 {name} — ₹{loan_amount:.2f}"):
-                col1, col2 = st.columns([4, 1])
-                col1.markdown(f"""
-                - 📊 **Loan Period:** {loan_period} months
-                - 💸 **Monthly Interest:** ₹{monthly_interest:.2f}
-                - ✅ **Interest Paid:** ₹{total_paid:.2f}
-                - ⚠️ **Remaining Interest:** ₹{remaining:.2f}
-                """)
-                if col2.button("🔍 View Profile", key=f"view_{name}_{file}"):
-                    st.session_state.current_borrower = name
-                    st.session_state.current_view = "🔍 Search Borrower"
-                    search_member(name)
+            with st.spinner("Exporting ledger..."):
+                rows = export_ledger(out, fmt, storage)
         except Exception as e:
-            logger.error(f"Error loading data for {file}: {e}")
-            st.error(f"❌ Error loading data for {file}: {e}")
\ No newline at end of file
+            st.error(f"❌ Error exporting ledger: {e}")
+            return
+        with open(out, "rb") as f:
+            data = f.read()
+
+    st.download_button(
+        f"📥 Download ledger ({rows} payments)", data=data,
+        file_name=f"ledger_{date.today():%Y_%m_%d}.{fmt}", mime="application/octet-stream",
+    )
+
+
+def render_borrower(borrower, tenant=None):
+    # Summaries come typed from the index (parsed once when the borrower
+    # was loaded), so fields are used as they are
+    name = borrower["name"] or "Unknown"
+    loan_amount = borrower["loan_amount"]
+    loan_period = borrower["loan_period"]
+    monthly_interest = borrower["monthly_interest"]
+    total_paid = borrower["total_paid"]
+    remaining = borrower["total_due"] - total_paid
+    next_due = (
+        f"₹{borrower['next_due_amount']:.2f} on {borrower['next_due_date']}"
+        if borrower.get("next_due_date") else "—"
+    )
+
+    status = " — ⏰ Overdue" if borrower.get("overdue") else ""
+    with st.expander(f"👤 {name} — ₹{loan_amount:.2f}{status}"):
+        col1, col2 = st.columns([4, 1])
+        col1.markdown(f"""
+        - 📊 **Loan Period:** {loan_period} months
+        - 💸 **Monthly Interest:** ₹{monthly_interest:.2f} ({borrower["repayment"]})
+        - ✅ **{paid_label(borrower["repayment"])}:** ₹{total_paid:.2f}
+        - ⚠️ **Remaining Due:** ₹{remaining:.2f}
+        - 🗓️ **Next Due:** {next_due}
+        """)
+        if col2.button("🔍 View Profile", key=f"view_{name}_{borrower['key']}"):
+            st.session_state.current_borrower = name
+            st.session_state.current_view = "🔍 Search Borrower"
+            search_member(name, tenant)
@@ -0,0 +1,112 @@
+import io
+import os
+from core.schedule import DEFAULT_METHOD
+from core.models import Borrower
+from core import metrics
+
+# openpyxl is imported where it is used: importing it costs about 0.2s,
+# which processes on the SQLite backend never need to pay.
+
+# Layout written by add_member: header on row 1, borrower info on row 2,
+# payments from row 5 in columns G (date), H (amount) and I (note). The
+# repayment method sits in column J of the borrower row; older workbooks
+# without it are flat.
+FIRST_PAYMENT_ROW = 5
+
+HEADER = [
+    "Name", "Loan Amount", "Interest Rate (%)", "Start Date",
+    "Loan Period (Months)", "Monthly Interest",
+    "Payment Date", "Amount Paid", "Notes", "Repayment Method"
+]
+
+# Column of each borrower field in the borrower row
+INFO_CELLS = {
+    "name": 1, "loan_amount": 2, "interest_rate": 3, "start_date": 4,
+    "loan_period": 5, "monthly_interest": 6, "repayment": 10,
+}
+
+
+def build_workbook(info, payments=()):
+    # write_only streams rows straight to the file on save, so building a
+    # workbook with a long payment history stays linear and low-memory
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Payments")
+
+    ws.append(HEADER)
+    ws.append([
+        info["name"], info["loan_amount"], info["interest_rate"],
+        info["start_date"], info["loan_period"], info["monthly_interest"],
+        "", "", "", info.get("repayment") or DEFAULT_METHOD
+    ])
+    for _ in range(FIRST_PAYMENT_ROW - 3):
+        ws.append([])
+
+    for payment_date, amount, note in payments:
+        ws.append([None] * 6 + [payment_date, float(amount), note])
+
+    return wb
+
+
+def workbook_bytes(info, payments=()):
+    buffer = io.BytesIO()
+    build_workbook(info, payments).save(buffer)
+    return buffer.getvalue()
+
+
+def update_info(path, changes):
+    # Rewrites borrower fields in place; payments and the folded-journal
+    # digest are left as they are
+    from openpyxl import load_workbook
+    with metrics.timed("workbook.open", mode="edit"):
+        wb = load_workbook(path)
+    ws = wb["Payments"]
+    for field, value in changes.items():
+        ws.cell(row=2, column=INFO_CELLS[field]).value = value
+    return wb
+
+
+def _parse_rows(rows, path):
+    borrower = None
+
+    for row_number, row in enumerate(rows, start=1):
+        if row_number == 2:
+            row = tuple(row) + (None,) * (10 - len(row))
+            borrower = Borrower.from_info({
+                "name": row[0] or os.path.splitext(os.path.basename(path))[0],
+                "loan_amount": row[1],
+                "interest_rate": row[2],
+                "start_date": row[3],
+                "loan_period": row[4],
+                "monthly_interest": row[5],
+                "repayment": row[9],
+            })
+        elif row_number >= FIRST_PAYMENT_ROW:
+            payment_date, amount_paid, note = (tuple(row[6:9]) + (None,) * 3)[:3]
+            if not payment_date and not amount_paid:
+                break
+            borrower.payments.append(payment_date, amount_paid, note)
+
+    if borrower is None:
+        raise ValueError(f"No borrower row in {path}")
+    return borrower
+
+
+def read_workbook(path):
+    # read_only streams rows from the sheet XML instead of building every
+    # cell object, which is most of the cost on long payment histories
+    from openpyxl import load_workbook
+    with metrics.timed("workbook.open", mode="read_only"):
+        wb = load_workbook(path, read_only=True)
+    try:
+        with metrics.timed("workbook.scan"):
+            borrower = _parse_rows(wb["Payments"].iter_rows(values_only=True), path)
+        metrics.increment("workbook.rows_scanned", FIRST_PAYMENT_ROW - 1 + len(borrower.payments))
+        return borrower, wb.properties.identifier
+    finally:
+        wb.close()
+
+
+def read_borrower(path):
+    borrower, _ = read_workbook(path)
+    return borrower
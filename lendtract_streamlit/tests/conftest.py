@@ -0,0 +1,23 @@
+import os
+import pytest
+from core.locks import atomic_save
+from core.workbook import build_workbook
+
+INFO = {
+    "name": "alice", "loan_amount": 1000.0, "interest_rate": 2.0, "start_date": "2026-01-01",
+    "loan_period": 12, "monthly_interest": 20.0, "repayment": "flat",
+}
+
+
+@pytest.fixture
+def members_dir(tmp_path):
+    path = tmp_path / "members"
+    path.mkdir()
+    return str(path)
+
+
+@pytest.fixture
+def workbook(members_dir):
+    path = os.path.join(members_dir, "alice.xlsx")
+    atomic_save(build_workbook(INFO), path)
+    return path
@@ -0,0 +1,41 @@
+from core.bulk_import import import_ledger
+from core.storage import XlsxStorage
+
+HEADER = "name,loan_amount,interest_rate,loan_period,start_date,monthly_interest,repayment,payment_date,amount\n"
+
+
+def run(members_dir, tmp_path, rows):
+    source = tmp_path / "ledger.csv"
+    source.write_text(HEADER + "".join(row + "\n" for row in rows))
+    storage = XlsxStorage(members_dir)
+    return import_ledger(str(source), storage), storage
+
+
+def test_rows_get_the_ledger_checks(members_dir, tmp_path):
+    report, storage = run(members_dir, tmp_path, [
+        "a,1000,2,12,not a date,,,,",
+        "b,nan,2,12,2026-01-01,,,,",
+        "c,1000,inf,12,2026-01-01,,,,",
+        "d,1000,2,0,2026-01-01,,,,",
+        "e,1000,2,12,2026-01-01,,balloon,,",
+        "f,1000,2,12,2026-01-01,,,,",
+        "f,,,,,,,2026-02-01,nan",
+        "f,,,,,,,2026-02-01,inf",
+        "f,,,,,,,whenever,10",
+        "f,,,,,,,2026-02-30,10",
+        "f,,,,,,,2026-02-01,20",
+    ])
+    assert report.error_count == 9
+    assert report.borrowers == 1 and report.payments == 1
+    assert [n for n in "abcdef" if storage.exists(n)] == ["f"]
+    borrower = storage.load("f")
+    assert borrower.start_date == "2026-01-01"
+    assert borrower.monthly_interest == 20.0
+    assert [(str(p.date), p.amount) for p in borrower.payments] == [("2026-02-01", 20.0)]
+
+
+def test_whole_number_periods_written_as_floats(members_dir, tmp_path):
+    report, storage = run(members_dir, tmp_path, ["g,500,1,6.0,2026-01-01,5,emi,,"])
+    assert report.error_count == 0
+    borrower = storage.load("g")
+    assert (borrower.loan_period, borrower.monthly_interest, borrower.repayment) == (6, 5.0, "emi")
@@ -0,0 +1,50 @@
+import os
+import threading
+import pytest
+from core import journal
+from core.storage import BACKEND_ENV, get_storage
+from core.workbook import read_borrower
+from benchmarks import stress_payments
+from tests.conftest import INFO
+
+THREADS = 8
+PER_THREAD = 25
+
+
+@pytest.mark.parametrize("backend", ["xlsx", "sqlite"])
+def test_concurrent_payments_to_one_borrower_are_not_lost(members_dir, monkeypatch, backend):
+    monkeypatch.setenv(BACKEND_ENV, backend)
+    storage = get_storage(members_dir)
+    storage.add_borrower(INFO)
+    path = os.path.join(members_dir, "alice.xlsx")
+    errors = []
+
+    def worker(thread_id):
+        for i in range(PER_THREAD):
+            try:
+                storage.append_payment("alice", "2026-02-01", 1.0, f"{thread_id}-{i}")
+                if backend == "xlsx" and i % 10 == 0:
+                    journal.compact(path)
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(t,)) for t in range(THREADS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    expected = THREADS * PER_THREAD
+    assert not errors
+    payments = storage.load("alice").payments
+    assert len(payments) == expected
+    assert len({p.note for p in payments}) == expected
+    storage.refresh()
+    assert storage.totals()[2] == expected
+    if backend == "xlsx":
+        journal.compact(path)
+        assert len(read_borrower(path).payments) == expected
+
+
+def test_payments_from_several_processes_are_not_lost():
+    stress_payments.main(thread_count=4, per_thread=10, processes=2)
@@ -0,0 +1,35 @@
+import pytest
+from core import export
+from benchmarks.check_export_memory import SCALE, TOLERANCE, build_ledger, peak_bytes
+
+BORROWERS = 100
+# Tighter than the benchmark's slack: at this size holding the whole ledger
+# adds only about half a MiB
+SLACK_BYTES = 64 * 1024
+
+
+@pytest.fixture(scope="module")
+def ledgers(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("export")
+    small = build_ledger(str(directory / "small.sqlite"), BORROWERS, payments_each=10)
+    large = build_ledger(str(directory / "large.sqlite"), BORROWERS * SCALE, payments_each=10)
+    return str(directory), small, large
+
+
+@pytest.mark.parametrize("fmt", export.FORMATS)
+def test_export_memory_does_not_grow_with_the_ledger(ledgers, monkeypatch, fmt):
+    # Smaller batches so both ledgers span several of them, as a real one would
+    monkeypatch.setattr(export, "BATCH_ROWS", 200)
+    directory, small, large = ledgers
+    peak_bytes(small, fmt, directory)
+    small_peak = peak_bytes(small, fmt, directory)
+    large_peak = peak_bytes(large, fmt, directory)
+    assert large_peak <= small_peak * TOLERANCE + SLACK_BYTES
+
+
+def test_export_rows(ledgers, tmp_path):
+    _, small, _ = ledgers
+    out = str(tmp_path / "ledger.csv")
+    assert export.export_ledger(out, "csv", small) == BORROWERS * 10
+    with open(out, encoding="utf-8") as f:
+        assert f.readline().strip().split(",") == export.LEDGER_COLUMNS
@@ -0,0 +1,65 @@
+import os
+import time
+import threading
+from core import journal
+from core.workbook import read_borrower
+
+
+def test_compaction_folds_payments_once(workbook):
+    journal.append(workbook, "2026-02-01", 20.0, "first")
+    journal.append(workbook, "2026-03-01", 25.0)
+    assert journal.compact(workbook) == 2
+    assert journal.compact(workbook) == 0
+    assert read_borrower(workbook).total_paid() == 45.0
+    assert journal.read_member(workbook).total_paid() == 45.0
+
+
+def test_identical_batches_are_both_folded(workbook):
+    # Same day, amount and (empty) note, compacted in between
+    journal.append(workbook, "2026-10-18", 20.0)
+    assert journal.compact(workbook) == 1
+    journal.append(workbook, "2026-10-18", 20.0)
+    assert journal.read_member(workbook).total_paid() == 40.0
+    assert journal.compact(workbook) == 1
+    assert read_borrower(workbook).total_paid() == 40.0
+    assert journal.read_member(workbook).total_paid() == 40.0
+
+
+def test_batch_left_by_a_crash_is_not_counted_twice(workbook):
+    # The workbook was saved but the .compacting batch not yet removed
+    journal.append(workbook, "2026-10-18", 20.0)
+    journal.compact(workbook)
+    journal.append(workbook, "2026-10-19", 30.0)
+    journal._close(journal.journal_path(workbook))
+    cpath = journal.compacting_path(workbook)
+    os.replace(journal.journal_path(workbook), cpath)
+    with open(cpath, "rb") as f:
+        batch = f.read()
+    journal.compact(workbook)
+    with open(cpath, "wb") as f:
+        f.write(batch)
+    assert journal.read_member(workbook).total_paid() == 50.0
+
+
+def test_sync_skips_a_discarded_journal(workbook):
+    journal.append(workbook, "2026-10-18", 20.0)
+    journal._owners.pop(journal.journal_path(workbook))
+    journal.sync_all()
+    journal.discard(workbook)
+    assert journal.read_member(workbook).total_paid() == 0.0
+
+
+def test_one_compactor_thread_serves_every_members_dir(tmp_path, workbook):
+    # A directory whose compaction fails does not hold up the others
+    broken = tmp_path / "broken"
+    broken.mkdir()
+    (broken / journal.JOURNAL_DIR).write_text("not a directory")
+    journal.start_compactor(str(broken), interval=0)
+    journal.append(workbook, "2026-10-18", 20.0)
+    journal.start_compactor(os.path.dirname(workbook), interval=0)
+    assert [t.name for t in threading.enumerate()].count("journal-compactor") == 1
+
+    deadline = time.monotonic() + 10
+    while read_borrower(workbook).total_paid() != 20.0 and time.monotonic() < deadline:
+        time.sleep(0.1)
+    assert read_borrower(workbook).total_paid() == 20.0
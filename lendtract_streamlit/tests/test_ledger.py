@@ -0,0 +1,49 @@
+import pytest
+from datetime import date
+from core import ledger
+from core.storage import XlsxStorage
+
+
+@pytest.fixture
+def storage(members_dir):
+    storage = XlsxStorage(members_dir)
+    ledger.create_borrower("alice", 1000, 2, 12, start_date="2026-01-01", storage=storage)
+    return storage
+
+
+@pytest.mark.parametrize("amount", ["nan", "inf", float("-inf"), -1, "ten", None])
+def test_payment_amount_must_be_a_finite_number(storage, amount):
+    with pytest.raises(ValueError):
+        ledger.add_payment("alice", amount, "2026-02-01", storage=storage)
+    assert storage.load("alice").payments.total() == 0
+
+
+@pytest.mark.parametrize("payment_date", ["2026-02-30", "2026-02-01 late", "whenever", "01/02/2026"])
+def test_payment_date_must_be_a_date(storage, payment_date):
+    with pytest.raises(ValueError):
+        ledger.add_payment("alice", 20, payment_date, storage=storage)
+    assert len(storage.load("alice").payments) == 0
+
+
+def test_payment_dates_are_stored_as_iso(storage):
+    ledger.add_payment("alice", 20, date(2026, 2, 1), storage=storage)
+    ledger.add_payment("alice", 20, "2026-03-01", storage=storage)
+    assert [p.date for p in storage.load("alice").payments] == [date(2026, 2, 1), date(2026, 3, 1)]
+
+
+@pytest.mark.parametrize("terms", [
+    dict(loan_amount=None, interest_rate=2, loan_period=12),
+    dict(loan_amount="nan", interest_rate=2, loan_period=12),
+    dict(loan_amount=1000, interest_rate="inf", loan_period=12),
+    dict(loan_amount=1000, interest_rate=2, loan_period=float("inf")),
+])
+def test_invalid_loan_terms_are_value_errors(storage, terms):
+    with pytest.raises(ValueError):
+        ledger.create_borrower("bob", storage=storage, **terms)
+    assert not storage.exists("bob")
+
+
+def test_monthly_interest_defaults_to_rate_on_amount(storage):
+    assert storage.load("alice").monthly_interest == 20.0
+    info = ledger.create_borrower("bob", "500", "1.5", 6, monthly_interest=0, storage=storage)
+    assert info["monthly_interest"] == 0.0
@@ -0,0 +1,27 @@
+import asyncio
+import pytest
+from starlette.requests import Request
+from core import metrics
+from core.api import prometheus
+
+
+def scrape(authorization=None):
+    headers = [(b"authorization", authorization.encode())] if authorization else []
+    request = Request({"type": "http", "method": "GET", "path": "/metrics", "headers": headers})
+    return asyncio.run(prometheus(request)).status_code
+
+
+def test_no_admin_without_a_configured_token(monkeypatch):
+    monkeypatch.delenv(metrics.ADMIN_TOKEN_ENV, raising=False)
+    assert not metrics.is_admin("")
+    assert not metrics.is_admin("anything")
+    assert scrape("Bearer anything") == 401
+
+
+@pytest.mark.parametrize("authorization, status", [
+    (None, 401), ("Bearer wrong", 401), ("Basic s3cret", 401), ("Bearer s3cret", 200), ("bearer s3cret", 200),
+])
+def test_metrics_need_the_admin_token(monkeypatch, authorization, status):
+    monkeypatch.setenv(metrics.ADMIN_TOKEN_ENV, "s3cret")
+    assert metrics.is_admin("s3cret")
+    assert scrape(authorization) == status
@@ -0,0 +1,36 @@
+from datetime import date, datetime
+import pytest
+from core.models import NO_DATE, Borrower, Payments
+from tests.conftest import INFO
+
+
+@pytest.mark.parametrize("value", ["2025-02-01", date(2025, 2, 1), datetime(2025, 2, 1, 9, 30)])
+def test_iso_dates_are_parsed(value):
+    payments = Payments([(value, 10.0, None)])
+    assert payments.dates[0] == date(2025, 2, 1).toordinal()
+    assert payments.date(0) == date(2025, 2, 1)
+
+
+@pytest.mark.parametrize("value", ["2025-02-01 late", "2025-02-01T10:00", " 2025-02-01", "20250201", "01/02/2025", 45688])
+def test_other_dates_are_kept_as_given(value):
+    payments = Payments([(value, 10.0, None)])
+    assert payments.dates[0] == NO_DATE
+    assert payments.date(0) == value
+    assert payments.rows() == [[str(value), 10.0, ""]]
+
+
+def test_blank_date():
+    payments = Payments([("", 5.0, "cash")])
+    assert payments.dates[0] == NO_DATE
+    assert payments.date(0) is None
+    assert payments.rows() == [["", 5.0, "cash"]]
+
+
+def test_borrower_from_info():
+    borrower = Borrower.from_info(INFO, [("2026-02-01", 20.0, "first"), ("2026-03-01", "25", None)])
+    assert borrower.info() == INFO
+    assert borrower.total_paid() == 45.0
+    assert [tuple(p) for p in borrower.payments] == [(date(2026, 2, 1), 20.0, "first"), (date(2026, 3, 1), 25.0, None)]
+    copy = borrower.copy()
+    copy.payments.append("2026-04-01", 5.0)
+    assert len(borrower.payments) == 2
@@ -0,0 +1,55 @@
+import random
+from core.name_index import NameIndex, add_name, get_name_index
+from benchmarks.bench_names import synthetic_names, typo
+
+
+def test_prefix_and_typo_suggestions():
+    index = NameIndex(["Aarav Sharma", "Aarav Shah", "Meera Iyer"])
+    assert index.suggest("aarav sh") == ["Aarav Shah", "Aarav Sharma"]
+    assert index.suggest("Meera Iyre")[0] == "Meera Iyer"
+    assert index.suggest("Meera Iyer") == ["Meera Iyer"]
+
+
+def test_typos_are_found_in_a_large_index():
+    rng = random.Random(1)
+    names = synthetic_names(5000)
+    index = NameIndex(names)
+    sample = [rng.choice(names) for _ in range(200)]
+    found = sum(n in index.suggest(typo(n, rng)) for n in sample)
+    assert found >= 0.95 * len(sample)
+
+
+def test_names_differing_in_case_are_all_suggested():
+    index = NameIndex(["Alice", "alice", "Bob"])
+    assert index.rows == 3 and len(index) == 3
+    assert index.suggest("ali") == ["Alice", "alice"]
+    assert index.fuzzy("alise") == ["Alice", "alice"]
+    index.remove("Alice")
+    assert index.suggest("ali") == ["alice"]
+    assert index.rows == 2
+
+
+class FakeStorage:
+    def __init__(self, names):
+        self.names = names
+        self.scans = 0
+
+    def totals(self):
+        return len(self.names), 0.0, 0.0
+
+    def summaries(self):
+        self.scans += 1
+        return [{"name": n} for n in self.names]
+
+
+def test_index_is_built_once_for_case_variants():
+    storage = FakeStorage(["Alice", "alice"])
+    first = get_name_index(storage)
+    assert get_name_index(storage) is first
+    assert storage.scans == 1
+    storage.names.append("Carol")
+    add_name(storage, "Carol")
+    assert get_name_index(storage) is first
+    storage.names.append("Dave")
+    assert get_name_index(storage).suggest("dav") == ["Dave"]
+    assert storage.scans == 2
@@ -0,0 +1,43 @@
+import os
+import pytest
+from core import ledger
+from core.bulk_import import import_ledger
+from core.storage import XlsxStorage
+from core.utils import get_member_path, validate_name
+
+BAD_NAMES = ["../x", "../../escaped", "a/b", "a\\b", ".hidden", "..", "a..b", "nul\0name", "", "  "]
+
+
+@pytest.mark.parametrize("name", BAD_NAMES)
+def test_validate_name_rejects_paths(name):
+    with pytest.raises(ValueError):
+        validate_name(name)
+
+
+def test_validate_name_accepts_ordinary_names():
+    for name in ["alice", "Ravi Kumar", "O'Brien", "Meera.S", "borrower_000001"]:
+        assert validate_name(name) == name
+
+
+def test_member_path_stays_in_members_dir(members_dir):
+    assert get_member_path("alice", members_dir) == os.path.join(members_dir, "alice.xlsx")
+    with pytest.raises(ValueError):
+        get_member_path("../escaped", members_dir)
+
+
+def test_create_borrower_cannot_write_outside_members_dir(members_dir):
+    storage = XlsxStorage(members_dir)
+    with pytest.raises(ValueError):
+        ledger.create_borrower("../escaped", 1000, 2, 12, storage=storage)
+    assert not os.path.exists(os.path.join(os.path.dirname(members_dir), "escaped.xlsx"))
+    assert not storage.exists("../escaped")
+
+
+def test_bulk_import_rejects_path_names(members_dir, tmp_path):
+    source = tmp_path / "ledger.csv"
+    source.write_text("name,loan_amount,interest_rate,loan_period\n../escaped,1000,2,12\nbob,500,1,6\n")
+    report = import_ledger(str(source), XlsxStorage(members_dir))
+    assert report.borrowers == 1
+    assert report.error_count == 1
+    assert "bob.xlsx" in os.listdir(members_dir)
+    assert not os.path.exists(tmp_path / "escaped.xlsx")
@@ -0,0 +1,22 @@
+from core.models import Payments
+from core.report import report_key
+from tests.conftest import INFO
+
+
+def key(rows, members_dir="members"):
+    return report_key(INFO, Payments(rows), members_dir)
+
+
+def test_report_key_follows_every_payment_field():
+    rows = [("2026-02-01", 20.0, "cash"), ("2026-03-01", 30.0, None)]
+    assert key(rows) == key(list(rows))
+    # Same count and total, different contents
+    assert key(rows) != key([("2026-02-01", 30.0, "cash"), ("2026-03-01", 20.0, None)])
+    assert key(rows) != key([("2026-02-02", 20.0, "cash"), ("2026-03-01", 30.0, None)])
+    assert key(rows) != key([("2026-02-01", 20.0, "upi"), ("2026-03-01", 30.0, None)])
+    assert key(rows) != key([("2026-02-01", 20.0, None), ("2026-03-01", 30.0, "cash")])
+
+
+def test_report_key_is_per_members_dir():
+    rows = [("2026-02-01", 20.0, "cash")]
+    assert key(rows, "tenants/ab/acme") != key(rows, "tenants/cd/other")
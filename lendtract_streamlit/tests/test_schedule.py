@@ -0,0 +1,59 @@
+from datetime import date
+import pytest
+from core.schedule import add_months, build_schedule, installments, next_due, paid_label, parse_date, total_due
+
+
+def loan(method, amount=1000, rate=0, period=3, **extra):
+    return dict(repayment=method, loan_amount=amount, interest_rate=rate, loan_period=period, **extra)
+
+
+@pytest.mark.parametrize("method", ["reducing", "emi"])
+@pytest.mark.parametrize("amount, period", [(1000, 3), (1000, 7), (12345.67, 11), (100, 12)])
+def test_principal_adds_up_to_the_loan(method, amount, period):
+    rows = installments(loan(method, amount, 1.5, period))
+    assert len(rows) == period
+    assert round(sum(p for p, _ in rows), 2) == amount
+
+
+def test_reducing_puts_the_remainder_on_the_last_installment():
+    assert installments(loan("reducing")) == [(333.33, 0.0), (333.33, 0.0), (333.34, 0.0)]
+    interest = [i for _, i in installments(loan("reducing", rate=1))]
+    assert interest == [10.0, 6.67, 3.33]
+
+
+def test_flat_is_interest_only():
+    assert installments(loan("flat", rate=2, period=2)) == [(0.0, 20.0), (0.0, 20.0)]
+    assert installments(loan("flat", rate=2, period=2, monthly_interest=15)) == [(0.0, 15.0), (0.0, 15.0)]
+
+
+def test_no_installments_without_a_period():
+    assert installments(loan("emi", period=0)) == []
+    assert total_due(build_schedule(loan("emi", period=0))) == 0.0
+
+
+def test_unknown_method_is_rejected():
+    with pytest.raises(ValueError):
+        installments(loan("balloon"))
+
+
+def test_next_due_follows_total_paid():
+    schedule = build_schedule(loan("reducing"))
+    assert total_due(schedule) == 1000.0
+    assert next_due("2026-01-31", schedule, 0) == (1, date(2026, 2, 28), 333.33)
+    assert next_due("2026-01-31", schedule, 400) == (2, date(2026, 3, 31), 266.66)
+    assert next_due("2026-01-31", schedule, 1000) is None
+
+
+def test_add_months_clamps_to_month_end():
+    assert add_months(date(2024, 1, 31), 1) == date(2024, 2, 29)
+    assert add_months(date(2025, 11, 15), 3) == date(2026, 2, 15)
+
+
+def test_parse_date():
+    assert parse_date("2026-03-04") == date(2026, 3, 4)
+    assert parse_date("not a date") is None
+
+
+def test_paid_label_follows_the_schedule():
+    assert paid_label("flat") == paid_label(None) == "Total Interest Paid"
+    assert paid_label("reducing") == paid_label("emi") == "Total Paid"
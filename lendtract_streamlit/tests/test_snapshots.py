@@ -0,0 +1,34 @@
+import threading
+from datetime import date
+from core import index, journal, ledger, snapshots
+from core.storage import get_storage
+
+
+def test_one_scheduler_thread_for_all_members_dirs(tmp_path):
+    for name in ("a", "b", "c"):
+        (tmp_path / name).mkdir()
+        snapshots.start_scheduler(str(tmp_path / name))
+    snapshots.start_scheduler(str(tmp_path / "a"))
+    assert [t.name for t in threading.enumerate()].count("snapshot-scheduler") == 1
+    assert all(str(tmp_path / name) in snapshots._scheduled for name in ("a", "b", "c"))
+
+
+def test_compaction_alone_does_not_call_for_a_snapshot(members_dir, monkeypatch):
+    monkeypatch.setattr(snapshots, "MIN_GAP", 0)
+    storage = get_storage(members_dir)
+    ledger.create_borrower("alice", 1000, 2, 12, start_date="2026-01-01", storage=storage)
+    ledger.add_payment("alice", 20, "2026-02-01", storage=storage)
+    snapshots.snapshot_now(members_dir)
+    today = date.today()
+    assert not snapshots._due(members_dir, today)
+
+    version = storage.version()
+    assert journal.compact_all(members_dir, index.restat) == 1
+    assert storage.version() != version
+    assert not snapshots._due(members_dir, today)
+
+    ledger.update_borrower("alice", {"interest_rate": 3}, storage=storage)
+    assert snapshots._due(members_dir, today)
+    snapshots.snapshot_now(members_dir)
+    ledger.add_payment("alice", 20, "2026-03-01", storage=storage)
+    assert snapshots._due(members_dir, today)
@@ -0,0 +1,36 @@
+import os
+import shutil
+from core import index, journal
+from core.storage import import_members_dir, SqliteStorage, XlsxStorage, LEDGER_FILE
+
+
+def test_migration_keeps_journalled_payments(members_dir, workbook):
+    journal.append(workbook, "2026-02-01", 20.0)
+    journal.compact(workbook)
+    journal.append(workbook, "2026-03-01", 25.0, "not compacted")
+    journal.sync_all()
+
+    assert import_members_dir(members_dir) == 1
+    borrower = SqliteStorage(f"{members_dir}/{LEDGER_FILE}").load("alice")
+    assert borrower.total_paid() == 45.0
+    assert [p.note for p in borrower.payments] == [None, "not compacted"]
+
+
+def test_query_keys_rows_by_file_when_names_repeat(members_dir, workbook):
+    shutil.copy(workbook, os.path.join(members_dir, "alice_copy.xlsx"))
+    index.sync_index(members_dir)
+    rows, total = index.query_borrowers(members_dir)
+    assert total == 2
+    assert [r["name"] for r in rows] == ["alice", "alice"]
+    assert sorted(r["key"] for r in rows) == ["alice.xlsx", "alice_copy.xlsx"]
+
+
+def test_import_does_not_keep_a_journal_open_per_borrower(members_dir):
+    storage = XlsxStorage(members_dir)
+    info = {"loan_amount": 100.0, "interest_rate": 1.0, "start_date": "2026-01-01", "loan_period": 3, "monthly_interest": 1.0}
+    storage.import_groups((f"b{i}", dict(info, name=f"b{i}"), []) for i in range(20))
+    before = len(journal._handles)
+    created, written, errors = storage.import_groups((f"b{i}", None, [("2026-02-01", 1.0, "")]) for i in range(20))
+    assert (created, written, errors) == (0, 20, [])
+    assert len(journal._handles) == before
+    assert storage.load("b7").total_paid() == 1.0
@@ -0,0 +1,33 @@
+import os
+import pytest
+from core import ledger, tenants
+
+
+@pytest.fixture
+def tenants_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(tenants, "TENANTS_DIR", str(tmp_path / "tenants"))
+    return tmp_path / "tenants"
+
+
+def test_tenant_partitions_are_sharded(tenants_dir):
+    path = tenants.create("acme")
+    assert path == os.path.join(str(tenants_dir), tenants.shard("acme"), "acme")
+    assert tenants.list_tenants()[-1] == "acme"
+    with pytest.raises(ValueError):
+        tenants.members_dir("../acme")
+    with pytest.raises(KeyError):
+        tenants.get_storage("missing")
+
+
+def test_write_through_one_tenant_cannot_reach_another(tenants_dir):
+    tenants.create("acme")
+    victim = tenants.create("victim")
+    planted = os.path.join("..", "..", tenants.shard("victim"), "victim", "planted")
+
+    with pytest.raises(ValueError):
+        ledger.create_borrower(planted, 1000, 2, 12, tenant="acme")
+    ledger.create_borrower("amy", 1000, 2, 12, tenant="acme")
+
+    assert [f for f in os.listdir(victim) if f.endswith(".xlsx")] == []
+    assert tenants.get_storage("victim").summaries() == []
+    assert [s["name"] for s in tenants.get_storage("acme").summaries()] == ["amy"]